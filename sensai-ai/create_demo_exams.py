@@ -3,7 +3,7 @@
 Demo script to create sample exam data for testing
 """
 import asyncio
-import json
+import orjson
 import uuid
 import sys
 import os
@@ -16,8 +16,8 @@ from api.db import init_db
 from api.config import exams_table_name
 from api.utils.db import get_new_db_connection
 
-async def create_demo_exams():
-    """Create demo exam configurations for testing"""
+async def create_demo_exams(conn):
+    """Create demo exam configurations for testing on the given connection"""
     
     # Sample exam 1: Programming Quiz
     programming_exam = {
@@ -72,27 +72,31 @@ async def create_demo_exams():
                 "points": 8
             }
         ],
-        "settings": {
-            "allow_tab_switch": False,
-            "max_tab_switches": 2,
-            "allow_copy_paste": False,
-            "require_camera": True,
-            "require_microphone": True,
-            "fullscreen_required": True,
-            "auto_submit": True,
-            "shuffle_questions": False,
-            "show_timer": True
-        },
-        "monitoring": {
-            "video_recording": True,
-            "audio_recording": True,
-            "screen_recording": False,
-            "keystroke_logging": True,
-            "mouse_tracking": True,
-            "face_detection": True,
-            "gaze_tracking": True,
-            "network_monitoring": True
-        }
+        "settings": orjson.dumps(
+            {
+                "allow_tab_switch": False,
+                "max_tab_switches": 2,
+                "allow_copy_paste": False,
+                "require_camera": True,
+                "require_microphone": True,
+                "fullscreen_required": True,
+                "auto_submit": True,
+                "shuffle_questions": False,
+                "show_timer": True
+            }
+        ).decode(),
+        "monitoring": orjson.dumps(
+            {
+                "video_recording": True,
+                "audio_recording": True,
+                "screen_recording": False,
+                "keystroke_logging": True,
+                "mouse_tracking": True,
+                "face_detection": True,
+                "gaze_tracking": True,
+                "network_monitoring": True
+            }
+        ).decode()
     }
 
     # Sample exam 2: General Knowledge Quiz
@@ -156,27 +160,31 @@ async def create_demo_exams():
                 "points": 1
             }
         ],
-        "settings": {
-            "allow_tab_switch": True,
-            "max_tab_switches": 5,
-            "allow_copy_paste": False,
-            "require_camera": True,
-            "require_microphone": False,
-            "fullscreen_required": False,
-            "auto_submit": True,
-            "shuffle_questions": True,
-            "show_timer": True
-        },
-        "monitoring": {
-            "video_recording": True,
-            "audio_recording": False,
-            "screen_recording": False,
-            "keystroke_logging": False,
-            "mouse_tracking": False,
-            "face_detection": True,
-            "gaze_tracking": True,
-            "network_monitoring": False
-        }
+        "settings": orjson.dumps(
+            {
+                "allow_tab_switch": True,
+                "max_tab_switches": 5,
+                "allow_copy_paste": False,
+                "require_camera": True,
+                "require_microphone": False,
+                "fullscreen_required": False,
+                "auto_submit": True,
+                "shuffle_questions": True,
+                "show_timer": True
+            }
+        ).decode(),
+        "monitoring": orjson.dumps(
+            {
+                "video_recording": True,
+                "audio_recording": False,
+                "screen_recording": False,
+                "keystroke_logging": False,
+                "mouse_tracking": False,
+                "face_detection": True,
+                "gaze_tracking": True,
+                "network_monitoring": False
+            }
+        ).decode()
     }
 
     # Sample exam 3: Math Problem Solving
@@ -226,55 +234,62 @@ async def create_demo_exams():
                 "points": 8
             }
         ],
-        "settings": {
-            "allow_tab_switch": False,
-            "max_tab_switches": 1,
-            "allow_copy_paste": False,
-            "require_camera": True,
-            "require_microphone": True,
-            "fullscreen_required": True,
-            "auto_submit": True,
-            "shuffle_questions": False,
-            "show_timer": True
-        },
-        "monitoring": {
-            "video_recording": True,
-            "audio_recording": True,
-            "screen_recording": False,
-            "keystroke_logging": True,
-            "mouse_tracking": True,
-            "face_detection": True,
-            "gaze_tracking": True,
-            "network_monitoring": True
-        }
+        "settings": orjson.dumps(
+            {
+                "allow_tab_switch": False,
+                "max_tab_switches": 1,
+                "allow_copy_paste": False,
+                "require_camera": True,
+                "require_microphone": True,
+                "fullscreen_required": True,
+                "auto_submit": True,
+                "shuffle_questions": False,
+                "show_timer": True
+            }
+        ).decode(),
+        "monitoring": orjson.dumps(
+            {
+                "video_recording": True,
+                "audio_recording": True,
+                "screen_recording": False,
+                "keystroke_logging": True,
+                "mouse_tracking": True,
+                "face_detection": True,
+                "gaze_tracking": True,
+                "network_monitoring": True
+            }
+        ).decode()
     }
 
     exams = [programming_exam, general_exam, math_exam]
 
-    async with get_new_db_connection() as conn:
-        cursor = await conn.cursor()
-        
-        for exam in exams:
-            await cursor.execute(
-                f"""INSERT OR REPLACE INTO {exams_table_name} 
-                    (id, title, description, duration, questions, settings, monitoring, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    exam["id"],
-                    exam["title"],
-                    exam["description"], 
-                    exam["duration"],
-                    json.dumps(exam["questions"]),
-                    json.dumps(exam["settings"]),
-                    json.dumps(exam["monitoring"]),
-                    datetime.now(),
-                    datetime.now()
-                )
-            )
-            print(f"Created exam: {exam['title']} (ID: {exam['id']})")
-        
-        await conn.commit()
-        print("Demo exams created successfully!")
+    insert_query = f"""INSERT OR REPLACE INTO {exams_table_name} 
+        (id, title, description, duration, questions, settings, monitoring, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+    now = datetime.now()
+    rows = [
+        (
+            exam["id"],
+            exam["title"],
+            exam["description"],
+            exam["duration"],
+            orjson.dumps(exam["questions"]).decode(),
+            exam["settings"],
+            exam["monitoring"],
+            now,
+            now,
+        )
+        for exam in exams
+    ]
+
+    cursor = await conn.cursor()
+
+    await cursor.executemany(insert_query, rows)
+    await conn.commit()
+
+    for exam in exams:
+        print(f"Created exam: {exam['title']} (ID: {exam['id']})")
+    print("Demo exams created successfully!")
 
 async def main():
     """Main function to set up demo data"""
@@ -283,17 +298,19 @@ async def main():
     # Initialize database first
     print("Database initialized.")
     
-    # Create demo exams
-    await create_demo_exams()
-    
-    print("\nDemo setup complete!")
-    print("\nAvailable demo exams:")
-    
+    # Reuse one connection for seeding and listing
     async with get_new_db_connection() as conn:
+        # Create demo exams
+        await create_demo_exams(conn)
+
+        print("\nDemo setup complete!")
+        print("\nAvailable demo exams:")
+
         cursor = await conn.cursor()
         await cursor.execute(f"SELECT id, title, duration FROM {exams_table_name}")
-        
-        async for row in cursor:
+        rows = await cursor.fetchall()
+
+        for row in rows:
             print(f"  - {row[1]} ({row[2]} minutes) - ID: {row[0]}")
 
 if __name__ == "__main__":
@@ -18,88 +18,53 @@ async def migrate_database():
         async with get_new_db_connection() as conn:
             cursor = await conn.cursor()
             
-            # Add role column to exams table if it doesn't exist
-            print("📝 Adding role column to exams table...")
-            try:
-                await cursor.execute(f"""
-                    ALTER TABLE {exams_table_name} 
-                    ADD COLUMN role TEXT DEFAULT 'teacher'
-                """)
-                print("✅ Added role column to exams table")
-            except Exception as e:
-                if "duplicate column name" in str(e).lower():
-                    print("ℹ️ Role column already exists in exams table")
-                else:
-                    print(f"❌ Error adding role column: {e}")
+            # Look up existing columns once per table instead of relying on
+            # "duplicate column name" errors from ALTER TABLE
+            existing_columns = {}
+            for table_name in (exams_table_name, exam_events_table_name):
+                await cursor.execute(f"PRAGMA table_info({table_name})")
+                existing_columns[table_name] = {
+                    row[1] for row in await cursor.fetchall()
+                }
 
-            # Add priority column to exam_events table
-            print("📝 Adding priority column to exam_events table...")
-            try:
-                await cursor.execute(f"""
-                    ALTER TABLE {exam_events_table_name} 
-                    ADD COLUMN priority INTEGER DEFAULT 1
-                """)
-                print("✅ Added priority column to exam_events table")
-            except Exception as e:
-                if "duplicate column name" in str(e).lower():
-                    print("ℹ️ Priority column already exists in exam_events table")
-                else:
-                    print(f"❌ Error adding priority column: {e}")
+            new_columns = [
+                (exams_table_name, "role", "TEXT DEFAULT 'teacher'"),
+                (exam_events_table_name, "priority", "INTEGER DEFAULT 1"),
+                (exam_events_table_name, "confidence_score", "REAL DEFAULT 0.0"),
+                (exam_events_table_name, "is_flagged", "BOOLEAN DEFAULT FALSE"),
+            ]
 
-            # Add confidence_score column to exam_events table
-            print("📝 Adding confidence_score column to exam_events table...")
-            try:
-                await cursor.execute(f"""
-                    ALTER TABLE {exam_events_table_name} 
-                    ADD COLUMN confidence_score REAL DEFAULT 0.0
-                """)
-                print("✅ Added confidence_score column to exam_events table")
-            except Exception as e:
-                if "duplicate column name" in str(e).lower():
-                    print("ℹ️ Confidence_score column already exists in exam_events table")
-                else:
-                    print(f"❌ Error adding confidence_score column: {e}")
+            for table_name, column_name, column_definition in new_columns:
+                print(f"📝 Adding {column_name} column to {table_name} table...")
+                if column_name in existing_columns[table_name]:
+                    print(f"ℹ️ {column_name.capitalize()} column already exists in {table_name} table")
+                    continue
 
-            # Add is_flagged column to exam_events table
-            print("📝 Adding is_flagged column to exam_events table...")
-            try:
-                await cursor.execute(f"""
-                    ALTER TABLE {exam_events_table_name} 
-                    ADD COLUMN is_flagged BOOLEAN DEFAULT FALSE
-                """)
-                print("✅ Added is_flagged column to exam_events table")
-            except Exception as e:
-                if "duplicate column name" in str(e).lower():
-                    print("ℹ️ Is_flagged column already exists in exam_events table")
-                else:
-                    print(f"❌ Error adding is_flagged column: {e}")
+                try:
+                    await cursor.execute(f"""
+                        ALTER TABLE {table_name} 
+                        ADD COLUMN {column_name} {column_definition}
+                    """)
+                    print(f"✅ Added {column_name} column to {table_name} table")
+                except Exception as e:
+                    print(f"❌ Error adding {column_name} column: {e}")
 
             # Create indexes for the new columns
             print("📝 Creating indexes for new columns...")
             
             try:
-                await cursor.execute(f"""
-                    CREATE INDEX IF NOT EXISTS idx_exam_role ON {exams_table_name} (role)
-                """)
-                print("✅ Created index for role column")
-            except Exception as e:
-                print(f"❌ Error creating role index: {e}")
-
-            try:
-                await cursor.execute(f"""
-                    CREATE INDEX IF NOT EXISTS idx_exam_event_flagged ON {exam_events_table_name} (is_flagged)
-                """)
-                print("✅ Created index for is_flagged column")
-            except Exception as e:
-                print(f"❌ Error creating is_flagged index: {e}")
-
-            try:
-                await cursor.execute(f"""
-                    CREATE INDEX IF NOT EXISTS idx_exam_event_priority ON {exam_events_table_name} (priority)
+                # One explicit transaction so all index builds share a single
+                # commit (executescript would otherwise autocommit each one)
+                await cursor.executescript(f"""
+                    BEGIN;
+                    CREATE INDEX IF NOT EXISTS idx_exam_role ON {exams_table_name} (role);
+                    CREATE INDEX IF NOT EXISTS idx_exam_event_flagged ON {exam_events_table_name} (is_flagged);
+                    CREATE INDEX IF NOT EXISTS idx_exam_event_priority ON {exam_events_table_name} (priority);
+                    COMMIT;
                 """)
-                print("✅ Created index for priority column")
+                print("✅ Created indexes for role, is_flagged and priority columns")
             except Exception as e:
-                print(f"❌ Error creating priority index: {e}")
+                print(f"❌ Error creating indexes: {e}")
             
             await conn.commit()
             print("✅ Database migration completed successfully!")
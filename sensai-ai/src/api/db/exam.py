@@ -0,0 +1,97 @@
+from typing import List, Optional
+import orjson
+from api.utils.db import execute_db_operation
+from api.utils.cache import TTLCache
+from api.config import exams_table_name
+
+# Exams are read on every page load and answer submission but rarely change
+EXAM_CACHE_TTL = 5 * 60
+
+# Parsed exams are held as orjson bytes so every reader gets its own copy
+# to modify
+exam_cache = TTLCache(ttl=EXAM_CACHE_TTL)
+
+
+def get_exam_cache_key(exam_id: str) -> str:
+    return f"exam:{exam_id}"
+
+
+def get_answer_key_cache_key(exam_id: str) -> str:
+    return f"exam_answer_key:{exam_id}"
+
+
+async def get_exam_from_db(exam_id: str) -> Optional[dict]:
+    cache_key = get_exam_cache_key(exam_id)
+    cached_exam = await exam_cache.get(cache_key)
+    if cached_exam is not None:
+        return orjson.loads(cached_exam)
+
+    row = await execute_db_operation(
+        f"""SELECT id, title, description, duration, questions, settings, monitoring,
+                   created_at, updated_at, org_id, created_by
+            FROM {exams_table_name} WHERE id = ?""",
+        (exam_id,),
+        fetch_one=True,
+    )
+
+    if not row:
+        return None
+
+    exam = {
+        "id": row[0],
+        "title": row[1],
+        "description": row[2],
+        "duration": row[3],
+        "questions": orjson.loads(row[4]),
+        "settings": orjson.loads(row[5] or "{}"),
+        "monitoring": orjson.loads(row[6] or "{}"),
+        "created_at": row[7],
+        "updated_at": row[8],
+        "org_id": row[9],
+        "created_by": row[10],
+    }
+
+    await exam_cache.set(cache_key, orjson.dumps(exam))
+
+    return exam
+
+
+def build_answer_key(questions: List[dict]) -> dict:
+    answer_key = {"questions": {}, "total_points": 0}
+
+    for question in questions:
+        points = question.get("points", 1)
+        answer_key["total_points"] += points
+        answer_key["questions"][question.get("id")] = (
+            question.get("type"),
+            question.get("correct_answer"),
+            points,
+        )
+
+    return answer_key
+
+
+async def get_exam_answer_key(exam_id: str) -> Optional[dict]:
+    """
+    Return {"questions": {question_id: (type, correct_answer, points)},
+    "total_points": ...} for scoring submissions. It is only read, so it is
+    cached as-is rather than serialized.
+    """
+    cache_key = get_answer_key_cache_key(exam_id)
+    answer_key = await exam_cache.get(cache_key)
+    if answer_key is not None:
+        return answer_key
+
+    exam = await get_exam_from_db(exam_id)
+    if not exam:
+        return None
+
+    answer_key = build_answer_key(exam["questions"])
+    await exam_cache.set(cache_key, answer_key)
+
+    return answer_key
+
+
+async def invalidate_exam_cache(exam_id: str):
+    await exam_cache.delete(get_exam_cache_key(exam_id))
+    await exam_cache.delete(get_answer_key_cache_key(exam_id))
@@ -1,71 +1,288 @@
-from typing import Dict, List
+import asyncio
+import io
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+import hashlib
+from string import Template
+from typing import AsyncIterator, Dict, List, Optional
+import weakref
 import backoff
+import httpx
 import openai
 import instructor
-import json
+import orjson
+import re
+import time
 
 from openai import OpenAI
 
+try:
+    # aiohttp-backed transport, only shipped by newer SDKs (openai[aiohttp])
+    from openai import DefaultAioHttpClient
+except ImportError:
+    DefaultAioHttpClient = None
+
 from pydantic import BaseModel
 
+from api.models import (
+    ExamContext,
+    ExamEvaluationReport,
+    ExamSummaryEvaluation,
+    ExamQuestionsEvaluation,
+    ExamRecommendationsEvaluation,
+    ExamTeacherEvaluation,
+    SurpriseVivaQuestions,
+)
+from api.utils.cache import TTLCache
+from api.utils.llm_cache import llm_cache, make_llm_cache_key
+from api.utils.rate_limiter import estimate_prompt_tokens, throttle_openai_request
 from api.utils.logging import logger
 from api.db.course import get_course as get_course_from_db
 
 # Test log message
 logger.info("Logging system initialized")
 
+# Pool limits for the shared async clients; httpx's defaults (100 connections,
+# 20 keep-alive) lead to PoolTimeout under concurrent requests
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+# Keep the SDK's 10 minute read timeout for long completions but fail fast on connect
+OPENAI_HTTP_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+
+# Async clients handed out by get_async_openai_client, closed on shutdown
+async_openai_clients = weakref.WeakSet()
+
+
+REASONING_MODELS = frozenset({
+    "o3-mini-2025-01-31",
+    "o3-mini",
+    "o1-preview-2024-09-12",
+    "o1-preview",
+    "o1-mini",
+    "o1-mini-2024-09-12",
+    "o1",
+    "o1-2024-12-17",
+})
+
 
 def is_reasoning_model(model: str) -> bool:
-    return model in [
-        "o3-mini-2025-01-31",
-        "o3-mini",
-        "o1-preview-2024-09-12",
-        "o1-preview",
-        "o1-mini",
-        "o1-mini-2024-09-12",
-        "o1",
-        "o1-2024-12-17",
-    ]
+    return model in REASONING_MODELS
+
+
+# (context window, max output tokens) of the chat models used here; other
+# models are assumed to have the gpt-4o limits
+MODEL_TOKEN_LIMITS = {
+    "gpt-4o": (128000, 16384),
+    "gpt-4o-mini": (128000, 16384),
+    "gpt-4.1": (1047576, 32768),
+    "gpt-4.1-mini": (1047576, 32768),
+    "o1": (200000, 100000),
+    "o3-mini": (200000, 100000),
+}
+DEFAULT_MODEL_TOKEN_LIMITS = MODEL_TOKEN_LIMITS["gpt-4o"]
+# Headroom for the rough prompt estimate and message framing tokens
+COMPLETION_TOKEN_MARGIN = 128
+
+
+def fit_completion_tokens(model: str, messages: List, requested: int) -> int:
+    """
+    Cap a completion budget to what the model can still produce after the
+    prompt, so requests never reserve more output than can fit
+    """
+    context_window, max_output_tokens = MODEL_TOKEN_LIMITS.get(model, DEFAULT_MODEL_TOKEN_LIMITS)
+    available = context_window - estimate_prompt_tokens(messages) - COMPLETION_TOKEN_MARGIN
+    return max(1, min(requested, max_output_tokens, available))
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """Build the HTTP client for async OpenAI calls, preferring the aiohttp transport"""
+    if DefaultAioHttpClient is not None:
+        try:
+            return DefaultAioHttpClient(
+                limits=OPENAI_HTTP_LIMITS, timeout=OPENAI_HTTP_TIMEOUT
+            )
+        except RuntimeError:
+            # The SDK exposes the class but the aiohttp extra isn't installed
+            pass
+
+    return openai.DefaultAsyncHttpxClient(
+        limits=OPENAI_HTTP_LIMITS, timeout=OPENAI_HTTP_TIMEOUT
+    )
+
+
+@lru_cache(maxsize=32)
+def get_openai_client(api_key: str) -> OpenAI:
+    """Return a shared sync client for the key so its connection pool is reused"""
+    return OpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=32)
+def get_async_openai_client(api_key: str) -> openai.AsyncOpenAI:
+    """Return a shared async client for the key so its connection pool is reused"""
+    client = openai.AsyncOpenAI(api_key=api_key, http_client=build_async_http_client())
+    async_openai_clients.add(client)
+    return client
+
+
+@lru_cache(maxsize=32)
+def get_instructor_client(api_key: str):
+    """Return a shared instructor wrapper around the async client for the key"""
+    return instructor.from_openai(get_async_openai_client(api_key))
+
+
+async def close_async_openai_clients():
+    """Close the pooled connections of all shared async clients"""
+    get_instructor_client.cache_clear()
+    get_async_openai_client.cache_clear()
+
+    for client in list(async_openai_clients):
+        await client.close()
+
+    async_openai_clients.clear()
+
+
+# Errors worth retrying with backoff. Instructor re-raises API errors from its
+# own retry loop wrapped in InstructorRetryException, so that is included too
+TRANSIENT_OPENAI_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    instructor.exceptions.InstructorRetryException,
+)
+
+# Errors that will not go away by retrying: bad keys, exhausted quota, billing
+NON_RETRYABLE_ERROR_PATTERN = re.compile(r"invalid|unauthorized|quota|billing", re.IGNORECASE)
+
+
+def should_retry(exception):
+    """Determine if we should retry the request based on the exception"""
+    # Don't retry on authentication or permission errors
+    if isinstance(exception, (openai.AuthenticationError, openai.PermissionDeniedError)):
+        return False
+    # Don't retry on other authentication or billing errors
+    if NON_RETRYABLE_ERROR_PATTERN.search(str(exception)):
+        return False
+    # Retry on other errors
+    return True
+
+
+# Only available to paid accounts, so its presence tells the two apart
+PAID_ACCOUNT_PROBE_MODEL = "gpt-4o-audio-preview-2024-12-17"
+
+
+# Account tiers rarely change, so validation results are reused for a while.
+# Entries are keyed by a hash of the API key so raw keys are not kept around
+API_KEY_VALIDATION_TTL = 15 * 60
+API_KEY_VALIDATION_MAX_ENTRIES = 1024
+api_key_validation_cache: Dict[str, tuple] = {}
 
 
 def validate_openai_api_key(openai_api_key: str) -> bool:
+    key_hash = hashlib.sha256(openai_api_key.encode()).hexdigest()
+    cached = api_key_validation_cache.get(key_hash)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    # A one-off client rather than get_openai_client, whose lru_cache would
+    # keep the raw key and a client alive for every key validated
     client = OpenAI(api_key=openai_api_key)
     try:
-        models = client.models.list()
-        model_ids = [model.id for model in models.data]
-
-        if "gpt-4o-audio-preview-2024-12-17" in model_ids:
-            return False  # paid account
-        else:
-            return True  # free trial account
+        client.models.retrieve(PAID_ACCOUNT_PROBE_MODEL)
+        is_free_trial = False  # paid account
+    except openai.NotFoundError:
+        is_free_trial = True  # free trial account
     except Exception:
+        # Errors may be transient, so they are not cached
         return None
-
-
-@backoff.on_exception(backoff.expo, Exception, max_tries=5, factor=2)
+    finally:
+        client.close()
+
+    api_key_validation_cache.pop(key_hash, None)
+    if len(api_key_validation_cache) >= API_KEY_VALIDATION_MAX_ENTRIES:
+        # Evict the oldest entry; dicts keep insertion order
+        api_key_validation_cache.pop(next(iter(api_key_validation_cache)))
+    api_key_validation_cache[key_hash] = (time.monotonic() + API_KEY_VALIDATION_TTL, is_free_trial)
+    return is_free_trial
+
+
+@backoff.on_exception(
+    backoff.expo,
+    TRANSIENT_OPENAI_ERRORS,
+    max_tries=5,
+    factor=0.1,
+    max_value=8,
+    jitter=backoff.full_jitter,
+    giveup=lambda e: not should_retry(e),
+)
 async def run_llm_with_instructor(
     api_key: str,
     model: str,
     messages: List,
     response_model: BaseModel,
     max_completion_tokens: int,
+    store: bool = False,
 ):
-    client = instructor.from_openai(openai.AsyncOpenAI(api_key=api_key))
+    client = get_instructor_client(api_key)
 
     model_kwargs = {}
 
     if not is_reasoning_model(model):
         model_kwargs["temperature"] = 0
 
-    return await client.chat.completions.create(
+    # Only deterministic (temperature 0) requests are served from the cache.
+    # The API key is part of the key (which is only kept as a digest) so a
+    # response paid for with one key is never handed to another
+    cache_key = None
+    if model_kwargs.get("temperature") == 0:
+        cache_key = make_llm_cache_key(
+            api_key=api_key,
+            model=model,
+            messages=messages,
+            response_schema=response_model.model_json_schema(),
+            max_completion_tokens=max_completion_tokens,
+            **model_kwargs,
+        )
+        cached_response = await llm_cache.get(cache_key)
+        if cached_response is not None:
+            # Cached as JSON so every caller gets its own instance to modify
+            return response_model.model_validate_json(cached_response)
+
+    await throttle_openai_request(messages, max_completion_tokens)
+
+    response = await client.chat.completions.create(
         model=model,
         messages=messages,
         response_model=response_model,
         max_completion_tokens=max_completion_tokens,
-        store=True,
+        store=store,
         **model_kwargs,
     )
 
+    if cache_key is not None:
+        await llm_cache.set(cache_key, response.model_dump_json())
+
+    return response
+
+
+# Formatted course details are reused across exam generation requests for the
+# same course; kept short so edits that skip invalidation still show up quickly
+COURSE_CONTEXT_CACHE_TTL = 5 * 60
+COURSE_CONTEXT_CACHE_MAX_ENTRIES = 512
+
+course_context_cache = TTLCache(
+    max_entries=COURSE_CONTEXT_CACHE_MAX_ENTRIES, ttl=COURSE_CONTEXT_CACHE_TTL
+)
+
+
+async def invalidate_course_context(course_id: int):
+    """Drop the cached course details for a course after it changes"""
+    await course_context_cache.delete(str(course_id))
+
+
+def clear_course_context_cache():
+    """Drop all cached course details, for edits that are not tied to one course"""
+    course_context_cache.clear()
+
 
 async def format_course_details_for_ai(course_id: int) -> str:
     """
@@ -77,39 +294,45 @@ async def format_course_details_for_ai(course_id: int) -> str:
     Returns:
         Formatted string with course information for AI
     """
+    cached_course = await course_context_cache.get(str(course_id))
+    if cached_course is not None:
+        return cached_course
+
     try:
         course = await get_course_from_db(course_id, only_published=True)
         if not course:
             raise Exception(f"Course with ID {course_id} not found")
         
-        # Build comprehensive course information
-        course_info = []
-        course_info.append(f"**COURSE NAME**: {course['name']}")
+        # Build comprehensive course information; each piece after the first
+        # starts with its own line break
+        course_info = io.StringIO()
+        course_info.write(f"**COURSE NAME**: {course['name']}")
         
         # Add milestones and tasks
         if course.get('milestones'):
-            course_info.append("\n**COURSE STRUCTURE**:")
+            course_info.write("\n\n**COURSE STRUCTURE**:")
             for milestone in course['milestones']:
                 milestone_name = milestone.get('name', 'Unnamed Milestone')
-                course_info.append(f"\n📚 **{milestone_name}**")
+                course_info.write(f"\n\n📚 **{milestone_name}**")
                 
                 if milestone.get('tasks'):
                     for task in milestone['tasks']:
                         task_title = task.get('title', 'Untitled Task')
                         task_type = task.get('type', 'unknown')
-                        course_info.append(f"  • {task_title} ({task_type})")
+                        course_info.write(f"\n  • {task_title} ({task_type})")
                         if task.get('num_questions') and task_type == 'QUIZ':
-                            course_info.append(f"    [{task['num_questions']} questions]")
+                            course_info.write(f"\n    [{task['num_questions']} questions]")
                 else:
-                    course_info.append("  • No tasks available in this milestone")
+                    course_info.write("\n  • No tasks available in this milestone")
         else:
-            course_info.append("\n**COURSE STRUCTURE**: No structured milestones available")
+            course_info.write("\n\n**COURSE STRUCTURE**: No structured milestones available")
         
         # Add summary
-        course_info.append("\n**COURSE SCOPE**: This course covers comprehensive topics organized in structured milestones with various learning activities including quizzes, exercises, and projects.")
+        course_info.write("\n\n**COURSE SCOPE**: This course covers comprehensive topics organized in structured milestones with various learning activities including quizzes, exercises, and projects.")
         
-        formatted_course = "\n".join(course_info)
+        formatted_course = course_info.getvalue()
         logger.info(f"Formatted course details for course ID {course_id} ({len(formatted_course)} characters)")
+        await course_context_cache.set(str(course_id), formatted_course)
         return formatted_course
         
     except Exception as e:
@@ -117,16 +340,40 @@ async def format_course_details_for_ai(course_id: int) -> str:
         raise Exception(f"Failed to fetch course details: {str(e)}")
 
 
-@backoff.on_exception(backoff.expo, Exception, max_tries=5, factor=2)
+async def get_course_context_for_ai(course_id: Optional[int]) -> str:
+    """
+    Course context for exam generation prompts; empty when there is no course
+    or it could not be fetched, so generation can continue without it
+    """
+    if not course_id:
+        return ""
+
+    try:
+        return await format_course_details_for_ai(course_id)
+    except Exception as e:
+        logger.warning(f"Failed to fetch course details for course {course_id}: {e}")
+        return ""
+
+
+@backoff.on_exception(
+    backoff.expo,
+    TRANSIENT_OPENAI_ERRORS,
+    max_tries=5,
+    factor=0.1,
+    max_value=8,
+    jitter=backoff.full_jitter,
+    giveup=lambda e: not should_retry(e),
+)
 async def stream_llm_with_instructor(
     api_key: str,
     model: str,
     messages: List,
     response_model: BaseModel,
     max_completion_tokens: int,
+    store: bool = False,
     **kwargs,
 ):
-    client = instructor.from_openai(openai.AsyncOpenAI(api_key=api_key))
+    client = get_instructor_client(api_key)
 
     model_kwargs = {}
 
@@ -135,25 +382,36 @@ async def stream_llm_with_instructor(
 
     model_kwargs.update(kwargs)
 
+    await throttle_openai_request(messages, max_completion_tokens)
+
     return client.chat.completions.create_partial(
         model=model,
         messages=messages,
         response_model=response_model,
         stream=True,
         max_completion_tokens=max_completion_tokens,
-        store=True,
+        store=store,
         **model_kwargs,
     )
 
 
-@backoff.on_exception(backoff.expo, Exception, max_tries=5, factor=2)
+@backoff.on_exception(
+    backoff.expo,
+    TRANSIENT_OPENAI_ERRORS,
+    max_tries=5,
+    factor=0.1,
+    max_value=8,
+    jitter=backoff.full_jitter,
+    giveup=lambda e: not should_retry(e),
+)
 def stream_llm_with_openai(
     api_key: str,
     model: str,
     messages: List,
     max_completion_tokens: int,
+    store: bool = False,
 ):
-    client = openai.OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
 
     model_kwargs = {}
 
@@ -165,19 +423,138 @@ def stream_llm_with_openai(
         messages=messages,
         stream=True,
         max_completion_tokens=max_completion_tokens,
-        store=True,
+        store=store,
         **model_kwargs,
     )
 
 
-def should_retry(exception):
-    """Determine if we should retry the request based on the exception"""
-    error_str = str(exception).lower()
-    # Don't retry on authentication or billing errors
-    if any(term in error_str for term in ['invalid', 'unauthorized', 'quota', 'billing']):
-        return False
-    # Retry on other errors
-    return True
+@asynccontextmanager
+async def streamed_llm_with_instructor(*args, **kwargs):
+    """
+    Open a stream_llm_with_instructor stream that is closed on exit, even if
+    the caller stops iterating early or raises, so its connection goes back
+    to the pool
+    """
+    stream = await stream_llm_with_instructor(*args, **kwargs)
+    try:
+        yield stream
+    finally:
+        await stream.aclose()
+
+
+@contextmanager
+def streamed_llm_with_openai(*args, **kwargs):
+    """Open a stream_llm_with_openai stream that is closed on exit"""
+    stream = stream_llm_with_openai(*args, **kwargs)
+    try:
+        yield stream
+    finally:
+        stream.close()
+
+
+def log_prompt_cache_usage(usage):
+    """Log how much of a request's prompt was served from OpenAI's prompt cache"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is None:
+        return
+    logger.info(
+        "Prompt cache: %s of %s prompt tokens cached",
+        details.cached_tokens or 0,
+        usage.prompt_tokens,
+    )
+
+
+EXAM_EVALUATION_SYSTEM_PROMPT = """You are an expert educational analyst specializing in comprehensive exam evaluation. Provide detailed, actionable feedback that helps both students and teachers improve learning outcomes.
+
+You will be given an exam session: the exam context followed by a detailed analysis of each question and the student's answer.
+
+A comprehensive analysis covers the overall summary, a question-by-question analysis, knowledge gaps, learning recommendations (with a four-week study plan and external resources), a comparative analysis, visual insights and teacher insights. A request may ask for only some of these sections; provide exactly the sections requested.
+
+Make sure to:
+1. Provide specific, actionable feedback
+2. Include real YouTube URLs and educational resources when possible
+3. Give detailed explanations for wrong answers
+4. Suggest concrete improvement strategies
+5. Analyze learning patterns and knowledge gaps
+6. Provide both student and teacher perspectives
+7. Include comparative benchmarks
+8. Suggest alternative solution approaches where applicable
+
+Be thorough, constructive, and educational in your analysis."""
+
+# System messages are shared module-level dicts rather than rebuilt per call.
+# Nothing may mutate them: requests only serialize them, and callers extend
+# message lists by concatenation
+EXAM_EVALUATION_SYSTEM_MESSAGE = {"role": "system", "content": EXAM_EVALUATION_SYSTEM_PROMPT}
+
+# Only session-specific data goes in the user message so the static system
+# prompt above stays a byte-identical prefix for OpenAI prompt caching
+EXAM_EVALUATION_USER_PROMPT_TEMPLATE = Template("""EXAM CONTEXT:
+- Title: $exam_title
+- Description: $exam_description
+- Duration: $duration minutes
+- Time Taken: $time_taken_minutes minutes
+- Score: $score%
+- Student: $user_name
+- Questions: $questions_count
+
+DETAILED QUESTION ANALYSIS:
+$questions_and_answers_json
+""")
+
+
+def build_exam_evaluation_messages(exam_context: ExamContext) -> List[Dict]:
+    """Build the chat messages for a comprehensive exam evaluation"""
+    evaluation_prompt = EXAM_EVALUATION_USER_PROMPT_TEMPLATE.substitute(
+        exam_title=exam_context.exam_title,
+        exam_description=exam_context.exam_description,
+        duration=exam_context.duration,
+        time_taken_minutes=f"{exam_context.time_taken / 60:.1f}",
+        score=exam_context.score,
+        user_name=exam_context.user_name,
+        questions_count=len(exam_context.questions),
+        questions_and_answers_json=orjson.dumps(exam_context.questions_and_answers).decode(),
+    )
+
+    return [
+        EXAM_EVALUATION_SYSTEM_MESSAGE,
+        {
+            "role": "user",
+            "content": evaluation_prompt
+        }
+    ]
+
+
+# Section groups of ExamEvaluationReport, each generated by a separate call,
+# with the sections named in the request for that group
+EXAM_EVALUATION_SHARDS = (
+    (ExamSummaryEvaluation, "overall summary, comparative analysis and visual insights"),
+    (ExamQuestionsEvaluation, "question-by-question analysis and knowledge gaps"),
+    (ExamRecommendationsEvaluation, "learning recommendations"),
+    (ExamTeacherEvaluation, "teacher insights"),
+)
+EXAM_EVALUATION_SHARD_MAX_TOKENS = 4096
+# Ceiling for a full report generated in a single request
+EXAM_EVALUATION_MAX_TOKENS = 8192
+
+
+def build_evaluation_metadata(exam_context: ExamContext, model: str, total_tokens: int) -> dict:
+    """Build the evaluation_metadata attached to every exam evaluation report"""
+    duration = exam_context.duration
+    time_efficiency = round((exam_context.time_taken / 60) / duration * 100, 1) if duration > 0 else 0
+
+    return {
+        "model_used": model,
+        "evaluation_timestamp": datetime.now(timezone.utc).isoformat(),
+        "total_tokens": total_tokens,
+        "exam_context_summary": {
+            "exam_title": exam_context.exam_title,
+            "score": exam_context.score,
+            "time_efficiency": time_efficiency,
+            "questions_count": len(exam_context.questions)
+        }
+    }
+
 
 # Temporarily disable backoff to see actual errors
 # @backoff.on_exception(
@@ -189,7 +566,7 @@ def should_retry(exception):
 # )
 async def evaluate_exam_with_openai(
     api_key: str,
-    exam_context: dict,
+    exam_context: ExamContext,
     model: str = "gpt-4o"
 ) -> dict:
     """
@@ -197,199 +574,55 @@ async def evaluate_exam_with_openai(
     
     Args:
         api_key: OpenAI API key
-        exam_context: Dictionary containing all exam session data
+        exam_context: All exam session data needed for the evaluation
         model: OpenAI model to use for evaluation
     
     Returns:
         Detailed evaluation report as dictionary
     """
-    print(f"[DEBUG] evaluate_exam_with_openai function called with model: {model}")
-    client = OpenAI(api_key=api_key)
-    
-    # Extract key information from exam context
-    exam_title = exam_context.get("exam_title", "Unknown Exam")
-    exam_description = exam_context.get("exam_description", "")
-    duration = exam_context.get("duration", 0)
-    time_taken = exam_context.get("time_taken", 0)
-    score = exam_context.get("score", 0)
-    user_name = exam_context.get("user_name", "Student")
-    questions = exam_context.get("questions", [])
-    questions_and_answers = exam_context.get("questions_and_answers", [])
-    
-    # Create the detailed evaluation prompt
-    evaluation_prompt = f"""
-You are an expert educational analyst. Analyze this exam session and provide a comprehensive evaluation report.
-
-EXAM CONTEXT:
-- Title: {exam_title}
-- Description: {exam_description}
-- Duration: {duration} minutes
-- Time Taken: {time_taken/60:.1f} minutes
-- Score: {score}%
-- Student: {user_name}
-- Questions: {len(questions)}
-
-DETAILED QUESTION ANALYSIS:
-{json.dumps(questions_and_answers, indent=2)}
-
-Please provide a comprehensive analysis in the following JSON format:
-
-{{
-    "overall_summary": {{
-        "performance_level": "Excellent/Good/Average/Below Average/Poor",
-        "key_strengths": ["list of strengths"],
-        "key_weaknesses": ["list of weaknesses"],
-        "time_management": "analysis of time usage",
-        "overall_feedback": "detailed paragraph about overall performance"
-    }},
-    "question_by_question_analysis": [
-        {{
-            "question_number": 1,
-            "status": "correct/incorrect/partial",
-            "detailed_feedback": "specific feedback for this question",
-            "why_wrong": "explanation if incorrect",
-            "better_approach": "suggested better approach",
-            "related_concepts": ["list of related topics"],
-            "difficulty_level": "Easy/Medium/Hard"
-        }}
-    ],
-    "knowledge_gaps": [
-        {{
-            "topic": "specific topic area",
-            "severity": "High/Medium/Low",
-            "description": "detailed explanation of the gap",
-            "improvement_suggestions": "how to improve in this area"
-        }}
-    ],
-    "learning_recommendations": {{
-        "immediate_actions": ["things to do right now"],
-        "study_plan": {{
-            "week_1": ["specific topics and activities"],
-            "week_2": ["specific topics and activities"],
-            "week_3": ["specific topics and activities"],
-            "week_4": ["specific topics and activities"]
-        }},
-        "external_resources": [
-            {{
-                "type": "YouTube Video",
-                "title": "specific video title",
-                "url": "https://youtube.com/watch?v=example",
-                "description": "why this resource is helpful"
-            }},
-            {{
-                "type": "Article/Blog",
-                "title": "specific article title",
-                "url": "https://example.com/article",
-                "description": "why this resource is helpful"
-            }},
-            {{
-                "type": "Course",
-                "title": "course name",
-                "url": "https://example.com/course",
-                "description": "why this course is recommended"
-            }}
-        ],
-        "practice_suggestions": ["specific practice activities"]
-    }},
-    "comparative_analysis": {{
-        "grade_interpretation": "what this score means in academic context",
-        "improvement_potential": "how much improvement is possible",
-        "benchmark_comparison": "how this compares to typical students",
-        "next_level_requirements": "what's needed to reach next level"
-    }},
-    "visual_insights": {{
-        "strength_areas": [
-            {{"topic": "topic name", "score": 85.5}}
-        ],
-        "improvement_areas": [
-            {{"topic": "topic name", "priority": "High/Medium/Low"}}
-        ],
-        "time_distribution": {{
-            "estimated_per_question": {{"Q1": 2.5, "Q2": 3.0}},
-            "efficiency_rating": "Excellent/Good/Average/Poor"
-        }}
-    }},
-    "teacher_insights": {{
-        "teaching_recommendations": ["what teachers should focus on"],
-        "classroom_interventions": ["specific interventions needed"],
-        "peer_collaboration": "suggestions for peer learning",
-        "assessment_modifications": "how to modify future assessments"
-    }}
-}}
-
-Make sure to:
-1. Provide specific, actionable feedback
-2. Include real YouTube URLs and educational resources when possible
-3. Give detailed explanations for wrong answers
-4. Suggest concrete improvement strategies
-5. Analyze learning patterns and knowledge gaps
-6. Provide both student and teacher perspectives
-7. Include comparative benchmarks
-8. Suggest alternative solution approaches where applicable
+    logger.debug("evaluate_exam_with_openai called with model: %s", model)
+    client = get_instructor_client(api_key)
 
-Be thorough, constructive, and educational in your analysis.
-"""
+    messages = build_exam_evaluation_messages(exam_context)
 
     try:
-        print(f"[DEBUG] About to make OpenAI API call with model: {model}")
         logger.info("Starting comprehensive evaluation with OpenAI...")
         
-        completion = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert educational analyst specializing in comprehensive exam evaluation. Provide detailed, actionable feedback that helps both students and teachers improve learning outcomes."
-                },
-                {
-                    "role": "user",
-                    "content": evaluation_prompt
-                }
-            ],
-            response_format={"type": "json_object"},
-        )
-        
-        print("[DEBUG] OpenAI API call completed")
-        
-        logger.info(f"OpenAI completion received. Usage: {completion.usage}")
-        logger.info(f"Completion choices count: {len(completion.choices) if completion.choices else 0}")
-        
-        # Check if we got a valid response
-        if not completion.choices or not completion.choices[0].message.content:
-            logger.error("OpenAI returned empty response or no choices")
-            raise Exception("OpenAI returned empty response")
-        
-        content = completion.choices[0].message.content.strip()
-        if not content:
-            logger.error("OpenAI returned empty content")
-            raise Exception("OpenAI returned empty content")
-        
-        logger.info(f"OpenAI response content length: {len(content)}")
-        logger.info(f"OpenAI response content preview: {content[:500]}...")
-        
-        # Parse the JSON response
-        try:
-            evaluation_result = json.loads(content)
-            logger.info("Successfully parsed OpenAI response as JSON")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse OpenAI response as JSON: {e}")
-            logger.error(f"Raw content that failed to parse: {repr(content)}")
-            raise Exception(f"OpenAI response is not valid JSON: {str(e)}")
+        # Each section group is generated by its own call so the report takes
+        # as long as the slowest section rather than the sum of all of them.
+        # The section schema is sent out-of-band by instructor, which also
+        # validates each reply
+        async def evaluate_sections(response_model, sections):
+            section_messages = messages + [
+                {"role": "user", "content": f"Provide only the {sections} for this exam session."}
+            ]
+            max_tokens = fit_completion_tokens(model, section_messages, EXAM_EVALUATION_SHARD_MAX_TOKENS)
+            await throttle_openai_request(section_messages, max_tokens)
+            return await client.chat.completions.create_with_completion(
+                model=model,
+                messages=section_messages,
+                response_model=response_model,
+                max_completion_tokens=max_tokens,
+            )
+
+        results = await asyncio.gather(*(
+            evaluate_sections(response_model, sections)
+            for response_model, sections in EXAM_EVALUATION_SHARDS
+        ))
         
-        # Add metadata
-        evaluation_result["evaluation_metadata"] = {
-            "model_used": model,
-            "evaluation_timestamp": json.loads(json.dumps({"timestamp": "now"}, default=str)),
-            "total_tokens": completion.usage.total_tokens if completion.usage else 0,
-            "exam_context_summary": {
-                "exam_title": exam_title,
-                "score": score,
-                "time_efficiency": round((time_taken / 60) / duration * 100, 1) if duration > 0 else 0,
-                "questions_count": len(questions)
-            }
-        }
+        evaluation_result = {}
+        total_tokens = 0
+        for section_report, completion in results:
+            logger.info("OpenAI completion received. Usage: %s", completion.usage)
+            log_prompt_cache_usage(completion.usage)
+            evaluation_result.update(section_report.model_dump())
+            total_tokens += completion.usage.total_tokens if completion.usage else 0
+
+        evaluation_result["evaluation_metadata"] = build_evaluation_metadata(
+            exam_context, model, total_tokens
+        )
         
-        logger.info(f"Generated comprehensive exam evaluation for session {exam_context.get('session_id', 'unknown')}")
+        logger.info("Generated comprehensive exam evaluation for session %s", exam_context.session_id or "unknown")
         return evaluation_result
         
     except Exception as e:
@@ -397,101 +630,296 @@ Be thorough, constructive, and educational in your analysis.
         raise Exception(f"Failed to generate exam evaluation: {str(e)}")
 
 
-def create_simple_openai_evaluation(
-    api_key: str,
-    exam_data: dict,
-    model: str = "gpt-4o"
-) -> dict:
+# Function-calling schema for ExamEvaluationReport, as instructor sends it,
+# for requests that go through the Batch API instead of instructor
+EXAM_EVALUATION_TOOL = instructor.openai_schema(ExamEvaluationReport).openai_schema
+
+# Polling of submitted Batch API jobs, in seconds
+OPENAI_BATCH_POLL_INTERVAL = 30
+OPENAI_BATCH_MAX_POLL_INTERVAL = 600
+OPENAI_BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+async def submit_openai_batch(api_key: str, batch_requests: List[dict], filename: str) -> str:
+    """
+    Submit chat completion requests to the OpenAI Batch API, which costs half
+    as much as live requests and has its own, much larger quota
+    
+    Returns:
+        ID of the created batch
     """
-    Simple synchronous evaluation function as requested in the user prompt
+    client = get_async_openai_client(api_key)
+
+    batch_input = b"\n".join(orjson.dumps(request) for request in batch_requests)
+    batch_input_file = await client.files.create(
+        file=(filename, batch_input),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+async def wait_for_openai_batch(api_key: str, batch_id: str) -> Dict[str, object]:
     """
-    client = OpenAI(api_key=api_key)
+    Poll a batch from submit_openai_batch until it finishes
     
-    # Create a basic evaluation prompt
-    prompt = f"""
-Analyze this exam performance and provide educational insights:
+    Returns:
+        Mapping of custom_id to the chat completion body, or to the exception
+        describing why that request failed
+    """
+    client = get_async_openai_client(api_key)
+    poll_interval = OPENAI_BATCH_POLL_INTERVAL
 
-Exam: {exam_data.get('title', 'Unknown')}
-Score: {exam_data.get('score', 0)}%
-Time: {exam_data.get('time_taken', 0)} minutes
-Questions: {len(exam_data.get('questions', []))}
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in OPENAI_BATCH_TERMINAL_STATUSES:
+            break
+        await asyncio.sleep(poll_interval)
+        poll_interval = min(poll_interval * 2, OPENAI_BATCH_MAX_POLL_INTERVAL)
 
-Student answers: {json.dumps(exam_data.get('answers', {}), indent=2)}
-Questions: {json.dumps(exam_data.get('questions', []), indent=2)}
+    if batch.status != "completed" or not batch.output_file_id:
+        raise Exception(f"Batch {batch_id} ended with status {batch.status}")
 
-Provide a comprehensive analysis with strengths, weaknesses, and improvement suggestions.
-"""
+    output = await client.files.content(batch.output_file_id)
+
+    results = {}
+    for line in output.content.splitlines():
+        if not line:
+            continue
+        item = orjson.loads(line)
+        response = item.get("response") or {}
+        if response.get("status_code") != 200:
+            results[item["custom_id"]] = Exception(f"Batch request failed: {item.get('error') or response}")
+            continue
+
+        results[item["custom_id"]] = response["body"]
+
+    return results
+
+
+def build_exam_evaluation_batch_request(custom_id: str, exam_context: ExamContext, model: str) -> dict:
+    """Build one line of a Batch API input file for a full exam evaluation"""
+    messages = build_exam_evaluation_messages(exam_context)
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model,
+            "messages": messages,
+            "tools": [{"type": "function", "function": EXAM_EVALUATION_TOOL}],
+            "tool_choice": {"type": "function", "function": {"name": EXAM_EVALUATION_TOOL["name"]}},
+            "max_completion_tokens": fit_completion_tokens(model, messages, EXAM_EVALUATION_MAX_TOKENS),
+        },
+    }
+
+
+async def submit_exam_evaluation_batch(
+    api_key: str,
+    exam_contexts: List[ExamContext],
+    model: str = "gpt-4o",
+) -> str:
+    """
+    Submit exam evaluations to the OpenAI Batch API, which costs half as much
+    as live requests and has its own, much larger quota. Each request's
+    custom_id is the index of its context in exam_contexts.
     
-    completion = client.chat.completions.create(
-        model=model,
-        messages=[
-            {
-                "role": "user", 
-                "content": prompt
-            }
-        ]
+    Returns:
+        ID of the created batch
+    """
+    batch_id = await submit_openai_batch(
+        api_key,
+        [
+            build_exam_evaluation_batch_request(str(index), exam_context, model)
+            for index, exam_context in enumerate(exam_contexts)
+        ],
+        "exam_evaluations.jsonl",
     )
+
+    logger.info("Submitted exam evaluation batch %s with %s requests", batch_id, len(exam_contexts))
+    return batch_id
+
+
+async def wait_for_exam_evaluation_batch(api_key: str, batch_id: str) -> Dict[str, object]:
+    """
+    Poll a batch from submit_exam_evaluation_batch until it finishes
     
-    return {
-        "analysis": completion.choices[0].message.content,
-        "model_used": model
-    }
+    Returns:
+        Mapping of custom_id to a (report, total_tokens) pair, or to the
+        exception describing why that request failed
+    """
+    results = await wait_for_openai_batch(api_key, batch_id)
 
+    for custom_id, body in results.items():
+        if isinstance(body, Exception):
+            continue
 
-async def generate_exam_questions_with_openai(
+        try:
+            arguments = body["choices"][0]["message"]["tool_calls"][0]["function"]["arguments"]
+            report = ExamEvaluationReport.model_validate_json(arguments).model_dump()
+            results[custom_id] = (report, (body.get("usage") or {}).get("total_tokens", 0))
+        except Exception as e:
+            results[custom_id] = e
+
+    return results
+
+
+# Default cap on in-flight evaluations per batch; well under OPENAI_HTTP_LIMITS
+# and low enough to avoid tripping per-key rate limits
+EXAM_EVALUATION_BATCH_CONCURRENCY = 16
+
+
+async def evaluate_exams_batch(
     api_key: str,
-    title: str,
-    description: str,
-    max_questions: int = 10,
+    exam_contexts: List[ExamContext],
     model: str = "gpt-4o",
-    course_id: int = None
-) -> dict:
+    max_concurrency: int = EXAM_EVALUATION_BATCH_CONCURRENCY,
+    batch: bool = False,
+) -> List:
     """
-    Generate exam questions using OpenAI GPT-4o
+    Evaluate several exam sessions concurrently.
     
     Args:
         api_key: OpenAI API key
-        title: Exam title
-        description: Exam description/topic
-        max_questions: Maximum number of questions to generate
-        model: OpenAI model to use
-        course_id: Optional course ID to base exam on course content
+        exam_contexts: List of exam contexts, as passed to evaluate_exam_with_openai
+        model: Model to use for evaluation
+        max_concurrency: Maximum number of evaluations in flight at once
+        batch: Go through the OpenAI Batch API instead of live requests. Meant
+            for background jobs such as end-of-term grading: it is half the
+            cost but results can take up to 24 hours
         
     Returns:
-        Dictionary with generated questions and metadata
+        List with one entry per context, in order: the evaluation report, or
+        the exception raised while evaluating that session
     """
-    try:
-        client = OpenAI(api_key=api_key)
-        
-        # Get course details if course_id is provided
-        course_context = ""
-        if course_id:
-            try:
-                course_context = await format_course_details_for_ai(course_id)
-                # Update description to include course context
-                description = f"{description}\n\nBased on the course content detailed below:\n{course_context}"
-            except Exception as e:
-                logger.warning(f"Failed to fetch course details for course {course_id}: {e}")
-                # Continue without course context
-        
-        # Create a detailed prompt for question generation
-        generation_prompt = f"""
-You are an expert educational content creator. Generate a comprehensive exam based on the following requirements:
-
-EXAM DETAILS:
-- Title: {title}
-- Description: {description}
-- Number of Questions: {max_questions}
+    if batch:
+        batch_id = await submit_exam_evaluation_batch(api_key, exam_contexts, model)
+        results = await wait_for_exam_evaluation_batch(api_key, batch_id)
+
+        reports = []
+        for index, exam_context in enumerate(exam_contexts):
+            result = results.get(str(index), Exception(f"No batch result for exam context {index}"))
+            if isinstance(result, Exception):
+                reports.append(result)
+                continue
+
+            report, total_tokens = result
+            report["evaluation_metadata"] = build_evaluation_metadata(exam_context, model, total_tokens)
+            reports.append(report)
+        return reports
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def evaluate(exam_context: ExamContext) -> dict:
+        async with semaphore:
+            return await evaluate_exam_with_openai(api_key, exam_context, model)
+
+    return await asyncio.gather(
+        *(evaluate(exam_context) for exam_context in exam_contexts),
+        return_exceptions=True,
+    )
 
-{'COURSE-BASED EXAM: This exam should be specifically designed based on the course structure, milestones, and tasks provided in the description above. Create questions that align with the learning objectives and content covered in the course.' if course_id else 'TOPIC-BASED EXAM: This exam should comprehensively cover the topic described above.'}
 
-Please create {max_questions} high-quality exam questions that thoroughly assess knowledge on the given topic{'s and course content' if course_id else ''}. Include a variety of question types and difficulty levels.
+async def stream_exam_evaluation_with_openai(
+    api_key: str,
+    exam_context: ExamContext,
+    model: str = "gpt-4o",
+) -> AsyncIterator[ExamEvaluationReport]:
+    """
+    Stream a comprehensive exam evaluation as progressively filled partial reports
+
+    Yields partial ExamEvaluationReport objects so callers can render sections
+    (e.g. overall_summary) as soon as they are generated instead of waiting for
+    the full report.
+    """
+    messages = build_exam_evaluation_messages(exam_context)
+    async with streamed_llm_with_instructor(
+        api_key=api_key,
+        model=model,
+        messages=messages,
+        response_model=ExamEvaluationReport,
+        max_completion_tokens=fit_completion_tokens(model, messages, EXAM_EVALUATION_MAX_TOKENS),
+    ) as stream:
+        async for partial_report in stream:
+            yield partial_report
+
+
+def build_simple_evaluation_prompt(exam_data: dict) -> str:
+    """Build the prompt shared by the sync and async simple evaluations"""
+    return f"""
+Analyze this exam performance and provide educational insights:
+
+Exam: {exam_data.get('title', 'Unknown')}
+Score: {exam_data.get('score', 0)}%
+Time: {exam_data.get('time_taken', 0)} minutes
+Questions: {len(exam_data.get('questions', []))}
+
+Student answers: {orjson.dumps(exam_data.get('answers', {})).decode()}
+Questions: {orjson.dumps(exam_data.get('questions', [])).decode()}
+
+Provide a comprehensive analysis with strengths, weaknesses, and improvement suggestions.
+"""
+
+
+async def create_simple_openai_evaluation(
+    api_key: str,
+    exam_data: dict,
+    model: str = "gpt-4o"
+) -> dict:
+    """
+    Simple evaluation function as requested in the user prompt
+    """
+    client = get_async_openai_client(api_key)
+
+    completion = await client.chat.completions.create(
+        model=model,
+        messages=[
+            {
+                "role": "user",
+                "content": build_simple_evaluation_prompt(exam_data)
+            }
+        ]
+    )
+
+    return {
+        "analysis": completion.choices[0].message.content,
+        "model_used": model
+    }
+
+
+def create_simple_openai_evaluation_sync(
+    api_key: str,
+    exam_data: dict,
+    model: str = "gpt-4o"
+) -> dict:
+    """
+    Run create_simple_openai_evaluation from synchronous code, e.g. scripts
+    """
+    async def evaluate():
+        try:
+            return await create_simple_openai_evaluation(api_key, exam_data, model)
+        finally:
+            # The cached async clients are bound to this event loop
+            await close_async_openai_clients()
+
+    return asyncio.run(evaluate())
+
+
+# Static part of the question generation prompt, sent as the system message so
+# it forms a stable prefix for OpenAI prompt caching
+EXAM_GENERATION_SYSTEM_PROMPT = """You are an expert educational content creator specializing in creating comprehensive, fair, and educationally valuable exam questions. Always respond with valid JSON.
+
+You will be given the exam details and the number of questions to generate. Include a variety of question types and difficulty levels.
 
 Provide your response in the following JSON format:
 
-{{
+{
     "questions": [
-        {{
+        {
             "id": "q1",
             "type": "multiple_choice",
             "question": "Your question text here",
@@ -503,42 +931,42 @@ Provide your response in the following JSON format:
             ],
             "correct_answer": "Option A",
             "points": 2
-        }},
-        {{
+        },
+        {
             "id": "q2",
             "type": "text",
             "question": "Short answer question here",
             "correct_answer": "Expected answer",
             "points": 3
-        }},
-        {{
+        },
+        {
             "id": "q3",
             "type": "essay",
             "question": "Essay question requiring detailed response",
             "points": 10
-        }},
-        {{
+        },
+        {
             "id": "q4",
             "type": "code",
             "question": "Programming question here",
             "correct_answer": "// Sample solution code",
             "points": 15,
-            "metadata": {{"language": "javascript"}}
-        }}
+            "metadata": {"language": "javascript"}
+        }
     ],
-    "exam_metadata": {{
+    "exam_metadata": {
         "suggested_duration": 60,
         "difficulty_level": "Medium",
         "topics_covered": ["Topic 1", "Topic 2", "Topic 3"],
-        "question_distribution": {{
+        "question_distribution": {
             "multiple_choice": 4,
             "text": 3,
             "essay": 2,
             "code": 1
-        }},
+        },
         "total_points": 45
-    }}
-}}
+    }
+}
 
 GUIDELINES:
 1. Create diverse question types: multiple_choice, text, essay, and code (if relevant to the topic)
@@ -551,38 +979,113 @@ GUIDELINES:
 8. Cover different aspects and difficulty levels of the topic
 9. Make questions educational and assessment-worthy
 10. Ensure all questions are directly related to the exam topic
-{'11. COURSE-ALIGNED QUESTIONS: When course content is provided, create questions that specifically assess the milestones, tasks, and learning objectives covered in the course structure. Include questions that span across different milestones and difficulty levels appropriate for the course content.' if course_id else ''}
 
-Make sure each question ID is unique (q1, q2, q3, etc.) and that the JSON is properly formatted.
-"""
+Make sure each question ID is unique (q1, q2, q3, etc.) and that the JSON is properly formatted."""
+
+EXAM_GENERATION_SYSTEM_MESSAGE = {"role": "system", "content": EXAM_GENERATION_SYSTEM_PROMPT}
+
+# Only the exam specifics go in the user message; the format and guidelines
+# live in EXAM_GENERATION_SYSTEM_PROMPT
+EXAM_GENERATION_USER_PROMPT_TEMPLATE = Template("""EXAM DETAILS:
+- Title: $title
+- Description: $description
+- Number of Questions: $max_questions
+
+$exam_scope
+
+Please create $max_questions high-quality exam questions that thoroughly assess knowledge on the given topic$topic_suffix.
+$course_instructions
+""")
+
+EXAM_GENERATION_COURSE_SCOPE = "COURSE-BASED EXAM: This exam should be specifically designed based on the course structure, milestones, and tasks provided in the description above. Create questions that align with the learning objectives and content covered in the course."
+EXAM_GENERATION_TOPIC_SCOPE = "TOPIC-BASED EXAM: This exam should comprehensively cover the topic described above."
+EXAM_GENERATION_COURSE_INSTRUCTIONS = "When course content is provided, create questions that specifically assess the milestones, tasks, and learning objectives covered in the course structure. Include questions that span across different milestones and difficulty levels appropriate for the course content."
+
+# Completion budget for generated exams: each question with its options,
+# answer and metadata, plus the exam_metadata block
+EXAM_GENERATION_TOKENS_PER_QUESTION = 400
+EXAM_GENERATION_METADATA_TOKENS = 512
+
+
+async def generate_exam_questions_with_openai(
+    api_key: str,
+    title: str,
+    description: str,
+    max_questions: int = 10,
+    model: str = "gpt-4o",
+    course_id: int = None,
+    course_context: Optional[str] = None
+) -> dict:
+    """
+    Generate exam questions using OpenAI GPT-4o
+    
+    Args:
+        api_key: OpenAI API key
+        title: Exam title
+        description: Exam description/topic
+        max_questions: Maximum number of questions to generate
+        model: OpenAI model to use
+        course_id: Optional course ID to base exam on course content
+        course_context: Pre-fetched output of format_course_details_for_ai for
+            course_id, so callers running several generators share one lookup
+        
+    Returns:
+        Dictionary with generated questions and metadata
+    """
+    try:
+        client = get_async_openai_client(api_key)
+        
+        # Get course details if course_id is provided
+        if course_context is None:
+            course_context = await get_course_context_for_ai(course_id)
+        if course_context:
+            # Update description to include course context
+            description = f"{description}\n\nBased on the course content detailed below:\n{course_context}"
+        
+        generation_prompt = EXAM_GENERATION_USER_PROMPT_TEMPLATE.substitute(
+            title=title,
+            description=description,
+            max_questions=max_questions,
+            exam_scope=EXAM_GENERATION_COURSE_SCOPE if course_id else EXAM_GENERATION_TOPIC_SCOPE,
+            topic_suffix="s and course content" if course_id else "",
+            course_instructions=EXAM_GENERATION_COURSE_INSTRUCTIONS if course_id else "",
+        )
 
         logger.info("Generating exam questions with OpenAI...")
         
-        completion = client.chat.completions.create(
+        messages = [
+            EXAM_GENERATION_SYSTEM_MESSAGE,
+            {
+                "role": "user",
+                "content": generation_prompt
+            }
+        ]
+        max_tokens = fit_completion_tokens(
+            model,
+            messages,
+            EXAM_GENERATION_TOKENS_PER_QUESTION * max_questions + EXAM_GENERATION_METADATA_TOKENS,
+        )
+        await throttle_openai_request(messages, max_tokens)
+
+        completion = await client.chat.completions.create(
             model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert educational content creator specializing in creating comprehensive, fair, and educationally valuable exam questions. Always respond with valid JSON."
-                },
-                {
-                    "role": "user",
-                    "content": generation_prompt
-                }
-            ],
+            messages=messages,
             response_format={"type": "json_object"},
             temperature=0.7,  # Slightly higher temperature for creativity
+            max_tokens=max_tokens
         )
         
         logger.info(f"OpenAI completion received. Usage: {completion.usage}")
+        log_prompt_cache_usage(completion.usage)
         
         # Check if we got a valid response
         if not completion.choices or not completion.choices[0].message.content:
             logger.error("OpenAI returned empty response or no choices")
             raise Exception("OpenAI returned empty response")
         
-        content = completion.choices[0].message.content.strip()
-        if not content:
+        # orjson skips surrounding whitespace itself, so parse the content as is
+        content = completion.choices[0].message.content
+        if content.isspace():
             logger.error("OpenAI returned empty content")
             raise Exception("OpenAI returned empty content")
         
@@ -590,9 +1093,9 @@ Make sure each question ID is unique (q1, q2, q3, etc.) and that the JSON is pro
         
         # Parse the JSON response
         try:
-            result = json.loads(content)
+            result = orjson.loads(content)
             logger.info("Successfully parsed OpenAI response as JSON")
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse OpenAI response as JSON: {e}")
             logger.error(f"Raw content that failed to parse: {repr(content)}")
             raise Exception(f"OpenAI response is not valid JSON: {str(e)}")
@@ -608,7 +1111,7 @@ Make sure each question ID is unique (q1, q2, q3, etc.) and that the JSON is pro
         # Add metadata
         result["generation_metadata"] = {
             "model_used": model,
-            "generation_timestamp": json.loads(json.dumps({"timestamp": "now"}, default=str)),
+            "generation_timestamp": datetime.now(timezone.utc).isoformat(),
             "total_tokens": completion.usage.total_tokens if completion.usage else 0,
             "questions_generated": len(questions),
             "course_based": course_id is not None,
@@ -623,11 +1126,44 @@ Make sure each question ID is unique (q1, q2, q3, etc.) and that the JSON is pro
         raise Exception(f"Failed to generate exam questions: {str(e)}")
 
 
+EXAM_DESCRIPTION_SYSTEM_PROMPT = "You are an expert educational content creator specializing in creating clear, comprehensive exam descriptions that help students understand what to expect."
+EXAM_DESCRIPTION_SYSTEM_MESSAGE = {"role": "system", "content": EXAM_DESCRIPTION_SYSTEM_PROMPT}
+EXAM_DESCRIPTIONS_BULK_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": f"{EXAM_DESCRIPTION_SYSTEM_PROMPT} Always respond with valid JSON."
+}
+
+EXAM_DESCRIPTION_PROMPT_TEMPLATE = Template("""
+You are an expert educational content creator. Based on the exam title provided$course_source, generate a comprehensive and professional exam description.
+
+EXAM TITLE: "$title"
+
+$course_context
+
+Generate a detailed description that:
+1. Clearly explains what topics and concepts will be covered
+2. Describes the scope and depth of the assessment
+3. Mentions the types of skills being evaluated
+4. Sets appropriate expectations for students
+5. Is professional and educational in tone
+6. Is 2-4 sentences long
+7. Is specific to the subject matter indicated by the title
+$course_guideline
+
+The description should help students understand what to expect and how to prepare for the exam.
+
+Return only the description text, without quotes or additional formatting.
+""")
+
+EXAM_DESCRIPTION_COURSE_GUIDELINE = "8. COURSE-ALIGNED: When course content is provided, ensure the description reflects the specific milestones, tasks, and learning objectives covered in the course structure."
+
+
 async def generate_exam_description_with_openai(
     api_key: str,
     title: str,
     model: str = "gpt-4o",
-    course_id: int = None
+    course_id: int = None,
+    course_context: Optional[str] = None
 ) -> str:
     """
     Generate exam description based on the title using OpenAI GPT-4o
@@ -637,59 +1173,40 @@ async def generate_exam_description_with_openai(
         title: Exam title to base the description on
         model: OpenAI model to use
         course_id: Optional course ID to base description on course content
+        course_context: Pre-fetched output of format_course_details_for_ai for
+            course_id, so callers running several generators share one lookup
         
     Returns:
         Generated description string
     """
     try:
-        client = OpenAI(api_key=api_key)
+        client = get_async_openai_client(api_key)
         
         # Get course details if course_id is provided
-        course_context = ""
-        if course_id:
-            try:
-                course_context = await format_course_details_for_ai(course_id)
-            except Exception as e:
-                logger.warning(f"Failed to fetch course details for course {course_id}: {e}")
-                # Continue without course context
+        if course_context is None:
+            course_context = await get_course_context_for_ai(course_id)
         
-        # Create a prompt for description generation
-        description_prompt = f"""
-You are an expert educational content creator. Based on the exam title provided{'and course content' if course_id else ''}, generate a comprehensive and professional exam description.
-
-EXAM TITLE: "{title}"
-
-{f'COURSE CONTEXT:\n{course_context}\n' if course_context else ''}
-
-Generate a detailed description that:
-1. Clearly explains what topics and concepts will be covered
-2. Describes the scope and depth of the assessment
-3. Mentions the types of skills being evaluated
-4. Sets appropriate expectations for students
-5. Is professional and educational in tone
-6. Is 2-4 sentences long
-7. Is specific to the subject matter indicated by the title
-{f'8. COURSE-ALIGNED: When course content is provided, ensure the description reflects the specific milestones, tasks, and learning objectives covered in the course structure.' if course_id else ''}
-
-The description should help students understand what to expect and how to prepare for the exam.
-
-Return only the description text, without quotes or additional formatting.
-"""
+        description_prompt = EXAM_DESCRIPTION_PROMPT_TEMPLATE.substitute(
+            title=title,
+            course_source=" and course content" if course_id else "",
+            course_context=f"COURSE CONTEXT:\n{course_context}\n" if course_context else "",
+            course_guideline=EXAM_DESCRIPTION_COURSE_GUIDELINE if course_id else "",
+        )
 
         logger.info("Generating exam description with OpenAI...")
         
-        completion = client.chat.completions.create(
+        messages = [
+            EXAM_DESCRIPTION_SYSTEM_MESSAGE,
+            {
+                "role": "user",
+                "content": description_prompt
+            }
+        ]
+        await throttle_openai_request(messages, 300)
+
+        completion = await client.chat.completions.create(
             model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert educational content creator specializing in creating clear, comprehensive exam descriptions that help students understand what to expect."
-                },
-                {
-                    "role": "user",
-                    "content": description_prompt
-                }
-            ],
+            messages=messages,
             temperature=0.5,  # Balanced creativity and consistency
             max_tokens=300  # Limit description length
         )
@@ -714,35 +1231,10 @@ Return only the description text, without quotes or additional formatting.
         raise Exception(f"Failed to generate exam description: {str(e)}")
 
 
-async def generate_surprise_viva_questions(
-    api_key: str,
-    original_questions: list,
-    exam_context: dict,
-    model: str = "gpt-4o-mini"  # Using 4o-mini as the current equivalent to 4.1-nano
-) -> dict:
-    """
-    Generate 1-2 similar questions for surprise viva when cheating is detected
-    
-    Args:
-        api_key: OpenAI API key
-        original_questions: List of original exam questions
-        exam_context: Context about the exam and student behavior
-        model: OpenAI model to use
-        
-    Returns:
-        Dictionary with generated viva questions and answers
-    """
-    try:
-        client = OpenAI(api_key=api_key)
-        
-        # Create context for the AI
-        questions_context = "\n".join([
-            f"Q{i+1}: {q.get('question', 'Unknown question')}" 
-            for i, q in enumerate(original_questions[:3])  # Limit to first 3 for context
-        ])
-        
-        # Create prompt for viva question generation
-        viva_prompt = f"""
+SURPRISE_VIVA_SYSTEM_PROMPT = "You are an expert exam proctor who creates fair but effective verification questions to detect genuine understanding. Always respond with valid JSON."
+SURPRISE_VIVA_SYSTEM_MESSAGE = {"role": "system", "content": SURPRISE_VIVA_SYSTEM_PROMPT}
+
+SURPRISE_VIVA_PROMPT_TEMPLATE = Template("""
 You are an expert exam proctor who needs to create surprise viva questions to verify student understanding.
 
 CONTEXT:
@@ -751,11 +1243,11 @@ CONTEXT:
 - Questions should test the same concepts but with different wording/examples
 
 ORIGINAL EXAM QUESTIONS:
-{questions_context}
+$questions_context
 
 EXAM DETAILS:
-- Subject: {exam_context.get('title', 'Unknown')}
-- Level: {exam_context.get('description', 'General assessment')}
+- Subject: $title
+- Level: $description
 
 REQUIREMENTS:
 1. Generate exactly 2 questions that test similar concepts to the original questions
@@ -766,47 +1258,154 @@ REQUIREMENTS:
 
 Generate questions in this JSON format:
 
-{{
+{
     "viva_questions": [
-        {{
+        {
             "id": "viva_1",
             "question": "Clear, specific question testing understanding",
             "expected_answer": "Brief expected answer or key points",
             "difficulty": "same",
             "time_limit": 180
-        }},
-        {{
+        },
+        {
             "id": "viva_2", 
             "question": "Another question testing related concepts",
             "expected_answer": "Brief expected answer or key points",
             "difficulty": "same",
             "time_limit": 180
-        }}
+        }
     ],
     "instructions": "Answer these questions to verify your understanding. This is a standard verification process."
-}}
+}
 
 Make the questions fair but effective at detecting genuine understanding vs. copied answers.
-"""
+""")
+
+
+# Surprise vivas are triggered per flagged session, so a burst of cheating
+# events can fan out into many requests at once
+SURPRISE_VIVA_CONCURRENCY = 10
+
+
+@backoff.on_exception(
+    backoff.expo,
+    TRANSIENT_OPENAI_ERRORS,
+    max_tries=3,
+    factor=0.5,
+    max_value=8,
+    jitter=backoff.full_jitter,
+    giveup=lambda e: not should_retry(e),
+)
+async def create_viva_completion(client: openai.AsyncOpenAI, model: str, messages: List, max_tokens: int):
+    await throttle_openai_request(messages, max_tokens)
+
+    return await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        response_format={"type": "json_object"},
+        temperature=0.7,  # Balanced creativity and consistency
+        max_tokens=max_tokens  # Limit for concise questions
+    )
+
+
+def build_surprise_viva_messages(original_questions: list, exam_context: dict) -> List[Dict]:
+    """Build the messages shared by the regular and streaming viva generation"""
+    questions_context = "\n".join([
+        f"Q{i+1}: {q.get('question', 'Unknown question')}" 
+        for i, q in enumerate(original_questions[:3])  # Limit to first 3 for context
+    ])
+
+    viva_prompt = SURPRISE_VIVA_PROMPT_TEMPLATE.substitute(
+        questions_context=questions_context,
+        title=exam_context.get('title', 'Unknown'),
+        description=exam_context.get('description', 'General assessment'),
+    )
+
+    return [
+        SURPRISE_VIVA_SYSTEM_MESSAGE,
+        {
+            "role": "user",
+            "content": viva_prompt
+        }
+    ]
+
+
+def parse_surprise_viva_content(content: str, model: str, total_tokens: int) -> dict:
+    """Parse and check a viva generation response and add its generation metadata"""
+    # Parse the JSON response
+    try:
+        result = orjson.loads(content)
+        logger.info("Successfully parsed viva questions response as JSON")
+    except orjson.JSONDecodeError as e:
+        logger.error(f"Failed to parse viva questions response as JSON: {e}")
+        logger.error(f"Raw content: {repr(content)}")
+        raise Exception(f"OpenAI response is not valid JSON: {str(e)}")
+    
+    # Validate the structure
+    if "viva_questions" not in result:
+        raise Exception("Generated content missing 'viva_questions' field")
+    
+    questions = result["viva_questions"]
+    if not isinstance(questions, list) or len(questions) == 0:
+        raise Exception("No viva questions generated")
+    
+    # Add metadata
+    result["generation_metadata"] = {
+        "model_used": model,
+        "generation_timestamp": datetime.now(timezone.utc).isoformat(),
+        "total_tokens": total_tokens,
+        "questions_generated": len(questions),
+        "trigger": "cheating_detection"
+    }
+    
+    logger.info(f"Generated {len(questions)} surprise viva questions successfully")
+    return result
+
+
+def build_surprise_viva_batch_request(
+    custom_id: str, original_questions: list, exam_context: dict, model: str
+) -> dict:
+    """Build one line of a Batch API input file for a surprise viva"""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model,
+            "messages": build_surprise_viva_messages(original_questions, exam_context),
+            "response_format": {"type": "json_object"},
+            "temperature": 0.7,
+            "max_tokens": 1000,
+        },
+    }
+
+
+async def generate_surprise_viva_questions(
+    api_key: str,
+    original_questions: list,
+    exam_context: dict,
+    model: str = "gpt-4o-mini"  # Using 4o-mini as the current equivalent to 4.1-nano
+) -> dict:
+    """
+    Generate 1-2 similar questions for surprise viva when cheating is detected
+    
+    Args:
+        api_key: OpenAI API key
+        original_questions: List of original exam questions
+        exam_context: Context about the exam and student behavior
+        model: OpenAI model to use
+        
+    Returns:
+        Dictionary with generated viva questions and answers
+    """
+    try:
+        client = get_async_openai_client(api_key)
 
         logger.info("Generating surprise viva questions with OpenAI...")
         
-        completion = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert exam proctor who creates fair but effective verification questions to detect genuine understanding. Always respond with valid JSON."
-                },
-                {
-                    "role": "user",
-                    "content": viva_prompt
-                }
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.7,  # Balanced creativity and consistency
-            max_tokens=1000  # Limit for concise questions
-        )
+        messages = build_surprise_viva_messages(original_questions, exam_context)
+
+        completion = await create_viva_completion(client, model, messages, 1000)
         
         logger.info(f"OpenAI viva generation completed. Usage: {completion.usage}")
         
@@ -815,40 +1414,337 @@ Make the questions fair but effective at detecting genuine understanding vs. cop
             logger.error("OpenAI returned empty response for viva generation")
             raise Exception("OpenAI returned empty response")
         
-        content = completion.choices[0].message.content.strip()
-        if not content:
+        # orjson skips surrounding whitespace itself, so parse the content as is
+        content = completion.choices[0].message.content
+        if content.isspace():
             logger.error("OpenAI returned empty content for viva generation")
             raise Exception("OpenAI returned empty content")
         
-        # Parse the JSON response
-        try:
-            result = json.loads(content)
-            logger.info("Successfully parsed viva questions response as JSON")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse viva questions response as JSON: {e}")
-            logger.error(f"Raw content: {repr(content)}")
-            raise Exception(f"OpenAI response is not valid JSON: {str(e)}")
-        
-        # Validate the structure
-        if "viva_questions" not in result:
-            raise Exception("Generated content missing 'viva_questions' field")
-        
-        questions = result["viva_questions"]
-        if not isinstance(questions, list) or len(questions) == 0:
-            raise Exception("No viva questions generated")
-        
-        # Add metadata
-        result["generation_metadata"] = {
-            "model_used": model,
-            "generation_timestamp": json.dumps({"timestamp": "now"}, default=str),
-            "total_tokens": completion.usage.total_tokens if completion.usage else 0,
-            "questions_generated": len(questions),
-            "trigger": "cheating_detection"
-        }
-        
-        logger.info(f"Generated {len(questions)} surprise viva questions successfully")
-        return result
+        return parse_surprise_viva_content(
+            content, model, completion.usage.total_tokens if completion.usage else 0
+        )
         
     except Exception as e:
         logger.error(f"Error in surprise viva generation: {str(e)}")
         raise Exception(f"Failed to generate surprise viva questions: {str(e)}")
+
+
+async def stream_surprise_viva_questions(
+    api_key: str,
+    original_questions: list,
+    exam_context: dict,
+    model: str = "gpt-4o-mini",
+) -> AsyncIterator[dict]:
+    """
+    Stream surprise viva questions one at a time as they are generated
+
+    Each question is yielded once the model has moved on to the next one (or
+    finished), so it is complete, letting callers show the first question
+    without waiting for the whole response.
+    """
+    messages = build_surprise_viva_messages(original_questions, exam_context)
+
+    questions = []
+    emitted = 0
+    async with streamed_llm_with_instructor(
+        api_key=api_key,
+        model=model,
+        messages=messages,
+        response_model=SurpriseVivaQuestions,
+        max_completion_tokens=1000,
+        temperature=0.7,
+    ) as stream:
+        async for partial in stream:
+            questions = partial.viva_questions or []
+            # Every question but the last one in a partial has been closed
+            while emitted < len(questions) - 1:
+                yield questions[emitted].model_dump()
+                emitted += 1
+
+    for question in questions[emitted:]:
+        yield question.model_dump()
+
+
+async def generate_surprise_viva_questions_concurrently(
+    api_key: str,
+    sessions: List[Dict],
+    model: str = "gpt-4o-mini",
+    max_concurrency: int = SURPRISE_VIVA_CONCURRENCY,
+    batch: bool = False,
+) -> List:
+    """
+    Generate surprise viva questions for several flagged sessions with one
+    request per session, running up to `max_concurrency` requests at once
+
+    Args:
+        api_key: OpenAI API key
+        sessions: One dict per session with the `original_questions`,
+            `exam_context` arguments of
+            `generate_surprise_viva_questions`
+        model: OpenAI model to use
+        max_concurrency: Maximum number of requests in flight at once
+        batch: Go through the OpenAI Batch API instead of live requests. Only
+            for triggers that are not real time (e.g. preparing vivas ahead
+            of an exam): it is half the cost but results can take up to 24
+            hours
+
+    Returns:
+        List with one entry per session, in order: the generated viva
+        questions, or the exception raised for that session
+    """
+    if batch:
+        batch_id = await submit_openai_batch(
+            api_key,
+            [
+                build_surprise_viva_batch_request(
+                    str(index),
+                    session.get("original_questions", []),
+                    session.get("exam_context", {}),
+                    model,
+                )
+                for index, session in enumerate(sessions)
+            ],
+            "surprise_vivas.jsonl",
+        )
+        logger.info("Submitted surprise viva batch %s with %s requests", batch_id, len(sessions))
+        results = await wait_for_openai_batch(api_key, batch_id)
+
+        vivas = []
+        for index in range(len(sessions)):
+            body = results.get(str(index), Exception(f"No batch result for session {index}"))
+            if isinstance(body, Exception):
+                vivas.append(body)
+                continue
+
+            try:
+                vivas.append(parse_surprise_viva_content(
+                    body["choices"][0]["message"]["content"],
+                    model,
+                    (body.get("usage") or {}).get("total_tokens", 0),
+                ))
+            except Exception as e:
+                vivas.append(e)
+        return vivas
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate(session: Dict) -> dict:
+        async with semaphore:
+            return await generate_surprise_viva_questions(
+                api_key,
+                session.get("original_questions", []),
+                session.get("exam_context", {}),
+                model,
+            )
+
+    return await asyncio.gather(
+        *(generate(session) for session in sessions),
+        return_exceptions=True,
+    )
+
+
+async def generate_exam_descriptions_bulk(
+    api_key: str,
+    titles: List[str],
+    model: str = "gpt-4o"
+) -> Dict[str, str]:
+    """
+    Generate descriptions for several exam titles in a single OpenAI request,
+    so a cohort of exams costs one request against the RPM limit instead of one each
+
+    Args:
+        api_key: OpenAI API key
+        titles: Exam titles to describe
+        model: OpenAI model to use
+
+    Returns:
+        Dictionary mapping each title to its generated description
+    """
+    if not titles:
+        return {}
+
+    try:
+        client = get_async_openai_client(api_key)
+
+        titles_list = "\n".join(f"{i+1}. {title}" for i, title in enumerate(titles))
+
+        description_prompt = f"""
+Generate one exam description per title below. Each description should:
+1. Clearly explain what topics and concepts will be covered
+2. Describe the scope and depth of the assessment
+3. Be professional and educational in tone
+4. Be 2-4 sentences long and specific to the subject matter indicated by the title
+
+EXAM TITLES:
+{titles_list}
+
+Output strict JSON in this format, with the titles copied exactly as given:
+
+{{
+    "descriptions": [
+        {{"title": "Exam title", "description": "Exam description"}}
+    ]
+}}
+"""
+
+        logger.info(f"Generating {len(titles)} exam descriptions with OpenAI...")
+
+        messages = [
+            EXAM_DESCRIPTIONS_BULK_SYSTEM_MESSAGE,
+            {
+                "role": "user",
+                "content": description_prompt
+            }
+        ]
+        max_tokens = fit_completion_tokens(model, messages, 300 * len(titles))
+        await throttle_openai_request(messages, max_tokens)
+
+        completion = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=0.5,
+            max_tokens=max_tokens
+        )
+
+        logger.info(f"OpenAI completion received. Usage: {completion.usage}")
+
+        if not completion.choices or not completion.choices[0].message.content:
+            raise Exception("OpenAI returned empty response")
+
+        result = orjson.loads(completion.choices[0].message.content)
+
+        generated = {
+            item["title"]: item["description"].strip()
+            for item in result.get("descriptions", [])
+            if item.get("title") and item.get("description")
+        }
+
+        missing = [title for title in titles if title not in generated]
+        if missing:
+            raise Exception(f"No description generated for: {', '.join(missing)}")
+
+        logger.info(f"Generated {len(titles)} exam descriptions successfully")
+        return {title: generated[title] for title in titles}
+
+    except Exception as e:
+        logger.error(f"Error in bulk exam description generation: {str(e)}")
+        raise Exception(f"Failed to generate exam descriptions: {str(e)}")
+
+
+async def generate_surprise_viva_questions_bulk(
+    api_key: str,
+    exam_contexts: List[Dict],
+    model: str = "gpt-4o-mini"
+) -> Dict[str, dict]:
+    """
+    Generate surprise viva questions for several flagged sessions in a single
+    OpenAI request
+
+    Args:
+        api_key: OpenAI API key
+        exam_contexts: One dict per session with `session_id`, `title`,
+            `description` and the original `questions`
+        model: OpenAI model to use
+
+    Returns:
+        Dictionary keyed by session ID with the same shape as
+        `generate_surprise_viva_questions` returns for a single session
+    """
+    if not exam_contexts:
+        return {}
+
+    try:
+        client = get_async_openai_client(api_key)
+
+        sessions_context = "\n\n".join(
+            f"SESSION {context['session_id']}:\n"
+            f"- Subject: {context.get('title', 'Unknown')}\n"
+            f"- Level: {context.get('description', 'General assessment')}\n"
+            + "\n".join(
+                f"Q{i+1}: {q.get('question', 'Unknown question')}"
+                for i, q in enumerate(context.get("questions", [])[:3])
+            )
+            for context in exam_contexts
+        )
+
+        viva_prompt = f"""
+You are an expert exam proctor who needs to create surprise viva questions to verify student understanding.
+Suspicious activity was detected in each of the exam sessions below.
+
+{sessions_context}
+
+For EACH session, generate exactly 2 questions that test the same concepts as that session's
+original questions with different wording/examples, at the same difficulty level, requiring
+short specific answers (1-3 sentences) answerable within 2-3 minutes each.
+
+Output strict JSON in this format, with one entry per session:
+
+{{
+    "sessions": [
+        {{
+            "session_id": "Session ID exactly as given",
+            "viva_questions": [
+                {{
+                    "id": "viva_1",
+                    "question": "Clear, specific question testing understanding",
+                    "expected_answer": "Brief expected answer or key points",
+                    "difficulty": "same",
+                    "time_limit": 180
+                }}
+            ],
+            "instructions": "Answer these questions to verify your understanding. This is a standard verification process."
+        }}
+    ]
+}}
+"""
+
+        logger.info(f"Generating surprise viva questions for {len(exam_contexts)} sessions with OpenAI...")
+
+        messages = [
+            SURPRISE_VIVA_SYSTEM_MESSAGE,
+            {
+                "role": "user",
+                "content": viva_prompt
+            }
+        ]
+        max_tokens = fit_completion_tokens(model, messages, 1000 * len(exam_contexts))
+        completion = await create_viva_completion(client, model, messages, max_tokens)
+
+        logger.info(f"OpenAI viva generation completed. Usage: {completion.usage}")
+
+        if not completion.choices or not completion.choices[0].message.content:
+            raise Exception("OpenAI returned empty response")
+
+        result = orjson.loads(completion.choices[0].message.content)
+
+        generated = {
+            str(session.get("session_id")): session
+            for session in result.get("sessions", [])
+            if session.get("viva_questions")
+        }
+
+        results = {}
+        for context in exam_contexts:
+            session_id = str(context["session_id"])
+            if session_id not in generated:
+                raise Exception(f"No viva questions generated for session {session_id}")
+
+            session = generated[session_id]
+            results[session_id] = {
+                "viva_questions": session["viva_questions"],
+                "instructions": session.get("instructions", ""),
+                "generation_metadata": {
+                    "model_used": model,
+                    "generation_timestamp": datetime.now(timezone.utc).isoformat(),
+                    "questions_generated": len(session["viva_questions"]),
+                    "trigger": "cheating_detection"
+                }
+            }
+
+        logger.info(f"Generated surprise viva questions for {len(results)} sessions successfully")
+        return results
+
+    except Exception as e:
+        logger.error(f"Error in bulk surprise viva generation: {str(e)}")
+        raise Exception(f"Failed to generate surprise viva questions: {str(e)}")
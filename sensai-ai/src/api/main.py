@@ -2,6 +2,7 @@ import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 import os
@@ -32,6 +33,8 @@ from api.routes.ai import (
     resume_pending_course_structure_generation_jobs,
 )
 from api.websockets import router as websocket_router
+from api.llm import close_async_openai_clients
+from api.utils.db import db_pool
 from api.scheduler import scheduler
 from api.settings import settings
 import bugsnag
@@ -40,6 +43,7 @@ from bugsnag.asgi import BugsnagMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await db_pool.open()
     scheduler.start()
 
     # Create the uploads directory if it doesn't exist
@@ -49,8 +53,14 @@ async def lifespan(app: FastAPI):
     asyncio.create_task(resume_pending_task_generation_jobs())
     asyncio.create_task(resume_pending_course_structure_generation_jobs())
 
+    # FastAPI caches the OpenAPI schema once built; build it now so the first
+    # /docs or /openapi.json request does not walk every model
+    app.openapi()
+
     yield
     scheduler.shutdown()
+    await close_async_openai_clients()
+    await db_pool.close()
 
 
 if settings.bugsnag_api_key:
@@ -63,7 +73,8 @@ if settings.bugsnag_api_key:
     )
 
 
-app = FastAPI(lifespan=lifespan)
+# Responses are large nested course/exam payloads, so serialize with orjson
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Add Bugsnag middleware if configured
 if settings.bugsnag_api_key:
@@ -1,6 +1,6 @@
-from enum import Enum
-from pydantic import BaseModel
-from typing import List, Tuple, Optional, Dict, Literal
+from enum import Enum, StrEnum
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, Optional, Literal, Union
 from datetime import datetime
 
 
@@ -22,11 +22,11 @@ class CreateOrganizationResponse(BaseModel):
 
 
 class RemoveMembersFromOrgRequest(BaseModel):
-    user_ids: List[int]
+    user_ids: list[int]
 
 
 class AddUsersToOrgRequest(BaseModel):
-    emails: List[str]
+    emails: list[str]
 
 
 class UpdateOrgRequest(BaseModel):
@@ -54,7 +54,7 @@ class CreateTagRequest(BaseModel):
 
 
 class CreateBulkTagsRequest(BaseModel):
-    tag_names: List[str]
+    tag_names: list[str]
     org_id: int
 
 
@@ -86,12 +86,12 @@ class CreateCohortResponse(BaseModel):
 class AddMembersToCohortRequest(BaseModel):
     org_slug: Optional[str] = None
     org_id: Optional[int] = None
-    emails: List[str]
-    roles: List[str]
+    emails: list[str]
+    roles: list[str]
 
 
 class RemoveMembersFromCohortRequest(BaseModel):
-    member_ids: List[int]
+    member_ids: list[int]
 
 
 class UpdateCohortRequest(BaseModel):
@@ -104,19 +104,19 @@ class UpdateCohortGroupRequest(BaseModel):
 
 class CreateCohortGroupRequest(BaseModel):
     name: str
-    member_ids: List[int]
+    member_ids: list[int]
 
 
 class AddMembersToCohortGroupRequest(BaseModel):
-    member_ids: List[int]
+    member_ids: list[int]
 
 
 class RemoveMembersFromCohortGroupRequest(BaseModel):
-    member_ids: List[int]
+    member_ids: list[int]
 
 
 class RemoveCoursesFromCohortRequest(BaseModel):
-    course_ids: List[int]
+    course_ids: list[int]
 
 
 class DripConfig(BaseModel):
@@ -127,8 +127,8 @@ class DripConfig(BaseModel):
 
 
 class AddCoursesToCohortRequest(BaseModel):
-    course_ids: List[int]
-    drip_config: Optional[DripConfig] = DripConfig()
+    course_ids: list[int]
+    drip_config: Optional[DripConfig] = Field(default_factory=DripConfig)
 
 
 class CreateCourseRequest(BaseModel):
@@ -161,36 +161,15 @@ class Milestone(BaseModel):
     unlock_at: Optional[datetime] = None
 
 
-class TaskType(Enum):
+class TaskType(StrEnum):
     QUIZ = "quiz"
     LEARNING_MATERIAL = "learning_material"
 
-    def __str__(self):
-        return self.value
 
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, TaskType):
-            return self.value == other.value
-        return False
-
-
-class TaskStatus(Enum):
+class TaskStatus(StrEnum):
     DRAFT = "draft"
     PUBLISHED = "published"
 
-    def __str__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, TaskStatus):
-            return self.value == other.value
-
-        return False
-
 
 class Task(BaseModel):
     id: int
@@ -203,66 +182,33 @@ class Task(BaseModel):
 class Block(BaseModel):
     id: Optional[str] = None
     type: str
-    props: Optional[Dict] = {}
-    content: Optional[List] = []
-    children: Optional[List] = []
+    props: Optional[dict] = {}
+    content: Optional[list] = []
+    children: Optional[list] = []
     position: Optional[int] = (
         None  # not present when sent from frontend at the time of publishing
     )
 
 
 class LearningMaterialTask(Task):
-    blocks: List[Block]
+    blocks: list[Block]
 
 
-class TaskInputType(Enum):
+class TaskInputType(StrEnum):
     CODE = "code"
     TEXT = "text"
     AUDIO = "audio"
 
-    def __str__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, TaskInputType):
-            return self.value == other.value
-
-        return False
-
 
-class TaskAIResponseType(Enum):
+class TaskAIResponseType(StrEnum):
     CHAT = "chat"
     EXAM = "exam"
 
-    def __str__(self):
-        return self.value
 
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, TaskAIResponseType):
-            return self.value == other.value
-
-        return False
-
-
-class QuestionType(Enum):
+class QuestionType(StrEnum):
     OPEN_ENDED = "subjective"
     OBJECTIVE = "objective"
 
-    def __str__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, QuestionType):
-            return self.value == other.value
-
-        return False
-
 
 class ScorecardCriterion(BaseModel):
     name: str
@@ -272,25 +218,14 @@ class ScorecardCriterion(BaseModel):
     pass_score: float
 
 
-class ScorecardStatus(Enum):
+class ScorecardStatus(StrEnum):
     PUBLISHED = "published"
     DRAFT = "draft"
 
-    def __str__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, ScorecardStatus):
-            return self.value == other.value
-
-        return False
-
 
 class BaseScorecard(BaseModel):
     title: str
-    criteria: List[ScorecardCriterion]
+    criteria: list[ScorecardCriterion]
 
 
 class CreateScorecardRequest(BaseScorecard):
@@ -307,13 +242,13 @@ class Scorecard(BaseScorecard):
 
 
 class DraftQuestion(BaseModel):
-    blocks: List[Block]
-    answer: List[Block] | None
+    blocks: list[Block]
+    answer: list[Block] | None
     type: QuestionType
     input_type: TaskInputType
     response_type: TaskAIResponseType
-    context: Dict | None
-    coding_languages: List[str] | None
+    context: dict | None
+    coding_languages: list[str] | None
     scorecard_id: Optional[int] = None
     title: str
 
@@ -326,42 +261,21 @@ class PublishedQuestion(DraftQuestion):
 
 
 class QuizTask(Task):
-    questions: List[PublishedQuestion]
+    questions: list[PublishedQuestion]
 
 
-class GenerateCourseJobStatus(str, Enum):
+class GenerateCourseJobStatus(StrEnum):
     STARTED = "started"
     PENDING = "pending"
     COMPLETED = "completed"
     FAILED = "failed"
 
-    def __str__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, GenerateCourseJobStatus):
-            return self.value == other.value
-        return self == other
 
-
-class GenerateTaskJobStatus(str, Enum):
+class GenerateTaskJobStatus(StrEnum):
     STARTED = "started"
     COMPLETED = "completed"
     FAILED = "failed"
 
-    def __str__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, GenerateTaskJobStatus):
-            return self.value == other.value
-
-        return False
-
 
 class MilestoneTask(Task):
     ordering: int
@@ -370,44 +284,33 @@ class MilestoneTask(Task):
 
 
 class MilestoneTaskWithDetails(MilestoneTask):
-    blocks: Optional[List[Block]] = None
-    questions: Optional[List[PublishedQuestion]] = None
+    blocks: Optional[list[Block]] = None
+    questions: Optional[list[PublishedQuestion]] = None
 
 
 class MilestoneWithTasks(Milestone):
-    tasks: List[MilestoneTask]
+    tasks: list[MilestoneTask]
 
 
 class MilestoneWithTaskDetails(Milestone):
-    tasks: List[MilestoneTaskWithDetails]
+    tasks: list[MilestoneTaskWithDetails]
 
 
 class CourseWithMilestonesAndTasks(Course):
-    milestones: List[MilestoneWithTasks]
+    milestones: list[MilestoneWithTasks]
     course_generation_status: GenerateCourseJobStatus | None
 
 
 class CourseWithMilestonesAndTaskDetails(CourseWithMilestonesAndTasks):
-    milestones: List[MilestoneWithTaskDetails]
+    milestones: list[MilestoneWithTaskDetails]
     course_generation_status: GenerateCourseJobStatus | None
 
 
-class UserCourseRole(str, Enum):
+class UserCourseRole(StrEnum):
     ADMIN = "admin"
     LEARNER = "learner"
     MENTOR = "mentor"
 
-    def __str__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, UserCourseRole):
-            return self.value == other.value
-
-        return False
-
 
 class Organization(BaseModel):
     id: int
@@ -422,12 +325,12 @@ class UserCourse(Course):
 
 
 class AddCourseToCohortsRequest(BaseModel):
-    cohort_ids: List[int]
-    drip_config: Optional[DripConfig] = DripConfig()
+    cohort_ids: list[int]
+    drip_config: Optional[DripConfig] = Field(default_factory=DripConfig)
 
 
 class RemoveCourseFromCohortsRequest(BaseModel):
-    cohort_ids: List[int]
+    cohort_ids: list[int]
 
 
 class UpdateCourseNameRequest(BaseModel):
@@ -478,24 +381,14 @@ class UserStreak(BaseModel):
     count: int
 
 
-Streaks = List[UserStreak]
+Streaks = list[UserStreak]
 
 
-class LeaderboardViewType(Enum):
+class LeaderboardViewType(StrEnum):
     ALL_TIME = "All time"
     WEEKLY = "This week"
     MONTHLY = "This month"
 
-    def __str__(self):
-        return self.value
-
-    def __eq__(self, other):
-        if isinstance(other, str):
-            return self.value == other
-        elif isinstance(other, LeaderboardViewType):
-            return self.value == other.value
-        raise NotImplementedError
-
 
 class CreateDraftTaskRequest(BaseModel):
     course_id: int
@@ -510,7 +403,7 @@ class CreateDraftTaskResponse(BaseModel):
 
 class PublishLearningMaterialTaskRequest(BaseModel):
     title: str
-    blocks: List[dict]
+    blocks: list[dict]
     scheduled_publish_at: datetime | None
 
 
@@ -522,24 +415,24 @@ class CreateQuestionRequest(DraftQuestion):
     generation_model: str | None
     max_attempts: int | None
     is_feedback_shown: bool | None
-    context: Dict | None
+    context: dict | None
 
 
 class UpdateDraftQuizRequest(BaseModel):
     title: str
-    questions: List[CreateQuestionRequest]
+    questions: list[CreateQuestionRequest]
     scheduled_publish_at: datetime | None
     status: TaskStatus
 
 
 class UpdateQuestionRequest(BaseModel):
     id: int
-    blocks: List[dict]
-    coding_languages: List[str] | None
-    answer: List[Block] | None
+    blocks: list[dict]
+    coding_languages: list[str] | None
+    answer: list[Block] | None
     scorecard_id: Optional[int] = None
     input_type: TaskInputType | None
-    context: Dict | None
+    context: dict | None
     response_type: TaskAIResponseType | None
     type: QuestionType | None
     title: str
@@ -547,7 +440,7 @@ class UpdateQuestionRequest(BaseModel):
 
 class UpdatePublishedQuizRequest(BaseModel):
     title: str
-    questions: List[UpdateQuestionRequest]
+    questions: list[UpdateQuestionRequest]
     scheduled_publish_at: datetime | None
 
 
@@ -570,35 +463,35 @@ class StoreMessageRequest(BaseModel):
 
 
 class StoreMessagesRequest(BaseModel):
-    messages: List[StoreMessageRequest]
+    messages: list[StoreMessageRequest]
     user_id: int
     question_id: int
     is_complete: bool
 
 
 class GetUserChatHistoryRequest(BaseModel):
-    task_ids: List[int]
+    task_ids: list[int]
 
 
 class TaskTagsRequest(BaseModel):
-    tag_ids: List[int]
+    tag_ids: list[int]
 
 
 class AddScoringCriteriaToTasksRequest(BaseModel):
-    task_ids: List[int]
-    scoring_criteria: List[Dict]
+    task_ids: list[int]
+    scoring_criteria: list[dict]
 
 
 class AddTasksToCoursesRequest(BaseModel):
-    course_tasks: List[Tuple[int, int, int | None]]
+    course_tasks: list[tuple[int, int, int | None]]
 
 
 class RemoveTasksFromCoursesRequest(BaseModel):
-    course_tasks: List[Tuple[int, int]]
+    course_tasks: list[tuple[int, int]]
 
 
 class UpdateTaskOrdersRequest(BaseModel):
-    task_orders: List[Tuple[int, int]]
+    task_orders: list[tuple[int, int]]
 
 
 class AddMilestoneToCourseRequest(BaseModel):
@@ -611,11 +504,11 @@ class AddMilestoneToCourseResponse(BaseModel):
 
 
 class UpdateMilestoneOrdersRequest(BaseModel):
-    milestone_orders: List[Tuple[int, int]]
+    milestone_orders: list[tuple[int, int]]
 
 
 class UpdateTaskTestsRequest(BaseModel):
-    tests: List[dict]
+    tests: list[dict]
 
 
 class TaskCourse(Course):
@@ -624,7 +517,7 @@ class TaskCourse(Course):
 
 class TaskCourseResponse(BaseModel):
     task_id: int
-    courses: List[TaskCourse]
+    courses: list[TaskCourse]
 
 
 class AddCVReviewUsageRequest(BaseModel):
@@ -644,7 +537,7 @@ class AIChatRequest(BaseModel):
     user_response: str
     task_type: TaskType
     question: Optional[DraftQuestion] = None
-    chat_history: Optional[List[Dict]] = None
+    chat_history: Optional[list[dict]] = None
     question_id: Optional[int] = None
     user_id: int
     task_id: int
@@ -657,7 +550,7 @@ class MarkTaskCompletedRequest(BaseModel):
 
 class GetUserStreakResponse(BaseModel):
     streak_count: int
-    active_days: List[str]
+    active_days: list[str]
 
 
 class PresignedUrlRequest(BaseModel):
@@ -699,12 +592,12 @@ class LanguageCodeDraft(BaseModel):
 class SaveCodeDraftRequest(BaseModel):
     user_id: int
     question_id: int
-    code: List[LanguageCodeDraft]
+    code: list[LanguageCodeDraft]
 
 
 class CodeDraft(BaseModel):
     id: int
-    code: List[LanguageCodeDraft]
+    code: list[LanguageCodeDraft]
 
 
 # Exam Models
@@ -714,15 +607,65 @@ class ExamQuestionOption(BaseModel):
     is_correct: bool = False
 
 
-class ExamQuestion(BaseModel):
+class ExamSettings(BaseModel):
+    # Unknown keys sent by older clients are kept as they are
+    model_config = ConfigDict(extra="allow")
+
+    allow_tab_switch: bool = False
+    max_tab_switches: int = 2
+    allow_copy_paste: bool = False
+    require_camera: bool = True
+    require_microphone: bool = False
+    fullscreen_required: bool = True
+    auto_submit: bool = True
+    shuffle_questions: bool = False
+    show_timer: bool = True
+
+
+class ExamMonitoringSettings(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    video_recording: bool = True
+    audio_recording: bool = True
+    screen_recording: bool = False
+    keystroke_logging: bool = True
+    mouse_tracking: bool = True
+    face_detection: bool = True
+    gaze_tracking: bool = True
+    network_monitoring: bool = True
+
+
+class BaseExamQuestion(BaseModel):
     id: str
-    type: Literal["multiple_choice", "text", "code", "essay"]
     question: str
-    options: Optional[List[ExamQuestionOption]] = None
     correct_answer: Optional[str] = None
     points: int = 1
     time_limit: Optional[int] = None
-    metadata: Optional[Dict] = None
+    metadata: Optional[dict] = None
+
+
+class MultipleChoiceQuestion(BaseExamQuestion):
+    type: Literal["multiple_choice"]
+    options: list[ExamQuestionOption]
+
+
+class TextQuestion(BaseExamQuestion):
+    type: Literal["text"]
+
+
+class CodeQuestion(BaseExamQuestion):
+    type: Literal["code"]
+
+
+class EssayQuestion(BaseExamQuestion):
+    type: Literal["essay"]
+
+
+# Validation picks the question class from `type` instead of trying each one
+ExamQuestion = Annotated[
+    Union[MultipleChoiceQuestion, TextQuestion, CodeQuestion, EssayQuestion],
+    Field(discriminator="type"),
+]
 
 
 class ExamConfiguration(BaseModel):
@@ -730,9 +673,9 @@ class ExamConfiguration(BaseModel):
     title: str
     description: str
     duration: int  # minutes
-    questions: List[ExamQuestion]
-    settings: Dict
-    monitoring: Dict
+    questions: list[ExamQuestion]
+    settings: ExamSettings
+    monitoring: ExamMonitoringSettings
     created_at: datetime
     updated_at: datetime
     org_id: Optional[int] = None
@@ -743,7 +686,7 @@ class ExamConfiguration(BaseModel):
 class ExamEvent(BaseModel):
     type: str
     timestamp: int
-    data: Dict
+    data: dict
     priority: Optional[int] = 1  # 1=low, 2=medium, 3=high
     confidence_score: Optional[float] = 0.0  # 0.0-1.0
     is_flagged: Optional[bool] = False
@@ -756,20 +699,20 @@ class ExamSession(BaseModel):
     start_time: datetime
     end_time: Optional[datetime] = None
     status: Literal["pending", "active", "completed", "terminated"]
-    answers: Dict[str, str] = {}
-    events: List[ExamEvent] = []
+    answers: dict[str, str] = {}
+    events: list[ExamEvent] = []
     video_file_path: Optional[str] = None
     score: Optional[float] = None
-    metadata: Optional[Dict] = None
+    metadata: Optional[dict] = None
 
 
 class CreateExamRequest(BaseModel):
     title: str
     description: str
     duration: int
-    questions: List[ExamQuestion]
-    settings: Dict = {}
-    monitoring: Dict = {}
+    questions: list[ExamQuestion]
+    settings: ExamSettings = Field(default_factory=ExamSettings)
+    monitoring: ExamMonitoringSettings = Field(default_factory=ExamMonitoringSettings)
     org_id: Optional[int] = None
     role: str = "teacher"
 
@@ -779,14 +722,14 @@ class GenerateAIExamRequest(BaseModel):
     description: str
     max_questions: int = 10
     duration: Optional[int] = None  # Auto-calculated based on questions if not provided
-    settings: Dict = {}
-    monitoring: Dict = {}
+    settings: ExamSettings = Field(default_factory=ExamSettings)
+    monitoring: ExamMonitoringSettings = Field(default_factory=ExamMonitoringSettings)
     org_id: Optional[int] = None
     course_id: Optional[int] = None  # Generate exam based on course content
 
 
 class ExamSubmissionRequest(BaseModel):
-    answers: Dict[str, str]
+    answers: dict[str, str]
     time_taken: int
 
 
@@ -799,7 +742,7 @@ class ExamTimelineEvent(BaseModel):
     id: str
     session_id: str
     event_type: str
-    event_data: Dict
+    event_data: dict
     timestamp: int
     priority: int = 1
     confidence_score: float = 0.0
@@ -814,9 +757,9 @@ class ExamAnalytics(BaseModel):
     high_priority_events: int
     average_confidence_score: float
     suspicious_activity_score: float
-    timeline_events: List[ExamTimelineEvent]
-    step_timeline: Optional[List[Dict]] = []  # Step-by-step progress timeline
-    suspicious_patterns: Optional[List[Dict]] = []  # Pattern analysis results
+    timeline_events: list[ExamTimelineEvent]
+    step_timeline: Optional[list[dict]] = []  # Step-by-step progress timeline
+    suspicious_patterns: Optional[list[dict]] = []  # Pattern analysis results
 
 
 class VideoDataMessage(BaseModel):
@@ -834,15 +777,15 @@ class VideoControlMessage(BaseModel):
 
 class WebSocketMessage(BaseModel):
     type: str
-    data: Optional[Dict] = None
+    data: Optional[dict] = None
 class ValidateFaceRequest(BaseModel):
     s3_path: str
     split_direction: Optional[str] = "auto"  # "vertical", "horizontal", or "auto"
 
 
 class ImageHalfValidation(BaseModel):
-    labels_detected: List[str]
-    label_confidences: Dict[str, float]
+    labels_detected: list[str]
+    label_confidences: dict[str, float]
     faces_detected: int
     best_face_confidence: Optional[float] = None
     is_person_half: bool
@@ -871,13 +814,25 @@ class ExamEvaluationRequest(BaseModel):
     user_name: str
 
 
+class ExamContext(BaseModel):
+    exam_title: str = "Unknown Exam"
+    exam_description: Optional[str] = ""
+    duration: int = 0  # minutes
+    time_taken: float = 0  # seconds
+    score: float = 0
+    user_name: str = "Student"
+    questions: list[dict] = []
+    questions_and_answers: list[dict] = []
+    session_id: Optional[str] = None
+
+
 class QuestionAnalysis(BaseModel):
     question_number: int
     status: Literal["correct", "incorrect", "partial"]
     detailed_feedback: str
     why_wrong: Optional[str] = None
     better_approach: Optional[str] = None
-    related_concepts: List[str]
+    related_concepts: list[str]
     difficulty_level: Literal["Easy", "Medium", "Hard"]
 
 
@@ -896,23 +851,23 @@ class ExternalResource(BaseModel):
 
 
 class StudyPlan(BaseModel):
-    week_1: List[str]
-    week_2: List[str]
-    week_3: List[str]
-    week_4: List[str]
+    week_1: list[str]
+    week_2: list[str]
+    week_3: list[str]
+    week_4: list[str]
 
 
 class LearningRecommendations(BaseModel):
-    immediate_actions: List[str]
+    immediate_actions: list[str]
     study_plan: StudyPlan
-    external_resources: List[ExternalResource]
-    practice_suggestions: List[str]
+    external_resources: list[ExternalResource]
+    practice_suggestions: list[str]
 
 
 class OverallSummary(BaseModel):
     performance_level: Literal["Excellent", "Good", "Average", "Below Average", "Poor"]
-    key_strengths: List[str]
-    key_weaknesses: List[str]
+    key_strengths: list[str]
+    key_weaknesses: list[str]
     time_management: str
     overall_feedback: str
 
@@ -935,28 +890,61 @@ class ImprovementArea(BaseModel):
 
 
 class TimeDistribution(BaseModel):
-    estimated_per_question: Dict[str, float]
+    estimated_per_question: dict[str, float]
     efficiency_rating: Literal["Excellent", "Good", "Average", "Poor"]
 
 
 class VisualInsights(BaseModel):
-    strength_areas: List[StrengthArea]
-    improvement_areas: List[ImprovementArea]
+    strength_areas: list[StrengthArea]
+    improvement_areas: list[ImprovementArea]
     time_distribution: TimeDistribution
 
 
 class TeacherInsights(BaseModel):
-    teaching_recommendations: List[str]
-    classroom_interventions: List[str]
+    teaching_recommendations: list[str]
+    classroom_interventions: list[str]
     peer_collaboration: str
     assessment_modifications: str
 
 
 class ExamEvaluationReport(BaseModel):
     overall_summary: OverallSummary
-    question_by_question_analysis: List[QuestionAnalysis]
-    knowledge_gaps: List[KnowledgeGap]
+    question_by_question_analysis: list[QuestionAnalysis]
+    knowledge_gaps: list[KnowledgeGap]
     learning_recommendations: LearningRecommendations
     comparative_analysis: ComparativeAnalysis
     visual_insights: VisualInsights
     teacher_insights: TeacherInsights
+
+
+class SurpriseVivaQuestion(BaseModel):
+    id: str
+    question: str
+    expected_answer: str
+    difficulty: str = "same"
+    time_limit: int = 180
+
+
+class SurpriseVivaQuestions(BaseModel):
+    viva_questions: list[SurpriseVivaQuestion]
+    instructions: str
+
+
+# Sections of ExamEvaluationReport that are generated by separate, parallel calls
+class ExamSummaryEvaluation(BaseModel):
+    overall_summary: OverallSummary
+    comparative_analysis: ComparativeAnalysis
+    visual_insights: VisualInsights
+
+
+class ExamQuestionsEvaluation(BaseModel):
+    question_by_question_analysis: list[QuestionAnalysis]
+    knowledge_gaps: list[KnowledgeGap]
+
+
+class ExamRecommendationsEvaluation(BaseModel):
+    learning_recommendations: LearningRecommendations
+
+
+class ExamTeacherEvaluation(BaseModel):
+    teacher_insights: TeacherInsights
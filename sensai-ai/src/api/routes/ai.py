@@ -4,12 +4,12 @@ import tempfile
 import random
 from collections import defaultdict
 import asyncio
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, Body, BackgroundTasks
 from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Literal, AsyncGenerator
 import json
-import instructor
-import openai
+import orjson
 from pydantic import BaseModel, Field
 from langchain_core.output_parsers import PydanticOutputParser
 from api.config import openai_plan_to_model_name
@@ -23,7 +23,12 @@ from api.models import (
     GenerateTaskJobStatus,
     QuestionType,
 )
-from api.llm import run_llm_with_instructor, stream_llm_with_instructor
+from api.llm import (
+    run_llm_with_instructor,
+    streamed_llm_with_instructor,
+    get_async_openai_client,
+    get_instructor_client,
+)
 from api.settings import settings
 from api.utils.logging import logger
 from api.utils.concurrency import async_batch_gather
@@ -136,6 +141,92 @@ def get_user_message_for_chat_history(user_response: str) -> str:
     return f"""Student's Response:\n```\n{user_response}\n```"""
 
 
+# The response models below are built once and reused across chat requests
+# instead of being redefined (and their schemas rebuilt) on every request
+@lru_cache
+def query_rewrite_schema():
+    class Output(BaseModel):
+        rewritten_query: str = Field(
+            description="The rewritten query/message of the student"
+        )
+
+    return Output
+
+
+@lru_cache
+def model_router_schema():
+    class Output(BaseModel):
+        use_reasoning_model: bool = Field(
+            description="Whether to use a reasoning model to evaluate the student's response"
+        )
+
+    return Output
+
+
+@lru_cache
+def objective_feedback_schema():
+    class Output(BaseModel):
+        analysis: str = Field(
+            description="A detailed analysis of the student's response"
+        )
+        feedback: str = Field(
+            description="Feedback on the student's response; add newline characters to the feedback to make it more readable where necessary"
+        )
+        is_correct: bool = Field(
+            description="Whether the student's response correctly solves the original task that the student is supposed to solve. For this to be true, the original task needs to be completely solved and not just partially solved. Giving the right answer to one step of the task does not count as solving the entire task."
+        )
+
+    return Output
+
+
+@lru_cache
+def subjective_feedback_schema():
+    class Feedback(BaseModel):
+        correct: Optional[str] = Field(
+            description="What worked well in the student's response for this category based on the scoring criteria"
+        )
+        wrong: Optional[str] = Field(
+            description="What needs improvement in the student's response for this category based on the scoring criteria"
+        )
+
+    class Row(BaseModel):
+        category: str = Field(
+            description="Category from the scoring criteria for which the feedback is being provided"
+        )
+        feedback: Feedback = Field(
+            description="Detailed feedback for the student's response for this category"
+        )
+        score: int = Field(
+            description="Score given within the min/max range for this category based on the student's response - the score given should be in alignment with the feedback provided"
+        )
+        max_score: int = Field(
+            description="Maximum score possible for this category as per the scoring criteria"
+        )
+        pass_score: int = Field(
+            description="Pass score possible for this category as per the scoring criteria"
+        )
+
+    class Output(BaseModel):
+        feedback: str = Field(
+            description="A single, comprehensive summary based on the scoring criteria"
+        )
+        scorecard: Optional[List[Row]] = Field(
+            description="List of rows with one row for each category from scoring criteria; only include this in the response if the student's response is an answer to the task"
+        )
+
+    return Output
+
+
+@lru_cache
+def chat_response_schema():
+    class Output(BaseModel):
+        response: str = Field(
+            description="Response to the student's query; add proper formatting to the response to make it more readable where necessary"
+        )
+
+    return Output
+
+
 @router.post("/chat")
 async def ai_response_for_question(request: AIChatRequest):
     metadata = {"task_id": request.task_id, "user_id": request.user_id}
@@ -297,10 +388,7 @@ async def ai_response_for_question(request: AIChatRequest):
                         {"role": "system", "content": system_prompt}
                     ] + chat_history
 
-                    class Output(BaseModel):
-                        rewritten_query: str = Field(
-                            description="The rewritten query/message of the student"
-                        )
+                    Output = query_rewrite_schema()
 
                     pred = await run_llm_with_instructor(
                         api_key=settings.openai_api_key,
@@ -320,11 +408,7 @@ async def ai_response_for_question(request: AIChatRequest):
                 if request.response_type == ChatResponseType.AUDIO:
                     model = openai_plan_to_model_name["audio"]
                 else:
-
-                    class Output(BaseModel):
-                        use_reasoning_model: bool = Field(
-                            description="Whether to use a reasoning model to evaluate the student's response"
-                        )
+                    Output = model_router_schema()
 
                     format_instructions = PydanticOutputParser(
                         pydantic_object=Output
@@ -361,59 +445,12 @@ async def ai_response_for_question(request: AIChatRequest):
 
                 if request.task_type == TaskType.QUIZ:
                     if question["type"] == QuestionType.OBJECTIVE:
-
-                        class Output(BaseModel):
-                            analysis: str = Field(
-                                description="A detailed analysis of the student's response"
-                            )
-                            feedback: str = Field(
-                                description="Feedback on the student's response; add newline characters to the feedback to make it more readable where necessary"
-                            )
-                            is_correct: bool = Field(
-                                description="Whether the student's response correctly solves the original task that the student is supposed to solve. For this to be true, the original task needs to be completely solved and not just partially solved. Giving the right answer to one step of the task does not count as solving the entire task."
-                            )
-
+                        Output = objective_feedback_schema()
                     else:
-
-                        class Feedback(BaseModel):
-                            correct: Optional[str] = Field(
-                                description="What worked well in the student's response for this category based on the scoring criteria"
-                            )
-                            wrong: Optional[str] = Field(
-                                description="What needs improvement in the student's response for this category based on the scoring criteria"
-                            )
-
-                        class Row(BaseModel):
-                            category: str = Field(
-                                description="Category from the scoring criteria for which the feedback is being provided"
-                            )
-                            feedback: Feedback = Field(
-                                description="Detailed feedback for the student's response for this category"
-                            )
-                            score: int = Field(
-                                description="Score given within the min/max range for this category based on the student's response - the score given should be in alignment with the feedback provided"
-                            )
-                            max_score: int = Field(
-                                description="Maximum score possible for this category as per the scoring criteria"
-                            )
-                            pass_score: int = Field(
-                                description="Pass score possible for this category as per the scoring criteria"
-                            )
-
-                        class Output(BaseModel):
-                            feedback: str = Field(
-                                description="A single, comprehensive summary based on the scoring criteria"
-                            )
-                            scorecard: Optional[List[Row]] = Field(
-                                description="List of rows with one row for each category from scoring criteria; only include this in the response if the student's response is an answer to the task"
-                            )
+                        Output = subjective_feedback_schema()
 
                 else:
-
-                    class Output(BaseModel):
-                        response: str = Field(
-                            description="Response to the student's query; add proper formatting to the response to make it more readable where necessary"
-                        )
+                    Output = chat_response_schema()
 
                 parser = PydanticOutputParser(pydantic_object=Output)
                 format_instructions = parser.get_format_instructions()
@@ -455,18 +492,18 @@ async def ai_response_for_question(request: AIChatRequest):
                     user_id=str(request.user_id),
                     metadata={"stage": "feedback", **metadata},
                 ):
-                    stream = await stream_llm_with_instructor(
+                    async with streamed_llm_with_instructor(
                         api_key=settings.openai_api_key,
                         model=model,
                         messages=messages,
                         response_model=Output,
                         max_completion_tokens=4096,
-                    )
-                    # Process the async generator
-                    async for chunk in stream:
-                        content = json.dumps(chunk.model_dump()) + "\n"
-                        output_buffer = content
-                        yield content
+                    ) as stream:
+                        # Process the async generator
+                        async for chunk in stream:
+                            content = orjson.dumps(chunk.model_dump()).decode() + "\n"
+                            output_buffer = content
+                            yield content
             except Exception as error:
                 span.record_exception(error)
                 span.set_status(Status(StatusCode.ERROR))
@@ -715,58 +752,57 @@ Do not include the type of task in the name of the task."""
         {"role": "user", "content": course_structure_generation_prompt},
     ]
 
-    stream = await stream_llm_with_instructor(
-        api_key=settings.openai_api_key,
-        model=openai_plan_to_model_name["text"],
-        messages=messages,
-        response_model=Output,
-        max_completion_tokens=16000,
-    )
-
     module_ids = []
 
     module_concepts = defaultdict(lambda: defaultdict(list))
 
     output = None
 
-    async for chunk in stream:
-        if not chunk or not chunk.modules:
-            continue
-
-        for index, module in enumerate(chunk.modules):
-            if not module or not module.name or not module.concepts:
+    async with streamed_llm_with_instructor(
+        api_key=settings.openai_api_key,
+        model=openai_plan_to_model_name["text"],
+        messages=messages,
+        response_model=Output,
+        max_completion_tokens=16000,
+    ) as stream:
+        async for chunk in stream:
+            if not chunk or not chunk.modules:
                 continue
 
-            if index >= len(module_ids):
-                module_id = await add_generated_module(course_id, module)
-                module_ids.append(module_id)
-            else:
-                module_id = module_ids[index]
+            for index, module in enumerate(chunk.modules):
+                if not module or not module.name or not module.concepts:
+                    continue
 
-            task_index = 0
+                if index >= len(module_ids):
+                    module_id = await add_generated_module(course_id, module)
+                    module_ids.append(module_id)
+                else:
+                    module_id = module_ids[index]
 
-            for concept_index, concept in enumerate(module.concepts):
-                if (
-                    not concept
-                    or not concept.tasks
-                    or concept_index < len(module_concepts[module_id]) - 1
-                ):
-                    continue
+                task_index = 0
 
-                for task_index, task in enumerate(concept.tasks):
+                for concept_index, concept in enumerate(module.concepts):
                     if (
-                        not task
-                        or not task.name
-                        or not task.type
-                        or task.type not in [TaskType.LEARNING_MATERIAL, TaskType.QUIZ]
-                        or task_index < len(module_concepts[module_id][concept_index])
+                        not concept
+                        or not concept.tasks
+                        or concept_index < len(module_concepts[module_id]) - 1
                     ):
                         continue
 
-                    task_id = await add_generated_draft_task(course_id, module_id, task)
-                    module_concepts[module_id][concept_index].append(task_id)
+                    for task_index, task in enumerate(concept.tasks):
+                        if (
+                            not task
+                            or not task.name
+                            or not task.type
+                            or task.type not in [TaskType.LEARNING_MATERIAL, TaskType.QUIZ]
+                            or task_index < len(module_concepts[module_id][concept_index])
+                        ):
+                            continue
+
+                        task_id = await add_generated_draft_task(course_id, module_id, task)
+                        module_concepts[module_id][concept_index].append(task_id)
 
-        # output = chunk
+            # output = chunk
 
     output = chunk.model_dump()
 
@@ -801,9 +837,7 @@ async def generate_course_structure(
     background_tasks: BackgroundTasks,
     request: GenerateCourseStructureRequest,
 ):
-    openai_client = openai.AsyncOpenAI(
-        api_key=settings.openai_api_key,
-    )
+    openai_client = get_async_openai_client(settings.openai_api_key)
 
     if settings.s3_folder_name:
         reference_material = download_file_from_s3_as_bytes(
@@ -848,6 +882,7 @@ async def generate_course_structure(
     return {"job_uuid": job_uuid}
 
 
+@lru_cache
 def task_generation_schemas():
 
     class BlockProps(BaseModel):
@@ -1082,11 +1117,7 @@ async def generate_course_tasks(
 ):
     job_details = await get_course_generation_job_details(job_uuid)
 
-    client = instructor.from_openai(
-        openai.AsyncOpenAI(
-            api_key=settings.openai_api_key,
-        )
-    )
+    client = get_instructor_client(settings.openai_api_key)
 
     # Create a list to hold all task coroutines
     tasks = []
@@ -1170,11 +1201,7 @@ async def resume_pending_task_generation_jobs():
 
     tasks = []
 
-    client = instructor.from_openai(
-        openai.AsyncOpenAI(
-            api_key=settings.openai_api_key,
-        )
-    )
+    client = get_instructor_client(settings.openai_api_key)
 
     for job in incomplete_course_jobs:
         tasks.append(
@@ -39,6 +39,7 @@ from api.models import (
     SwapTaskOrderingRequest,
     CourseCohort,
 )
+from api.llm import invalidate_course_context, clear_course_context_cache
 
 router = APIRouter()
 
@@ -63,18 +64,23 @@ async def get_course(
 @router.post("/tasks")
 async def add_tasks_to_courses(request: AddTasksToCoursesRequest):
     await add_tasks_to_courses_in_db(request.course_tasks)
+    for course_id in {course_id for _, course_id, _ in request.course_tasks}:
+        await invalidate_course_context(course_id)
     return {"success": True}
 
 
 @router.delete("/tasks")
 async def remove_tasks_from_courses(request: RemoveTasksFromCoursesRequest):
     await remove_tasks_from_courses_in_db(request.course_tasks)
+    for course_id in {course_id for _, course_id in request.course_tasks}:
+        await invalidate_course_context(course_id)
     return {"success": True}
 
 
 @router.put("/tasks/order")
 async def update_task_orders(request: UpdateTaskOrdersRequest):
     await update_task_orders_in_db(request.task_orders)
+    clear_course_context_cache()
     return {"success": True}
 
 
@@ -87,18 +93,21 @@ async def add_milestone_to_course(
         request.name,
         request.color,
     )
+    await invalidate_course_context(course_id)
     return {"id": milestone_id}
 
 
 @router.put("/milestones/order")
 async def update_milestone_orders(request: UpdateMilestoneOrdersRequest):
     await update_milestone_orders_in_db(request.milestone_orders)
+    clear_course_context_cache()
     return {"success": True}
 
 
 @router.delete("/{course_id}")
 async def delete_course(course_id: int):
     await delete_course_in_db(course_id)
+    await invalidate_course_context(course_id)
     return {"success": True}
 
 
@@ -136,6 +145,7 @@ async def get_tasks_for_course(course_id: int) -> List[Dict]:
 @router.put("/{course_id}")
 async def update_course_name(course_id: int, request: UpdateCourseNameRequest):
     await update_course_name_in_db(course_id, request.name)
+    await invalidate_course_context(course_id)
     return {"success": True}
 
 
@@ -146,6 +156,7 @@ async def swap_milestone_ordering(
     await swap_milestone_ordering_for_course_in_db(
         course_id, request.milestone_1_id, request.milestone_2_id
     )
+    await invalidate_course_context(course_id)
     return {"success": True}
 
 
@@ -154,4 +165,5 @@ async def swap_task_ordering(course_id: int, request: SwapTaskOrderingRequest):
     await swap_task_ordering_for_course_in_db(
         course_id, request.task_1_id, request.task_2_id
     )
+    await invalidate_course_context(course_id)
     return {"success": True}
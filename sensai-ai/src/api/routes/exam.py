@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, Header, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from api.db import (
     exams_table_name,
     exam_sessions_table_name,
@@ -8,7 +8,7 @@ from api.db import (
     user_organizations_table_name
 )
 from typing import List, Optional
-import json
+import orjson
 import uuid
 import os
 import tempfile
@@ -32,7 +32,8 @@ from api.models import (
     ExamTimelineEvent,
     ExamAnalytics,
     ExamEvaluationRequest,
-    ExamEvaluationReport
+    ExamEvaluationReport,
+    ExamContext
 )
 from pydantic import BaseModel
 from api.utils.db import get_new_db_connection
@@ -41,6 +42,7 @@ from api.db.course import (
     store_course_generation_request,
     get_org_id_for_course
 )
+from api.db.exam import get_exam_from_db, get_exam_answer_key
 from api.db.user import get_user_organizations
 from api.db.cohort import create_cohort, add_members_to_cohort, add_course_to_cohorts
 from api.routes.ai import _generate_course_structure
@@ -48,7 +50,7 @@ from api.models import GenerateCourseJobStatus
 from api.utils.event_scoring import EventScorer
 from api.utils.style_analyzer import analyze_exam_writing_style
 from api.utils.logging import logger
-from api.llm import generate_exam_questions_with_openai, generate_exam_description_with_openai, generate_surprise_viva_questions
+from api.llm import generate_exam_questions_with_openai, generate_exam_description_with_openai, generate_surprise_viva_questions, stream_surprise_viva_questions, get_course_context_for_ai, get_async_openai_client, get_instructor_client
 from api.config import (
     exams_table_name,
     exam_sessions_table_name,
@@ -83,9 +85,9 @@ async def create_exam(exam_request: CreateExamRequest, user_id: int = Header(...
                     exam_request.title,
                     exam_request.description,
                     exam_request.duration,
-                    json.dumps([q.dict() for q in exam_request.questions]),
-                    json.dumps(exam_request.settings),
-                    json.dumps(exam_request.monitoring),
+                    orjson.dumps([q.model_dump() for q in exam_request.questions]).decode(),
+                    orjson.dumps(exam_request.settings.model_dump()).decode(),
+                    orjson.dumps(exam_request.monitoring.model_dump()).decode(),
                     exam_request.org_id,
                     user_id,
                     'teacher',  # Creator is always teacher
@@ -130,6 +132,9 @@ async def generate_ai_exam(
         if not openai_api_key:
             raise HTTPException(status_code=500, detail="OpenAI API key not configured on server")
         
+        # Fetch the course once so the generator does not look it up again
+        course_context = await get_course_context_for_ai(exam_request.course_id)
+
         # Generate questions using OpenAI
         try:
             generated_content = await generate_exam_questions_with_openai(
@@ -138,7 +143,8 @@ async def generate_ai_exam(
                 description=exam_request.description,
                 max_questions=exam_request.max_questions,
                 model="gpt-4o",
-                course_id=exam_request.course_id
+                course_id=exam_request.course_id,
+                course_context=course_context
             )
         except Exception as e:
             print(f"Error generating questions with OpenAI: {e}")
@@ -192,32 +198,9 @@ async def generate_ai_exam(
             
             formatted_questions.append(formatted_question)
         
-        # Create default settings and monitoring if not provided
-        default_settings = {
-            "allow_tab_switch": False,
-            "max_tab_switches": 2,
-            "allow_copy_paste": False,
-            "require_camera": True,
-            "require_microphone": False,
-            "fullscreen_required": True,
-            "auto_submit": True,
-            "shuffle_questions": False,
-            "show_timer": True
-        }
-        
-        default_monitoring = {
-            "video_recording": True,
-            "audio_recording": True,
-            "screen_recording": False,
-            "keystroke_logging": True,
-            "mouse_tracking": True,
-            "face_detection": True,
-            "gaze_tracking": True,
-            "network_monitoring": True
-        }
-        
-        settings = {**default_settings, **exam_request.settings}
-        monitoring = {**default_monitoring, **exam_request.monitoring}
+        # Settings and monitoring not provided in the request get the model defaults
+        settings = exam_request.settings.model_dump()
+        monitoring = exam_request.monitoring.model_dump()
         
         # Generate exam ID
         exam_id = str(uuid.uuid4())
@@ -235,9 +218,9 @@ async def generate_ai_exam(
                     exam_request.title,
                     exam_request.description,
                     duration,
-                    json.dumps(formatted_questions),
-                    json.dumps(settings),
-                    json.dumps(monitoring),
+                    orjson.dumps(formatted_questions).decode(),
+                    orjson.dumps(settings).decode(),
+                    orjson.dumps(monitoring).decode(),
                     exam_request.org_id,
                     user_id,
                     'teacher',  # Creator is always teacher
@@ -329,61 +312,37 @@ async def generate_exam_description(
 @router.get("/{exam_id}", response_model=dict)
 async def get_exam(exam_id: str, user_id: int = Header(None, alias="x-user-id")):
     try:
-        async with get_new_db_connection() as conn:
-            cursor = await conn.cursor()
-            
-            await cursor.execute(
-                f"""SELECT id, title, description, duration, questions, settings, monitoring, 
-                           created_at, updated_at, org_id, created_by
-                    FROM {exams_table_name} WHERE id = ?""",
-                (exam_id,)
-            )
-            
-            row = await cursor.fetchone()
-            
-            if not row:
-                raise HTTPException(status_code=404, detail="Exam not found")
-            
-            exam_data = {
-                "id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "duration": row[3],
-                "questions": json.loads(row[4]),
-                "settings": json.loads(row[5] or "{}"),
-                "monitoring": json.loads(row[6] or "{}"),
-                "created_at": row[7],
-                "updated_at": row[8],
-                "org_id": row[9],
-                "created_by": row[10]
-            }
-            
-            # Simplified role detection: creator is teacher, everyone else is student
-            if user_id:
-                if user_id == row[10]:  # created_by
-                    exam_data["user_role"] = "teacher"
-                    exam_data["is_creator"] = True
-                else:
-                    exam_data["user_role"] = "student"
-                    exam_data["is_creator"] = False
-                    # Remove sensitive settings for students (but keep monitoring settings which are needed for frontend)
-                    exam_data.pop("settings", None)
-                    # Remove correct answers from questions for students
-                    questions = exam_data["questions"]
-                    for question in questions:
-                        if "correct_answer" in question:
-                            question.pop("correct_answer")
-                        # For students, convert options back to simple format for compatibility
-                        if question.get("options"):
-                            for option in question["options"]:
-                                if hasattr(option, 'get') and option.get('is_correct'):
-                                    option.pop('is_correct', None)
+        exam_data = await get_exam_from_db(exam_id)
+
+        if not exam_data:
+            raise HTTPException(status_code=404, detail="Exam not found")
+
+        # Simplified role detection: creator is teacher, everyone else is student
+        if user_id:
+            if user_id == exam_data["created_by"]:
+                exam_data["user_role"] = "teacher"
+                exam_data["is_creator"] = True
             else:
-                exam_data["user_role"] = "student"  # Default to student for anonymous users
+                exam_data["user_role"] = "student"
                 exam_data["is_creator"] = False
-            
-            return exam_data
-            
+                # Remove sensitive settings for students (but keep monitoring settings which are needed for frontend)
+                exam_data.pop("settings", None)
+                # Remove correct answers from questions for students
+                questions = exam_data["questions"]
+                for question in questions:
+                    if "correct_answer" in question:
+                        question.pop("correct_answer")
+                    # For students, convert options back to simple format for compatibility
+                    if question.get("options"):
+                        for option in question["options"]:
+                            if hasattr(option, 'get') and option.get('is_correct'):
+                                option.pop('is_correct', None)
+        else:
+            exam_data["user_role"] = "student"  # Default to student for anonymous users
+            exam_data["is_creator"] = False
+        
+        return exam_data
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -418,7 +377,7 @@ async def start_exam_session(exam_id: str, user_id: str = Query(...)):
                 raise HTTPException(status_code=400, detail="Active exam session already exists")
             
             # Create new session
-            session_id = f"{exam_id}_{user_id}_{int(datetime.now().timestamp())}"
+            session_id = str(uuid.uuid4())
             
             await cursor.execute(
                 f"""INSERT INTO {exam_sessions_table_name}
@@ -430,7 +389,7 @@ async def start_exam_session(exam_id: str, user_id: str = Query(...)):
                     user_id,
                     datetime.now(),
                     'active',  # Changed from 'pending' to 'active'
-                    json.dumps({}),
+                    orjson.dumps({}).decode(),
                     datetime.now(),
                     datetime.now()
                 )
@@ -450,6 +409,10 @@ async def start_exam_session(exam_id: str, user_id: str = Query(...)):
 @router.post("/{exam_id}/submit", response_model=dict) 
 async def submit_exam(exam_id: str, submission: ExamSubmissionRequest, user_id: str = Query(...), session_id: str = Query(None)):
     try:
+        # Scoring reads the (usually cached) exam through its own connection,
+        # so do it before taking one for the session rather than while holding it
+        score = await calculate_exam_score(exam_id, submission.answers)
+        
         async with get_new_db_connection() as conn:
             cursor = await conn.cursor()
             
@@ -478,7 +441,7 @@ async def submit_exam(exam_id: str, submission: ExamSubmissionRequest, user_id:
                 session_row = await cursor.fetchone()
                 if not session_row:
                     # Create a new session automatically if none exists
-                    existing_session_id = f"{exam_id}_{user_id}_{int(datetime.now().timestamp())}"
+                    existing_session_id = str(uuid.uuid4())
                     
                     await cursor.execute(
                         f"""INSERT INTO {exam_sessions_table_name}
@@ -490,7 +453,7 @@ async def submit_exam(exam_id: str, submission: ExamSubmissionRequest, user_id:
                             user_id,
                             datetime.now(),
                             'act    ive',
-                            json.dumps({}),
+                            orjson.dumps({}).decode(),
                             datetime.now(),
                             datetime.now()
                         )
@@ -498,67 +461,65 @@ async def submit_exam(exam_id: str, submission: ExamSubmissionRequest, user_id:
                 else:
                     existing_session_id = session_row[0]
             
-            # Calculate score (basic implementation)
-            score = await calculate_exam_score(exam_id, submission.answers, cursor)
-            
             # Update session
             await cursor.execute(
                 f"""UPDATE {exam_sessions_table_name}
                     SET end_time = ?, status = 'completed', answers = ?, score = ?, updated_at = ?
                     WHERE id = ?""",
-                (datetime.now(), json.dumps(submission.answers), score, datetime.now(), existing_session_id)
+                (datetime.now(), orjson.dumps(submission.answers).decode(), score, datetime.now(), existing_session_id)
             )
             
             await conn.commit()
+        
+        # Perform writing style analysis. It is an LLM call, so it runs after
+        # the session's connection has gone back to the pool
+        style_analysis_result = None
+        try:
+            analysis_result = await analyze_exam_writing_style(submission.answers)
+            style_analysis_result = {
+                "has_style_change": analysis_result.has_style_change,
+                "confidence_score": analysis_result.confidence_score,
+                "style_inconsistencies": analysis_result.style_inconsistencies,
+                "analysis_summary": analysis_result.analysis_summary
+            }
             
-            # Perform writing style analysis
-            style_analysis_result = None
-            try:
-                analysis_result = await analyze_exam_writing_style(submission.answers)
-                style_analysis_result = {
-                    "has_style_change": analysis_result.has_style_change,
-                    "confidence_score": analysis_result.confidence_score,
+            # Generate writing style drift event if significant changes detected
+            if analysis_result.has_style_change:
+                # Create event data
+                event_data = {
+                    "exam_id": exam_id,
+                    "session_id": existing_session_id,
+                    "drift_score": analysis_result.confidence_score,
                     "style_inconsistencies": analysis_result.style_inconsistencies,
-                    "analysis_summary": analysis_result.analysis_summary
+                    "analysis_summary": analysis_result.analysis_summary,
+                    "samples_compared": analysis_result.samples_compared
                 }
                 
-                # Generate writing style drift event if significant changes detected
-                if analysis_result.has_style_change:
-                    # Create event data
-                    event_data = {
-                        "exam_id": exam_id,
-                        "session_id": existing_session_id,
-                        "drift_score": analysis_result.confidence_score,
-                        "style_inconsistencies": analysis_result.style_inconsistencies,
-                        "analysis_summary": analysis_result.analysis_summary,
-                        "samples_compared": analysis_result.samples_compared
-                    }
-                    
-                    # Store the event in the database
-                    async with get_new_db_connection() as event_conn:
-                        event_cursor = await event_conn.cursor()
-                        await event_cursor.execute(
-                            f"""INSERT INTO {exam_events_table_name}
-                                (id, session_id, event_type, event_data, timestamp, created_at)
-                                VALUES (?, ?, ?, ?, ?, ?)""",
-                            (
-                                str(uuid.uuid4()),
-                                existing_session_id,
-                                "writing_style_drift",
-                                json.dumps(event_data),
-                                int(datetime.now().timestamp() * 1000),
-                                datetime.now()
-                            )
+                # Store the event in the database
+                async with get_new_db_connection() as conn:
+                    cursor = await conn.cursor()
+                    await cursor.execute(
+                        f"""INSERT INTO {exam_events_table_name}
+                            (id, session_id, event_type, event_data, timestamp, created_at)
+                            VALUES (?, ?, ?, ?, ?, ?)""",
+                        (
+                            str(uuid.uuid4()),
+                            existing_session_id,
+                            "writing_style_drift",
+                            orjson.dumps(event_data).decode(),
+                            int(datetime.now().timestamp() * 1000),
+                            datetime.now()
                         )
-                        await event_conn.commit()
-                        
-            except Exception as e:
-                print(f"Error in writing style analysis: {e}")
-                # Don't fail the exam submission if style analysis fails
-                style_analysis_result = {
-                    "error": f"Style analysis failed: {str(e)}"
-                }
-            
+                    )
+                    await conn.commit()
+                    
+        except Exception as e:
+            print(f"Error in writing style analysis: {e}")
+            # Don't fail the exam submission if style analysis fails
+            style_analysis_result = {
+                "error": f"Style analysis failed: {str(e)}"
+            }
+        
         response = {"message": "Exam submitted successfully", "score": score, "session_id": existing_session_id}
         if style_analysis_result:
             response["style_analysis"] = style_analysis_result
@@ -615,7 +576,7 @@ async def get_exam_sessions(exam_id: str):
             )
             
             sessions = []
-            async for row in cursor:
+            for row in await cursor.fetchall():
                 print(f"Session row data: {row}")  # Debug logging
                 
                 # Create user display name: prefer "FirstName LastName", fallback to email
@@ -661,32 +622,24 @@ async def get_exam_results(exam_id: str, session_id: str):
         async with get_new_db_connection() as conn:
             cursor = await conn.cursor()
             
-            # Get session details
+            # Get session details along with the events summary as a JSON object
             await cursor.execute(
-                f"""SELECT s.*, e.title, e.questions
+                f"""SELECT s.*, e.title, e.questions,
+                           (SELECT json_group_object(event_type, count)
+                            FROM (SELECT event_type, COUNT(*) AS count
+                                  FROM {exam_events_table_name}
+                                  WHERE session_id = ?
+                                  GROUP BY event_type)) AS events_summary
                     FROM {exam_sessions_table_name} s
                     JOIN {exams_table_name} e ON s.exam_id = e.id
                     WHERE s.id = ? AND s.exam_id = ?""",
-                (session_id, exam_id)
+                (session_id, session_id, exam_id)
             )
             
             session_row = await cursor.fetchone()
             if not session_row:
                 raise HTTPException(status_code=404, detail="Exam session not found")
             
-            # Get events summary
-            await cursor.execute(
-                f"""SELECT event_type, COUNT(*) as count
-                    FROM {exam_events_table_name}
-                    WHERE session_id = ?
-                    GROUP BY event_type""",
-                (session_id,)
-            )
-            
-            events_summary = {}
-            async for row in cursor:
-                events_summary[row[0]] = row[1]
-            
             # Get video file info
             from api.config import data_root_dir
             video_dir = os.path.join(data_root_dir, "exam_videos", exam_id)
@@ -704,9 +657,9 @@ async def get_exam_results(exam_id: str, session_id: str):
                 "end_time": session_row[4],
                 "status": session_row[5],
                 "score": session_row[7],
-                "answers": json.loads(session_row[6] or "{}"),
-                "questions": json.loads(session_row[12]),  # e.questions
-                "events_summary": events_summary,
+                "answers": orjson.loads(session_row[6] or "{}"),
+                "questions": orjson.loads(session_row[12]),  # e.questions
+                "events_summary": orjson.loads(session_row[13]),  # events_summary
                 "video_info": video_info
             }
             
@@ -717,6 +670,95 @@ async def get_exam_results(exam_id: str, session_id: str):
         raise HTTPException(status_code=500, detail="Failed to fetch exam results")
 
 
+async def build_exam_evaluation_context(cursor, exam_id: str, session_id: str) -> ExamContext:
+    """
+    Load an exam session with its exam and student and prepare the context the
+    AI evaluation runs on
+    """
+    # Get comprehensive exam session data
+    await cursor.execute(
+        f"""SELECT s.*, e.title, e.description, e.duration, e.questions, u.email, u.first_name, u.last_name
+            FROM {exam_sessions_table_name} s
+            JOIN {exams_table_name} e ON s.exam_id = e.id
+            LEFT JOIN {users_table_name} u ON s.user_id = u.id
+            WHERE s.id = ? AND s.exam_id = ?""",
+        (session_id, exam_id)
+    )
+    
+    session_row = await cursor.fetchone()
+    if not session_row:
+        raise HTTPException(status_code=404, detail="Exam session not found")
+    
+    # Calculate time taken in seconds
+    start_time = session_row[3] if session_row[3] else datetime.now()
+    end_time = session_row[4] if session_row[4] else datetime.now()
+    if isinstance(start_time, str):
+        start_time = datetime.fromisoformat(start_time)
+    if isinstance(end_time, str):
+        end_time = datetime.fromisoformat(end_time)
+    
+    time_taken_seconds = (end_time - start_time).total_seconds()
+    
+    # Parse exam data
+    print("Parsing exam data...")
+    questions = orjson.loads(session_row[12])  # e.questions
+    print(f"Found {len(questions)} questions in exam")
+    answers = orjson.loads(session_row[6] or "{}")  # s.answers
+    
+    # Create user display name
+    user_display = "Student"
+    if session_row[15]:  # email
+        if session_row[16] and session_row[17]:  # first_name and last_name
+            user_display = f"{session_row[16]} {session_row[17]}"
+        elif session_row[16]:  # only first_name
+            user_display = session_row[16]
+        else:
+            user_display = session_row[15]  # fallback to email
+    
+    # Prepare questions and answers for analysis
+    questions_and_answers = []
+    for i, question in enumerate(questions, 1):
+        question_id = question.get('id', f'q{i}')
+        user_answer = answers.get(question_id, '')
+        correct_answer = question.get('correct_answer', '')
+        
+        # Determine if answer is correct
+        is_correct = False
+        if question.get('type') == 'multiple_choice':
+            is_correct = user_answer == correct_answer
+        elif question.get('type') == 'text':
+            # Simple text comparison - could be enhanced with fuzzy matching
+            is_correct = user_answer.strip().lower() == correct_answer.lower() if correct_answer else bool(user_answer.strip())
+        else:
+            # For essay/code questions, mark as answered if there's content
+            is_correct = bool(user_answer.strip()) if user_answer else False
+        
+        questions_and_answers.append({
+            "question_number": i,
+            "question_id": question_id,
+            "question_type": question.get('type', 'text'),
+            "question_text": question.get('question', ''),
+            "options": question.get('options', []),
+            "correct_answer": correct_answer,
+            "user_answer": user_answer,
+            "is_correct": is_correct,
+            "points": question.get('points', 1),
+            "metadata": question.get('metadata', {})
+        })
+    
+    return ExamContext(
+        session_id=session_id,
+        exam_title=session_row[11],  # e.title
+        exam_description=session_row[12] if len(session_row) > 12 else "",  # e.description
+        duration=session_row[13],  # e.duration in minutes
+        time_taken=time_taken_seconds,  # in seconds
+        score=session_row[7] or 0,  # s.score
+        user_name=user_display,
+        questions=questions,
+        questions_and_answers=questions_and_answers
+    )
+
+
 @router.post("/{exam_id}/evaluate/{session_id}", response_model=dict)
 async def evaluate_exam_comprehensive(
     exam_id: str, 
@@ -742,189 +784,111 @@ async def evaluate_exam_comprehensive(
         async with get_new_db_connection() as conn:
             cursor = await conn.cursor()
             
-            # Get comprehensive exam session data
-            await cursor.execute(
-                f"""SELECT s.*, e.title, e.description, e.duration, e.questions, u.email, u.first_name, u.last_name
-                    FROM {exam_sessions_table_name} s
-                    JOIN {exams_table_name} e ON s.exam_id = e.id
-                    LEFT JOIN {users_table_name} u ON s.user_id = u.id
-                    WHERE s.id = ? AND s.exam_id = ?""",
-                (session_id, exam_id)
-            )
-            
-            session_row = await cursor.fetchone()
-            if not session_row:
-                raise HTTPException(status_code=404, detail="Exam session not found")
-            
-            # Calculate time taken in seconds
-            start_time = session_row[3] if session_row[3] else datetime.now()
-            end_time = session_row[4] if session_row[4] else datetime.now()
-            if isinstance(start_time, str):
-                start_time = datetime.fromisoformat(start_time)
-            if isinstance(end_time, str):
-                end_time = datetime.fromisoformat(end_time)
-            
-            time_taken_seconds = (end_time - start_time).total_seconds()
-            
-            # Parse exam data
-            print("Parsing exam data...")
-            questions = json.loads(session_row[12])  # e.questions
-            print(f"Found {len(questions)} questions in exam")
-            answers = json.loads(session_row[6] or "{}")  # s.answers
-            
-            # Create user display name
-            user_display = "Student"
-            if session_row[15]:  # email
-                if session_row[16] and session_row[17]:  # first_name and last_name
-                    user_display = f"{session_row[16]} {session_row[17]}"
-                elif session_row[16]:  # only first_name
-                    user_display = session_row[16]
-                else:
-                    user_display = session_row[15]  # fallback to email
-            
-            # Prepare questions and answers for analysis
-            questions_and_answers = []
-            for i, question in enumerate(questions, 1):
-                question_id = question.get('id', f'q{i}')
-                user_answer = answers.get(question_id, '')
-                correct_answer = question.get('correct_answer', '')
-                
-                # Determine if answer is correct
-                is_correct = False
-                if question.get('type') == 'multiple_choice':
-                    is_correct = user_answer == correct_answer
-                elif question.get('type') == 'text':
-                    # Simple text comparison - could be enhanced with fuzzy matching
-                    is_correct = user_answer.strip().lower() == correct_answer.lower() if correct_answer else bool(user_answer.strip())
-                else:
-                    # For essay/code questions, mark as answered if there's content
-                    is_correct = bool(user_answer.strip()) if user_answer else False
-                
-                questions_and_answers.append({
-                    "question_number": i,
-                    "question_id": question_id,
-                    "question_type": question.get('type', 'text'),
-                    "question_text": question.get('question', ''),
-                    "options": question.get('options', []),
-                    "correct_answer": correct_answer,
-                    "user_answer": user_answer,
-                    "is_correct": is_correct,
-                    "points": question.get('points', 1),
-                    "metadata": question.get('metadata', {})
-                })
-            
-            # Prepare evaluation context
-            evaluation_context = {
-                "session_id": session_id,
-                "exam_title": session_row[11],  # e.title
-                "exam_description": session_row[12] if len(session_row) > 12 else "",  # e.description
-                "duration": session_row[13],  # e.duration in minutes
-                "time_taken": time_taken_seconds,  # in seconds
-                "score": session_row[7] or 0,  # s.score
-                "user_name": user_display,
-                "questions": questions,
-                "questions_and_answers": questions_and_answers
-            }
+            evaluation_context = await build_exam_evaluation_context(cursor, exam_id, session_id)
+            questions_and_answers = evaluation_context.questions_and_answers
+            time_taken_seconds = evaluation_context.time_taken
             
             # Debug logging
             print(f"Evaluation context prepared:")
-            print(f"- Exam title: {evaluation_context['exam_title']}")
-            print(f"- Questions count: {len(evaluation_context['questions'])}")
-            print(f"- Q&A count: {len(evaluation_context['questions_and_answers'])}")
-            print(f"- Score: {evaluation_context['score']}")
-            print(f"- Time taken: {evaluation_context['time_taken']} seconds")
+            print(f"- Exam title: {evaluation_context.exam_title}")
+            print(f"- Questions count: {len(evaluation_context.questions)}")
+            print(f"- Q&A count: {len(evaluation_context.questions_and_answers)}")
+            print(f"- Score: {evaluation_context.score}")
+            print(f"- Time taken: {evaluation_context.time_taken} seconds")
             
-            # Generate comprehensive evaluation using OpenAI
-            try:
-                evaluation_result = await evaluate_exam_with_openai(
-                    api_key=openai_api_key,
-                    exam_context=evaluation_context,
-                    model="gpt-4o"
-                )
-            except Exception as llm_error:
-                print(f"LLM evaluation failed: {str(llm_error)}")
-                # Provide a basic fallback evaluation
-                total_questions = len(questions_and_answers)
-                correct_answers = sum(1 for qa in questions_and_answers if qa.get('is_correct', False))
-                accuracy = (correct_answers / total_questions * 100) if total_questions > 0 else 0
-                
-                evaluation_result = {
-                    "overall_summary": {
-                        "performance_level": "Good" if accuracy >= 70 else "Average" if accuracy >= 50 else "Below Average",
-                        "key_strengths": ["Basic completion"] if correct_answers > 0 else [],
-                        "key_weaknesses": ["Needs improvement"] if accuracy < 70 else [],
-                        "time_management": f"Completed in {time_taken_seconds/60:.1f} minutes",
-                        "overall_feedback": f"You scored {accuracy:.1f}% on this exam. {'Good work!' if accuracy >= 70 else 'Keep practicing to improve your performance.'}"
+        # Generate comprehensive evaluation using OpenAI
+        try:
+            evaluation_result = await evaluate_exam_with_openai(
+                api_key=openai_api_key,
+                exam_context=evaluation_context,
+                model="gpt-4o"
+            )
+        except Exception as llm_error:
+            print(f"LLM evaluation failed: {str(llm_error)}")
+            # Provide a basic fallback evaluation
+            total_questions = len(questions_and_answers)
+            correct_answers = sum(1 for qa in questions_and_answers if qa.get('is_correct', False))
+            accuracy = (correct_answers / total_questions * 100) if total_questions > 0 else 0
+            
+            evaluation_result = {
+                "overall_summary": {
+                    "performance_level": "Good" if accuracy >= 70 else "Average" if accuracy >= 50 else "Below Average",
+                    "key_strengths": ["Basic completion"] if correct_answers > 0 else [],
+                    "key_weaknesses": ["Needs improvement"] if accuracy < 70 else [],
+                    "time_management": f"Completed in {time_taken_seconds/60:.1f} minutes",
+                    "overall_feedback": f"You scored {accuracy:.1f}% on this exam. {'Good work!' if accuracy >= 70 else 'Keep practicing to improve your performance.'}"
+                },
+                "question_by_question_analysis": [
+                    {
+                        "question_number": i+1,
+                        "status": "correct" if qa.get('is_correct', False) else "incorrect",
+                        "detailed_feedback": f"Question {i+1}: {'Correct answer!' if qa.get('is_correct', False) else 'Review this topic'}",
+                        "why_wrong": "" if qa.get('is_correct', False) else "Incorrect response provided",
+                        "better_approach": "Review course materials",
+                        "related_concepts": ["General knowledge"],
+                        "difficulty_level": "Medium"
+                    }
+                    for i, qa in enumerate(questions_and_answers)
+                ],
+                "knowledge_gaps": [
+                    {
+                        "topic": "General understanding",
+                        "severity": "Medium",
+                        "description": "Some concepts need reinforcement",
+                        "improvement_suggestions": "Review course materials and practice more"
+                    }
+                ],
+                "learning_recommendations": {
+                    "immediate_actions": ["Review incorrect answers", "Study course materials"],
+                    "study_plan": {
+                        "week_1": ["Review basics"],
+                        "week_2": ["Practice exercises"],
+                        "week_3": ["Advanced topics"],
+                        "week_4": ["Mock exams"]
                     },
-                    "question_by_question_analysis": [
+                    "external_resources": [
                         {
-                            "question_number": i+1,
-                            "status": "correct" if qa.get('is_correct', False) else "incorrect",
-                            "detailed_feedback": f"Question {i+1}: {'Correct answer!' if qa.get('is_correct', False) else 'Review this topic'}",
-                            "why_wrong": "" if qa.get('is_correct', False) else "Incorrect response provided",
-                            "better_approach": "Review course materials",
-                            "related_concepts": ["General knowledge"],
-                            "difficulty_level": "Medium"
+                            "type": "Study Guide",
+                            "title": "Course Review Materials",
+                            "url": "#",
+                            "description": "Review your course materials"
                         }
-                        for i, qa in enumerate(questions_and_answers)
                     ],
-                    "knowledge_gaps": [
-                        {
-                            "topic": "General understanding",
-                            "severity": "Medium",
-                            "description": "Some concepts need reinforcement",
-                            "improvement_suggestions": "Review course materials and practice more"
-                        }
-                    ],
-                    "learning_recommendations": {
-                        "immediate_actions": ["Review incorrect answers", "Study course materials"],
-                        "study_plan": {
-                            "week_1": ["Review basics"],
-                            "week_2": ["Practice exercises"],
-                            "week_3": ["Advanced topics"],
-                            "week_4": ["Mock exams"]
-                        },
-                        "external_resources": [
-                            {
-                                "type": "Study Guide",
-                                "title": "Course Review Materials",
-                                "url": "#",
-                                "description": "Review your course materials"
-                            }
-                        ],
-                        "practice_suggestions": ["Take practice quizzes", "Review notes"]
-                    },
-                    "comparative_analysis": {
-                        "grade_interpretation": f"Score of {accuracy:.1f}%",
-                        "improvement_potential": "Good potential with focused study",
-                        "benchmark_comparison": "Compare with class average",
-                        "next_level_requirements": "Consistent practice needed"
-                    },
-                    "visual_insights": {
-                        "strength_areas": [{"topic": "Completion", "score": accuracy}],
-                        "improvement_areas": [{"topic": "Accuracy", "priority": "High" if accuracy < 50 else "Medium"}],
-                        "time_distribution": {
-                            "estimated_per_question": {},
-                            "efficiency_rating": "Average"
-                        }
-                    },
-                    "teacher_insights": {
-                        "teaching_recommendations": ["Focus on weak areas"],
-                        "classroom_interventions": ["Additional practice sessions"],
-                        "peer_collaboration": "Study groups recommended",
-                        "assessment_modifications": "Consider review sessions"
-                    },
-                    "evaluation_metadata": {
-                        "model_used": "fallback_evaluation",
-                        "evaluation_timestamp": datetime.now().isoformat(),
-                        "note": "This is a basic evaluation due to AI service unavailability"
+                    "practice_suggestions": ["Take practice quizzes", "Review notes"]
+                },
+                "comparative_analysis": {
+                    "grade_interpretation": f"Score of {accuracy:.1f}%",
+                    "improvement_potential": "Good potential with focused study",
+                    "benchmark_comparison": "Compare with class average",
+                    "next_level_requirements": "Consistent practice needed"
+                },
+                "visual_insights": {
+                    "strength_areas": [{"topic": "Completion", "score": accuracy}],
+                    "improvement_areas": [{"topic": "Accuracy", "priority": "High" if accuracy < 50 else "Medium"}],
+                    "time_distribution": {
+                        "estimated_per_question": {},
+                        "efficiency_rating": "Average"
                     }
+                },
+                "teacher_insights": {
+                    "teaching_recommendations": ["Focus on weak areas"],
+                    "classroom_interventions": ["Additional practice sessions"],
+                    "peer_collaboration": "Study groups recommended",
+                    "assessment_modifications": "Consider review sessions"
+                },
+                "evaluation_metadata": {
+                    "model_used": "fallback_evaluation",
+                    "evaluation_timestamp": datetime.now().isoformat(),
+                    "note": "This is a basic evaluation due to AI service unavailability"
                 }
-                print("Using fallback evaluation due to LLM failure")
-            
-            
-            # Store evaluation result in database for future reference
-            evaluation_json = json.dumps(evaluation_result)
+            }
+            print("Using fallback evaluation due to LLM failure")
+        
+        
+        # Store evaluation result in database for future reference
+        evaluation_json = orjson.dumps(evaluation_result).decode()
+        async with get_new_db_connection() as conn:
+            cursor = await conn.cursor()
             await cursor.execute(
                 f"""UPDATE {exam_sessions_table_name} 
                     SET metadata = ? 
@@ -933,19 +897,19 @@ async def evaluate_exam_comprehensive(
             )
             await conn.commit()
             
-            return {
-                "success": True,
-                "session_id": session_id,
-                "evaluation": evaluation_result,
-                "summary": {
-                    "exam_title": evaluation_context["exam_title"],
-                    "student": evaluation_context["user_name"],
-                    "score": evaluation_context["score"],
-                    "performance_level": evaluation_result.get("overall_summary", {}).get("performance_level", "Unknown"),
-                    "evaluation_generated_at": datetime.now().isoformat()
-                }
+        return {
+            "success": True,
+            "session_id": session_id,
+            "evaluation": evaluation_result,
+            "summary": {
+                "exam_title": evaluation_context.exam_title,
+                "student": evaluation_context.user_name,
+                "score": evaluation_context.score,
+                "performance_level": evaluation_result.get("overall_summary", {}).get("performance_level", "Unknown"),
+                "evaluation_generated_at": datetime.now().isoformat()
             }
-            
+        }
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -955,6 +919,62 @@ async def evaluate_exam_comprehensive(
         raise HTTPException(status_code=500, detail=f"Failed to generate evaluation: {str(e)}")
 
 
+@router.post("/{exam_id}/evaluate/{session_id}/stream")
+async def stream_exam_evaluation(
+    exam_id: str,
+    session_id: str,
+    user_id: int = Header(..., alias="x-user-id")
+):
+    """
+    Stream the comprehensive AI evaluation as newline-delimited JSON, one
+    progressively filled report per line, so sections can be shown as soon as
+    they are generated. The final report is stored like the non-streaming
+    evaluation.
+    """
+    from api.llm import stream_exam_evaluation_with_openai, build_evaluation_metadata
+
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+
+    async with get_new_db_connection() as conn:
+        cursor = await conn.cursor()
+        evaluation_context = await build_exam_evaluation_context(cursor, exam_id, session_id)
+
+    model = "gpt-4o"
+
+    async def stream_response():
+        evaluation_result = {}
+        async for partial_report in stream_exam_evaluation_with_openai(
+            api_key=openai_api_key,
+            exam_context=evaluation_context,
+            model=model
+        ):
+            evaluation_result = partial_report.model_dump()
+            yield orjson.dumps(evaluation_result) + b"\n"
+
+        # Token usage is not reported on instructor's partial streams
+        evaluation_result["evaluation_metadata"] = build_evaluation_metadata(
+            evaluation_context, model, 0
+        )
+        yield orjson.dumps(evaluation_result) + b"\n"
+
+        async with get_new_db_connection() as conn:
+            cursor = await conn.cursor()
+            await cursor.execute(
+                f"""UPDATE {exam_sessions_table_name} 
+                    SET metadata = ? 
+                    WHERE id = ?""",
+                (orjson.dumps(evaluation_result).decode(), session_id)
+            )
+            await conn.commit()
+
+    return StreamingResponse(
+        stream_response(),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.get("/{exam_id}/evaluation/{session_id}", response_model=dict)
 async def get_stored_evaluation(exam_id: str, session_id: str):
     """
@@ -979,14 +999,14 @@ async def get_stored_evaluation(exam_id: str, session_id: str):
                 raise HTTPException(status_code=404, detail="No evaluation found. Generate evaluation first.")
             
             try:
-                evaluation = json.loads(metadata)
+                evaluation = orjson.loads(metadata)
                 return {
                     "success": True,
                     "session_id": session_id,
                     "evaluation": evaluation,
                     "score": session_row[1]
                 }
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 raise HTTPException(status_code=500, detail="Invalid evaluation data format")
             
     except HTTPException:
@@ -996,6 +1016,195 @@ async def get_stored_evaluation(exam_id: str, session_id: str):
         raise HTTPException(status_code=500, detail="Failed to fetch evaluation")
 
 
+async def build_exam_analytics(session_id: str) -> ExamAnalytics:
+    """Aggregate a session's proctoring events into its analytics"""
+    async with get_new_db_connection() as conn:
+        cursor = await conn.cursor()
+
+        # Get all events for the session with detailed timeline
+        await cursor.execute(
+            f"""SELECT event_type, event_data, timestamp FROM {exam_events_table_name}
+                WHERE session_id = ? ORDER BY timestamp ASC""",
+            (session_id,)
+        )
+        rows = await cursor.fetchall()
+
+    events = []
+    total_events = 0
+    flagged_events = 0
+    high_priority_events = 0
+    confidence_scores = []
+    step_timeline = []
+    
+    # Track exam progress steps
+    exam_started = False
+    questions_visited = set()
+    answers_submitted = set()
+    
+    for row in rows:
+        total_events += 1
+        event_data = orjson.loads(row[1])
+        event_type = row[0]
+        timestamp = row[2]
+        
+        # Use EventScorer for enhanced priority and confidence calculation
+        try:
+            priority, confidence_score, is_flagged, description = EventScorer.calculate_event_score(event_type, event_data)
+        except Exception as scorer_error:
+            print(f"Warning: EventScorer error: {scorer_error}")
+            # Provide fallback values
+            priority = 1
+            confidence_score = 0.5
+            is_flagged = False
+            description = f"Event: {event_type}"
+        
+        # Ensure numeric values are not None
+        priority = priority if priority is not None else 1
+        confidence_score = confidence_score if confidence_score is not None else 0.5
+        is_flagged = is_flagged if is_flagged is not None else False
+        
+        if is_flagged:
+            flagged_events += 1
+            if priority == 3:
+                high_priority_events += 1
+        
+        if confidence_score is not None:
+            confidence_scores.append(confidence_score)
+        
+        # Create timeline event; every field is computed here from stored
+        # rows, so skip re-validating each one (sessions have thousands)
+        timeline_event = ExamTimelineEvent.model_construct(
+            id=f"{session_id}_{total_events}",
+            session_id=session_id,
+            event_type=event_type,
+            event_data=event_data,
+            timestamp=row[2],
+            priority=priority,
+            confidence_score=confidence_score,
+            is_flagged=is_flagged,
+            created_at=datetime.now()
+        )
+        events.append(timeline_event)
+        
+        # Build step-by-step progress timeline
+        if event_type == 'exam_started':
+            exam_started = True
+            step_timeline.append({
+                "step": "exam_started",
+                "title": "Exam Started",
+                "description": "Student began the exam session",
+                "timestamp": timestamp,
+                "status": "completed",
+                "details": event_data
+            })
+        elif event_type == 'question_viewed':
+            question_id = event_data.get('question_id')
+            if question_id and question_id not in questions_visited:
+                questions_visited.add(question_id)
+                step_timeline.append({
+                    "step": f"question_viewed_{question_id}",
+                    "title": f"Question {len(questions_visited)} Viewed",
+                    "description": f"Student viewed question {question_id}",
+                    "timestamp": timestamp,
+                    "status": "completed",
+                    "details": event_data
+                })
+        elif event_type == 'answer_changed':
+            question_id = event_data.get('question_id')
+            if question_id:
+                step_timeline.append({
+                    "step": f"answer_changed_{question_id}",
+                    "title": f"Answer Modified",
+                    "description": f"Student modified answer for question {question_id}",
+                    "timestamp": timestamp,
+                    "status": "completed" if event_data.get('answer') else "in_progress",
+                    "details": event_data
+                })
+        elif event_type == 'answer_submitted':
+            question_id = event_data.get('question_id')
+            if question_id and question_id not in answers_submitted:
+                answers_submitted.add(question_id)
+                step_timeline.append({
+                    "step": f"answer_submitted_{question_id}",
+                    "title": f"Answer Submitted",
+                    "description": f"Student submitted answer for question {question_id}",
+                    "timestamp": timestamp,
+                    "status": "completed",
+                    "details": event_data
+                })
+        elif event_type == 'exam_submitted':
+            step_timeline.append({
+                "step": "exam_submitted",
+                "title": "Exam Submitted",
+                "description": "Student completed and submitted the exam",
+                "timestamp": timestamp,
+                "status": "completed",
+                "details": event_data
+            })
+        elif is_flagged:
+            # Add flagged events to timeline
+            step_timeline.append({
+                "step": f"flagged_{event_type}_{timestamp}",
+                "title": f"⚠️ Flagged Event: {event_type.replace('_', ' ').title()}",
+                "description": f"Suspicious activity detected",
+                "timestamp": timestamp,
+                "status": "flagged",
+                "priority": priority,
+                "confidence": confidence_score,
+                "details": event_data
+            })
+    
+    # Calculate analytics with pattern analysis
+    avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
+    
+    # Ensure all values are properly initialized and not None
+    total_events = total_events if total_events is not None else 0
+    flagged_events = flagged_events if flagged_events is not None else 0
+    high_priority_events = high_priority_events if high_priority_events is not None else 0
+    
+    suspicious_score = min(1.0, flagged_events / max(total_events, 1) * 2) if total_events > 0 else 0.0  # Scale suspicious activity
+    
+    # Use EventScorer for pattern analysis
+    try:
+        all_events = [
+            {
+                'event_type': event.event_type,
+                'event_data': event.event_data,
+                'timestamp': event.timestamp,
+                'confidence_score': event.confidence_score
+            }
+            for event in events
+        ]
+        
+        # Get suspicious patterns
+        suspicious_patterns = EventScorer.analyze_event_patterns(all_events) if hasattr(EventScorer, 'analyze_event_patterns') else {'patterns': []}
+        pattern_descriptions = []
+        for pattern in suspicious_patterns.get('patterns', []):
+            pattern_descriptions.append({
+                'pattern': pattern.get('type', 'unknown'),
+                'severity': pattern.get('severity', 'unknown'),
+                'description': pattern.get('description', ''),
+                'details': pattern
+            })
+    except Exception as pattern_error:
+        print(f"Warning: Pattern analysis error: {pattern_error}")
+        pattern_descriptions = []
+    
+    # Everything here was computed above from stored rows, so skip
+    # re-validating every timeline event
+    return ExamAnalytics.model_construct(
+        session_id=session_id,
+        total_events=total_events,
+        flagged_events=flagged_events,
+        high_priority_events=high_priority_events,
+        average_confidence_score=avg_confidence,
+        suspicious_activity_score=suspicious_score,
+        timeline_events=events,
+        step_timeline=step_timeline,  # Add step-by-step timeline
+        suspicious_patterns=pattern_descriptions  # Add pattern analysis
+    )
+
+
 @router.get("/{exam_id}/analytics/{session_id}", response_model=ExamAnalytics)
 async def get_exam_analytics(exam_id: str, session_id: str, user_id: int = Header(..., alias="x-user-id")):
     try:
@@ -1016,187 +1225,12 @@ async def get_exam_analytics(exam_id: str, session_id: str, user_id: int = Heade
             # Only creator (teacher) can view analytics
             if created_by != user_id:
                 raise HTTPException(status_code=403, detail="Only the exam creator can view analytics")
-            
-            # Get all events for the session with detailed timeline
-            await cursor.execute(
-                f"""SELECT event_type, event_data, timestamp FROM {exam_events_table_name}
-                    WHERE session_id = ? ORDER BY timestamp ASC""",
-                (session_id,)
-            )
-            
-            events = []
-            total_events = 0
-            flagged_events = 0
-            high_priority_events = 0
-            confidence_scores = []
-            step_timeline = []
-            
-            # Track exam progress steps
-            exam_started = False
-            questions_visited = set()
-            answers_submitted = set()
-            
-            async for row in cursor:
-                total_events += 1
-                event_data = json.loads(row[1])
-                event_type = row[0]
-                timestamp = row[2]
-                
-                # Use EventScorer for enhanced priority and confidence calculation
-                try:
-                    priority, confidence_score, is_flagged, description = EventScorer.calculate_event_score(event_type, event_data)
-                except Exception as scorer_error:
-                    print(f"Warning: EventScorer error: {scorer_error}")
-                    # Provide fallback values
-                    priority = 1
-                    confidence_score = 0.5
-                    is_flagged = False
-                    description = f"Event: {event_type}"
-                
-                # Ensure numeric values are not None
-                priority = priority if priority is not None else 1
-                confidence_score = confidence_score if confidence_score is not None else 0.5
-                is_flagged = is_flagged if is_flagged is not None else False
-                
-                if is_flagged:
-                    flagged_events += 1
-                    if priority == 3:
-                        high_priority_events += 1
-                
-                if confidence_score is not None:
-                    confidence_scores.append(confidence_score)
-                
-                # Create timeline event
-                timeline_event = ExamTimelineEvent(
-                    id=f"{session_id}_{total_events}",
-                    session_id=session_id,
-                    event_type=event_type,
-                    event_data=event_data,
-                    timestamp=row[2],
-                    priority=priority,
-                    confidence_score=confidence_score,
-                    is_flagged=is_flagged,
-                    created_at=datetime.now()
-                )
-                events.append(timeline_event)
-                
-                # Build step-by-step progress timeline
-                if event_type == 'exam_started':
-                    exam_started = True
-                    step_timeline.append({
-                        "step": "exam_started",
-                        "title": "Exam Started",
-                        "description": "Student began the exam session",
-                        "timestamp": timestamp,
-                        "status": "completed",
-                        "details": event_data
-                    })
-                elif event_type == 'question_viewed':
-                    question_id = event_data.get('question_id')
-                    if question_id and question_id not in questions_visited:
-                        questions_visited.add(question_id)
-                        step_timeline.append({
-                            "step": f"question_viewed_{question_id}",
-                            "title": f"Question {len(questions_visited)} Viewed",
-                            "description": f"Student viewed question {question_id}",
-                            "timestamp": timestamp,
-                            "status": "completed",
-                            "details": event_data
-                        })
-                elif event_type == 'answer_changed':
-                    question_id = event_data.get('question_id')
-                    if question_id:
-                        step_timeline.append({
-                            "step": f"answer_changed_{question_id}",
-                            "title": f"Answer Modified",
-                            "description": f"Student modified answer for question {question_id}",
-                            "timestamp": timestamp,
-                            "status": "completed" if event_data.get('answer') else "in_progress",
-                            "details": event_data
-                        })
-                elif event_type == 'answer_submitted':
-                    question_id = event_data.get('question_id')
-                    if question_id and question_id not in answers_submitted:
-                        answers_submitted.add(question_id)
-                        step_timeline.append({
-                            "step": f"answer_submitted_{question_id}",
-                            "title": f"Answer Submitted",
-                            "description": f"Student submitted answer for question {question_id}",
-                            "timestamp": timestamp,
-                            "status": "completed",
-                            "details": event_data
-                        })
-                elif event_type == 'exam_submitted':
-                    step_timeline.append({
-                        "step": "exam_submitted",
-                        "title": "Exam Submitted",
-                        "description": "Student completed and submitted the exam",
-                        "timestamp": timestamp,
-                        "status": "completed",
-                        "details": event_data
-                    })
-                elif is_flagged:
-                    # Add flagged events to timeline
-                    step_timeline.append({
-                        "step": f"flagged_{event_type}_{timestamp}",
-                        "title": f"⚠️ Flagged Event: {event_type.replace('_', ' ').title()}",
-                        "description": f"Suspicious activity detected",
-                        "timestamp": timestamp,
-                        "status": "flagged",
-                        "priority": priority,
-                        "confidence": confidence_score,
-                        "details": event_data
-                    })
-            
-            # Calculate analytics with pattern analysis
-            avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
-            
-            # Ensure all values are properly initialized and not None
-            total_events = total_events if total_events is not None else 0
-            flagged_events = flagged_events if flagged_events is not None else 0
-            high_priority_events = high_priority_events if high_priority_events is not None else 0
-            
-            suspicious_score = min(1.0, flagged_events / max(total_events, 1) * 2) if total_events > 0 else 0.0  # Scale suspicious activity
-            
-            # Use EventScorer for pattern analysis
-            try:
-                all_events = [
-                    {
-                        'event_type': event.event_type,
-                        'event_data': event.event_data,
-                        'timestamp': event.timestamp,
-                        'confidence_score': event.confidence_score
-                    }
-                    for event in events
-                ]
-                
-                # Get suspicious patterns
-                suspicious_patterns = EventScorer.analyze_event_patterns(all_events) if hasattr(EventScorer, 'analyze_event_patterns') else {'patterns': []}
-                pattern_descriptions = []
-                for pattern in suspicious_patterns.get('patterns', []):
-                    pattern_descriptions.append({
-                        'pattern': pattern.get('type', 'unknown'),
-                        'severity': pattern.get('severity', 'unknown'),
-                        'description': pattern.get('description', ''),
-                        'details': pattern
-                    })
-            except Exception as pattern_error:
-                print(f"Warning: Pattern analysis error: {pattern_error}")
-                pattern_descriptions = []
-            
-            analytics = ExamAnalytics(
-                session_id=session_id,
-                total_events=total_events,
-                flagged_events=flagged_events,
-                high_priority_events=high_priority_events,
-                average_confidence_score=avg_confidence,
-                suspicious_activity_score=suspicious_score,
-                timeline_events=events,
-                step_timeline=step_timeline,  # Add step-by-step timeline
-                suspicious_patterns=pattern_descriptions  # Add pattern analysis
-            )
-            
-            return analytics
+
+        analytics = await build_exam_analytics(session_id)
+
+        # Serialize the response directly; returning the model would have
+        # FastAPI dump and re-validate every timeline event
+        return Response(analytics.model_dump_json(), media_type="application/json")
             
     except HTTPException:
         raise
@@ -1228,15 +1262,15 @@ async def get_teacher_exams(teacher_id: int, user_id: int = Header(..., alias="x
             )
             
             exams = []
-            async for row in cursor:
+            for row in await cursor.fetchall():
                 exam_data = {
                     "id": row[0],
                     "title": row[1],
                     "description": row[2],
                     "duration": row[3],
-                    "questions": json.loads(row[4]),
-                    "settings": json.loads(row[5] or "{}"),
-                    "monitoring": json.loads(row[6] or "{}"),
+                    "questions": orjson.loads(row[4]),
+                    "settings": orjson.loads(row[5] or "{}"),
+                    "monitoring": orjson.loads(row[6] or "{}"),
                     "created_at": row[7],
                     "updated_at": row[8],
                     "org_id": row[9]
@@ -1252,36 +1286,32 @@ async def get_teacher_exams(teacher_id: int, user_id: int = Header(..., alias="x
         raise HTTPException(status_code=500, detail="Failed to fetch exams")
 
 
-async def calculate_exam_score(exam_id: str, answers: dict, cursor) -> float:
+async def calculate_exam_score(exam_id: str, answers: dict) -> float:
     try:
-        await cursor.execute(
-            f"SELECT questions FROM {exams_table_name} WHERE id = ?",
-            (exam_id,)
-        )
-        
-        row = await cursor.fetchone()
-        if not row:
+        answer_key = await get_exam_answer_key(exam_id)
+        if not answer_key:
             return 0.0
         
-        questions = json.loads(row[0])
-        total_points = 0
+        questions = answer_key["questions"]
+        total_points = answer_key["total_points"]
         earned_points = 0
         
-        for question in questions:
-            total_points += question.get('points', 1)
+        # Unanswered questions score nothing, so only the answers need visiting
+        for question_id, user_answer in answers.items():
+            question = questions.get(question_id)
+            if question is None:
+                continue
             
-            question_id = question.get('id')
-            correct_answer = question.get('correct_answer')
-            user_answer = answers.get(question_id, '')
+            question_type, correct_answer, points = question
             
-            if question.get('type') == 'multiple_choice':
+            if question_type == 'multiple_choice':
                 if user_answer == correct_answer:
-                    earned_points += question.get('points', 1)
+                    earned_points += points
             else:
                 # For text/essay/code questions, you'd implement more sophisticated scoring
                 # For now, we'll give partial credit if an answer exists
                 if user_answer.strip():
-                    earned_points += question.get('points', 1) * 0.5
+                    earned_points += points * 0.5
         
         return round((earned_points / total_points * 100) if total_points > 0 else 0, 2)
         
@@ -1399,6 +1429,65 @@ class SurpriseVivaAnswerRequest(BaseModel):
     answers: dict  # question_id -> answer mapping
 
 
+async def load_surprise_viva_inputs(cursor, exam_id: str):
+    """
+    Fetch the exam's title, description and questions along with the OpenAI
+    API key to generate its surprise viva with
+    """
+    # Get exam details
+    await cursor.execute(
+        f"SELECT title, description, questions FROM {exams_table_name} WHERE id = ?",
+        (exam_id,)
+    )
+    exam_row = await cursor.fetchone()
+    if not exam_row:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    
+    title, description, questions_json = exam_row
+    questions = orjson.loads(questions_json)
+    
+    # Get organization's OpenAI API key
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        # Try to get from organization
+        await cursor.execute(f"""
+            SELECT o.openai_api_key 
+            FROM {organizations_table_name} o
+            JOIN {exams_table_name} e ON e.org_id = o.id
+            WHERE e.id = ?
+        """, (exam_id,))
+        org_row = await cursor.fetchone()
+        if org_row and org_row[0]:
+            api_key = org_row[0]
+        else:
+            raise HTTPException(status_code=400, detail="OpenAI API key not configured")
+
+    return title, description, questions, api_key
+
+
+async def store_surprise_viva_question(cursor, session_id: str, question: dict) -> dict:
+    """Store a generated viva question and return it as sent to the student"""
+    await cursor.execute(f"""
+        INSERT INTO {surprise_viva_questions_table_name}
+        (session_id, original_question_id, question_text, expected_answer, confidence_score)
+        VALUES (?, ?, ?, ?, ?)
+    """, (
+        session_id,
+        question["id"],
+        question["question"],
+        question["expected_answer"],
+        0.9  # High confidence for generated questions
+    ))
+    
+    # Get the inserted ID
+    viva_id = cursor.lastrowid
+    return {
+        "id": str(viva_id),
+        "question": question["question"],
+        "time_limit": question.get("time_limit") or 180
+    }
+
+
 @router.post("/{exam_id}/surprise-viva", response_model=dict)
 async def trigger_surprise_viva(
     exam_id: str,
@@ -1409,88 +1498,84 @@ async def trigger_surprise_viva(
     try:
         async with get_new_db_connection() as conn:
             cursor = await conn.cursor()
-            
-            # Get exam details
-            await cursor.execute(
-                f"SELECT title, description, questions FROM {exams_table_name} WHERE id = ?",
-                (exam_id,)
-            )
-            exam_row = await cursor.fetchone()
-            if not exam_row:
-                raise HTTPException(status_code=404, detail="Exam not found")
-            
-            title, description, questions_json = exam_row
-            questions = json.loads(questions_json)
-            
-            # Get organization's OpenAI API key
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                # Try to get from organization
-                await cursor.execute(f"""
-                    SELECT o.openai_api_key 
-                    FROM {organizations_table_name} o
-                    JOIN {exams_table_name} e ON e.org_id = o.id
-                    WHERE e.id = ?
-                """, (exam_id,))
-                org_row = await cursor.fetchone()
-                if org_row and org_row[0]:
-                    api_key = org_row[0]
-                else:
-                    raise HTTPException(status_code=400, detail="OpenAI API key not configured")
-            
-            # Generate viva questions
-            exam_context = {
-                "title": title,
-                "description": description,
-                "cheating_evidence": request.cheating_evidence
-            }
-            
-            viva_result = await generate_surprise_viva_questions(
-                api_key=api_key,
-                original_questions=questions,
-                exam_context=exam_context
-            )
-            
-            # Store viva questions in database
-            viva_questions = viva_result["viva_questions"]
-            stored_questions = []
-            
+            title, description, questions, api_key = await load_surprise_viva_inputs(cursor, exam_id)
+        
+        # Generate viva questions
+        exam_context = {
+            "title": title,
+            "description": description,
+            "cheating_evidence": request.cheating_evidence
+        }
+        
+        viva_result = await generate_surprise_viva_questions(
+            api_key=api_key,
+            original_questions=questions,
+            exam_context=exam_context
+        )
+        
+        # Store viva questions in database
+        viva_questions = viva_result["viva_questions"]
+        stored_questions = []
+        
+        async with get_new_db_connection() as conn:
+            cursor = await conn.cursor()
             for question in viva_questions:
-                await cursor.execute(f"""
-                    INSERT INTO {surprise_viva_questions_table_name}
-                    (session_id, original_question_id, question_text, expected_answer, confidence_score)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    request.session_id,
-                    question["id"],
-                    question["question"],
-                    question["expected_answer"],
-                    0.9  # High confidence for generated questions
-                ))
-                
-                # Get the inserted ID
-                viva_id = cursor.lastrowid
-                stored_questions.append({
-                    "id": str(viva_id),
-                    "question": question["question"],
-                    "time_limit": question.get("time_limit", 180)
-                })
+                stored_questions.append(
+                    await store_surprise_viva_question(cursor, request.session_id, question)
+                )
             
             await conn.commit()
-            
-            return {
-                "success": True,
-                "message": "Surprise viva questions generated",
-                "questions": stored_questions,
-                "instructions": viva_result.get("instructions", "Please answer these verification questions."),
-                "total_time_limit": len(stored_questions) * 180  # 3 minutes per question
-            }
+        
+        return {
+            "success": True,
+            "message": "Surprise viva questions generated",
+            "questions": stored_questions,
+            "instructions": viva_result.get("instructions", "Please answer these verification questions."),
+            "total_time_limit": len(stored_questions) * 180  # 3 minutes per question
+        }
             
     except Exception as e:
         logger.error(f"Error generating surprise viva: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate viva questions: {str(e)}")
 
 
+@router.post("/{exam_id}/surprise-viva/stream")
+async def stream_surprise_viva(
+    exam_id: str,
+    request: SurpriseVivaRequest,
+    user_id: int = Header(..., alias="x-user-id")
+):
+    """
+    Stream surprise viva questions as newline-delimited JSON, one stored
+    question per line, so the student can start on the first question while
+    the rest are still being generated
+    """
+    async with get_new_db_connection() as conn:
+        cursor = await conn.cursor()
+        title, description, questions, api_key = await load_surprise_viva_inputs(cursor, exam_id)
+
+    exam_context = {
+        "title": title,
+        "description": description,
+        "cheating_evidence": request.cheating_evidence
+    }
+
+    async def stream_response():
+        async for question in stream_surprise_viva_questions(api_key, questions, exam_context):
+            # Only hold a pooled connection while storing each question, not
+            # while the rest are generated or the client reads the stream
+            async with get_new_db_connection() as conn:
+                cursor = await conn.cursor()
+                stored_question = await store_surprise_viva_question(cursor, request.session_id, question)
+                await conn.commit()
+            yield orjson.dumps(stored_question) + b"\n"
+
+    return StreamingResponse(
+        stream_response(),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.post("/surprise-viva/submit", response_model=dict)
 async def submit_surprise_viva_answers(
     request: SurpriseVivaAnswerRequest,
@@ -1612,8 +1697,8 @@ async def generate_report(
             exam_title = session_row[11]
             exam_description = session_row[12] 
             duration = session_row[13]
-            questions = json.loads(session_row[14])
-            answers = json.loads(session_row[6] or "{}")
+            questions = orjson.loads(session_row[14])
+            answers = orjson.loads(session_row[6] or "{}")
             score = session_row[7] or 0
             
             # Calculate time taken
@@ -1635,15 +1720,6 @@ async def generate_report(
                 else:
                     user_display = session_row[15]
             
-            # Get analytics data if requested
-            analytics_data = None
-            if request.include_analytics and user_id == exam_creator_id:
-                try:
-                    analytics = await get_exam_analytics(request.exam_id, request.session_id, user_id)
-                    analytics_data = analytics.dict()
-                except:
-                    analytics_data = None
-            
             # Get events summary
             await cursor.execute(
                 f"""SELECT event_type, COUNT(*) as count
@@ -1653,159 +1729,148 @@ async def generate_report(
                 (request.session_id,)
             )
             
-            events_summary = {}
-            async for row in cursor:
-                events_summary[row[0]] = row[1]
-            
-            # Generate AI evaluation using ChatGPT
-            evaluation_data = await generate_ai_summaries(
-                openai_api_key,
-                exam_title,
-                user_display, 
-                score,
-                questions,
-                answers,
-                time_taken_seconds,
-                events_summary,
-                analytics_data
-            )
-            
-            # Generate charts
-            charts = generate_charts(evaluation_data)
-            
-            # Calculate grade gradient for PDF
-            overall_perf = evaluation_data.get('overall_performance', {})
-            grade_level = overall_perf.get('grade_level', 'C')
-            
-            if grade_level == 'A' or score >= 90:
-                grade_gradient = "linear-gradient(135deg, #059669 0%, #10b981 100%)"
-            elif grade_level == 'B' or score >= 80:
-                grade_gradient = "linear-gradient(135deg, #2563eb 0%, #3b82f6 100%)"
-            elif grade_level == 'C' or score >= 70:
-                grade_gradient = "linear-gradient(135deg, #d97706 0%, #f59e0b 100%)" 
-            elif grade_level == 'D' or score >= 60:
-                grade_gradient = "linear-gradient(135deg, #dc2626 0%, #ef4444 100%)"
-            else:
-                grade_gradient = "linear-gradient(135deg, #7c2d12 0%, #dc2626 100%)"
-            
-            # Generate PDF report
-            pdf_path = await create_pdf_report(
-                exam_title,
-                user_display,
-                score,
-                start_time,
-                end_time,
-                time_taken_seconds,
-                questions,
-                answers,
-                events_summary,
-                analytics_data,
-                evaluation_data,
-                charts,
-                request,
-                grade_gradient
-            )
-            
-            # Read PDF content for base64 encoding
-            with open(pdf_path, 'rb') as pdf_file:
-                pdf_content = pdf_file.read()
-                pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
-            
-            # Clean up temporary file
-            os.unlink(pdf_path)
-            
-            # Convert analytics_data from Pydantic model to dict if it exists
-            analytics_dict = None
-            if analytics_data:
-                try:
-                    # Convert Pydantic model to dict
-                    analytics_dict = analytics_data.dict() if hasattr(analytics_data, 'dict') else analytics_data
-                except:
-                    # Fallback to basic conversion
-                    analytics_dict = {
-                        "total_events": getattr(analytics_data, 'total_events', 0),
-                        "flagged_events": getattr(analytics_data, 'flagged_events', 0),
-                        "high_priority_events": getattr(analytics_data, 'high_priority_events', 0),
-                        "average_confidence_score": getattr(analytics_data, 'average_confidence_score', 0),
-                        "suspicious_activity_score": getattr(analytics_data, 'suspicious_activity_score', 0),
-                        "timeline_events": getattr(analytics_data, 'timeline_events', []),
-                        "step_timeline": getattr(analytics_data, 'step_timeline', [])
-                    }
-            
-            # Return JSON with PDF and ALL generation data
-            return {
-                "success": True,
-                "pdf_data": pdf_base64,
-                "filename": f"SENSAI_Report_{exam_title}_{user_display}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                "generation_data": {
-                    # Basic exam information
-                    "exam_info": {
-                        "exam_id": request.exam_id,
-                        "session_id": request.session_id,
-                        "exam_title": exam_title,
-                        "exam_description": exam_description,
-                        "student_name": user_display,
-                        "student_user_id": session_user_id,
-                        "exam_date": start_time.strftime("%B %d, %Y"),
-                        "exam_datetime": start_time.isoformat(),
-                        "completion_datetime": end_time.isoformat(),
-                        "duration_seconds": time_taken_seconds,
-                        "duration_formatted": f"{time_taken_seconds/60:.1f} minutes",
-                        "total_questions": len(questions),
-                        "final_score": score
-                    },
-                    
-                    # Complete AI evaluation data
-                    "ai_evaluation": evaluation_data,
-                    
-                    # All generated charts (base64 encoded)
-                    "charts": charts,
-                    
-                    # Raw exam data
-                    "exam_data": {
-                        "questions": questions,
-                        "answers": answers,
-                        "events_summary": events_summary
+            events_summary = {row[0]: row[1] for row in await cursor.fetchall()}
+
+        # Get analytics data if requested
+        analytics_data = None
+        if request.include_analytics and user_id == exam_creator_id:
+            try:
+                analytics = await build_exam_analytics(request.session_id)
+                analytics_data = analytics.model_dump()
+            except:
+                analytics_data = None
+        
+        # Generate AI evaluation using ChatGPT
+        evaluation_data = await generate_ai_summaries(
+            openai_api_key,
+            exam_title,
+            user_display, 
+            score,
+            questions,
+            answers,
+            time_taken_seconds,
+            events_summary,
+            analytics_data
+        )
+        
+        # Generate charts
+        charts = generate_charts(evaluation_data)
+        
+        # Calculate grade gradient for PDF
+        overall_perf = evaluation_data.get('overall_performance', {})
+        grade_level = overall_perf.get('grade_level', 'C')
+        
+        if grade_level == 'A' or score >= 90:
+            grade_gradient = "linear-gradient(135deg, #059669 0%, #10b981 100%)"
+        elif grade_level == 'B' or score >= 80:
+            grade_gradient = "linear-gradient(135deg, #2563eb 0%, #3b82f6 100%)"
+        elif grade_level == 'C' or score >= 70:
+            grade_gradient = "linear-gradient(135deg, #d97706 0%, #f59e0b 100%)" 
+        elif grade_level == 'D' or score >= 60:
+            grade_gradient = "linear-gradient(135deg, #dc2626 0%, #ef4444 100%)"
+        else:
+            grade_gradient = "linear-gradient(135deg, #7c2d12 0%, #dc2626 100%)"
+        
+        # Generate PDF report
+        pdf_path = await create_pdf_report(
+            exam_title,
+            user_display,
+            score,
+            start_time,
+            end_time,
+            time_taken_seconds,
+            questions,
+            answers,
+            events_summary,
+            analytics_data,
+            evaluation_data,
+            charts,
+            request,
+            grade_gradient
+        )
+        
+        # Read PDF content for base64 encoding
+        with open(pdf_path, 'rb') as pdf_file:
+            pdf_content = pdf_file.read()
+            pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
+        
+        # Clean up temporary file
+        os.unlink(pdf_path)
+        
+        # Return JSON with PDF and ALL generation data
+        return {
+            "success": True,
+            "pdf_data": pdf_base64,
+            "filename": f"SENSAI_Report_{exam_title}_{user_display}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+            "generation_data": {
+                # Basic exam information
+                "exam_info": {
+                    "exam_id": request.exam_id,
+                    "session_id": request.session_id,
+                    "exam_title": exam_title,
+                    "exam_description": exam_description,
+                    "student_name": user_display,
+                    "student_user_id": session_user_id,
+                    "exam_date": start_time.strftime("%B %d, %Y"),
+                    "exam_datetime": start_time.isoformat(),
+                    "completion_datetime": end_time.isoformat(),
+                    "duration_seconds": time_taken_seconds,
+                    "duration_formatted": f"{time_taken_seconds/60:.1f} minutes",
+                    "total_questions": len(questions),
+                    "final_score": score
+                },
+                
+                # Complete AI evaluation data
+                "ai_evaluation": evaluation_data,
+                
+                # All generated charts (base64 encoded)
+                "charts": charts,
+                
+                # Raw exam data
+                "exam_data": {
+                    "questions": questions,
+                    "answers": answers,
+                    "events_summary": events_summary
+                },
+                
+                # Analytics data (if available)
+                "analytics": analytics_data,
+                
+                # Template variables used for PDF generation
+                "template_variables": {
+                    "exam_title": exam_title,
+                    "student_name": user_display,
+                    "score": score,
+                    "grade_gradient": grade_gradient,
+                    "exam_date": start_time.strftime("%B %d, %Y"),
+                    "duration": f"{time_taken_seconds/60:.1f} minutes",
+                    "total_questions": len(questions),
+                    "generation_date": datetime.now().strftime("%B %d, %Y at %I:%M %p")
+                },
+                
+                # Generation metadata
+                "generation_metadata": {
+                    "generated_at": datetime.now().isoformat(),
+                    "report_type": request.report_type,
+                    "request_parameters": {
+                        "include_analytics": request.include_analytics,
+                        "include_questions": request.include_questions,
+                        "include_video_info": request.include_video_info
                     },
-                    
-                    # Analytics data (if available)
-                    "analytics": analytics_dict,
-                    
-                    # Template variables used for PDF generation
-                    "template_variables": {
-                        "exam_title": exam_title,
-                        "student_name": user_display,
-                        "score": score,
-                        "grade_gradient": grade_gradient,
-                        "exam_date": start_time.strftime("%B %d, %Y"),
-                        "duration": f"{time_taken_seconds/60:.1f} minutes",
-                        "total_questions": len(questions),
-                        "generation_date": datetime.now().strftime("%B %d, %Y at %I:%M %p")
+                    "included_sections": {
+                        "analytics": request.include_analytics and analytics_data is not None,
+                        "questions": request.include_questions,
+                        "charts": len(charts) > 0,
+                        "ai_evaluation": evaluation_data is not None,
+                        "video_info": request.include_video_info
                     },
-                    
-                    # Generation metadata
-                    "generation_metadata": {
-                        "generated_at": datetime.now().isoformat(),
-                        "report_type": request.report_type,
-                        "request_parameters": {
-                            "include_analytics": request.include_analytics,
-                            "include_questions": request.include_questions,
-                            "include_video_info": request.include_video_info
-                        },
-                        "included_sections": {
-                            "analytics": request.include_analytics and analytics_data is not None,
-                            "questions": request.include_questions,
-                            "charts": len(charts) > 0,
-                            "ai_evaluation": evaluation_data is not None,
-                            "video_info": request.include_video_info
-                        },
-                        "chart_count": len(charts),
-                        "ai_model_used": "gpt-4o-mini",
-                        "processing_time_seconds": (datetime.now() - datetime.fromisoformat(datetime.now().isoformat().split('.')[0])).total_seconds() if True else 0
-                    }
+                    "chart_count": len(charts),
+                    "ai_model_used": "gpt-4o-mini",
+                    "processing_time_seconds": (datetime.now() - datetime.fromisoformat(datetime.now().isoformat().split('.')[0])).total_seconds() if True else 0
                 }
             }
-            
+        }
+        
     except HTTPException:
         raise
     except Exception as e:
@@ -1940,8 +2005,7 @@ async def create_custom_course(
         )
         
         # Step 4: Create temporary PDF file for OpenAI (convert text to PDF)
-        import openai
-        openai_client = openai.AsyncOpenAI(api_key=openai_api_key)
+        openai_client = get_async_openai_client(openai_api_key)
         
         # Create a simple PDF from the reference material text
         pdf_html = f"""
@@ -2103,8 +2167,7 @@ async def generate_custom_course_with_openai(
     """Generate custom course recommendations using OpenAI based on exam performance"""
     
     try:
-        import openai
-        client = openai.AsyncOpenAI(api_key=api_key)
+        client = get_async_openai_client(api_key)
         
         # Extract key information from report data
         exam_info = report_data.get('exam_info', {})
@@ -2158,7 +2221,7 @@ async def generate_custom_course_with_openai(
         
         # Parse JSON response
         try:
-            course_json = json.loads(course_response.choices[0].message.content)
+            course_json = orjson.loads(course_response.choices[0].message.content)
             
             # Validate required fields
             required_fields = ['course_name', 'course_about', 'course_audience']
@@ -2168,7 +2231,7 @@ async def generate_custom_course_with_openai(
             
             return course_json
             
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             print("Failed to parse JSON from OpenAI course response, using fallback")
             return generate_fallback_course(exam_info, overall_performance, strengths, weaknesses)
         
@@ -2432,8 +2495,6 @@ async def generate_personalized_course_complete(
         print(f"Starting task content generation for course {course_id}")
         
         # Import the necessary modules for task generation
-        import instructor
-        import openai
         from api.db.course import get_course_generation_job_details
         from api.db.task import store_task_generation_request
         from api.routes.ai import generate_course_task
@@ -2449,9 +2510,7 @@ async def generate_personalized_course_complete(
                 return
                 
             # Set up OpenAI client
-            client = instructor.from_openai(
-                openai.AsyncOpenAI(api_key=settings.openai_api_key)
-            )
+            client = get_instructor_client(settings.openai_api_key)
             
             # Create task generation jobs
             tasks_to_generate = []
@@ -2524,8 +2583,7 @@ async def generate_ai_summaries(
     """Generate structured AI evaluation using ChatGPT with detailed criteria"""
     
     try:
-        import openai
-        client = openai.AsyncOpenAI(api_key=api_key)
+        client = get_async_openai_client(api_key)
         
         # Prepare detailed question analysis
         question_details = []
@@ -2556,7 +2614,7 @@ async def generate_ai_summaries(
         - Answered: {len([a for a in answers.values() if a.strip()])}
         
         QUESTIONS AND ANSWERS:
-        {json.dumps(question_details, indent=2)}
+        {orjson.dumps(question_details).decode()}
         
         Return ONLY a valid JSON object with this exact structure:
         {{
@@ -2652,9 +2710,9 @@ async def generate_ai_summaries(
         
         # Parse JSON response
         try:
-            evaluation_json = json.loads(evaluation_response.choices[0].message.content)
+            evaluation_json = orjson.loads(evaluation_response.choices[0].message.content)
             return evaluation_json
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             print("Failed to parse JSON from OpenAI, using fallback")
             return generate_fallback_evaluation(exam_title, student_name, score, questions, answers, time_taken)
         
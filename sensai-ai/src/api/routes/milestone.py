@@ -8,6 +8,7 @@ from api.db.milestone import (
 )
 from api.db.course import get_milestones_for_course as get_milestones_for_course_from_db
 from api.models import UpdateMilestoneRequest
+from api.llm import clear_course_context_cache
 
 router = APIRouter()
 
@@ -20,12 +21,14 @@ async def get_all_milestones_for_org(org_id: int) -> List[Dict]:
 @router.put("/{milestone_id}")
 async def update_milestone(milestone_id: int, request: UpdateMilestoneRequest):
     await update_milestone_in_db(milestone_id, request.name)
+    clear_course_context_cache()
     return {"message": "Milestone updated"}
 
 
 @router.delete("/{milestone_id}")
 async def delete_milestone(milestone_id: int):
     await delete_milestone_from_db(milestone_id)
+    clear_course_context_cache()
     return {"message": "Milestone deleted"}
 
 
@@ -29,6 +29,7 @@ from api.models import (
     DuplicateTaskResponse,
     MarkTaskCompletedRequest,
 )
+from api.llm import clear_course_context_cache
 
 router = APIRouter()
 
@@ -65,6 +66,7 @@ async def publish_learning_material_task(
     )
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
+    clear_course_context_cache()
     return result
 
 
@@ -81,6 +83,7 @@ async def update_learning_material_task(
     )
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
+    clear_course_context_cache()
     return result
 
 
@@ -95,6 +98,7 @@ async def update_draft_quiz(task_id: int, request: UpdateDraftQuizRequest) -> Qu
     )
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
+    clear_course_context_cache()
     return result
 
 
@@ -110,6 +114,7 @@ async def update_published_quiz(
     )
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
+    clear_course_context_cache()
     return result
 
 
@@ -125,12 +130,14 @@ async def duplicate_task(
 @router.delete("/{task_id}")
 async def delete_task(task_id: int):
     await delete_task_in_db(task_id)
+    clear_course_context_cache()
     return {"success": True}
 
 
 @router.delete("/")
 async def delete_tasks(task_ids: List[int] = Query(...)):
     await delete_tasks_in_db(task_ids)
+    clear_course_context_cache()
     return {"success": True}
 
 
@@ -28,6 +28,9 @@ class Settings(BaseSettings):
     slack_usage_stats_webhook_url: str | None = None
     phoenix_endpoint: str | None = None
     phoenix_api_key: str | None = None
+    openai_requests_per_minute: int = 5000  # OpenAI account rate limits, used for throttling
+    openai_tokens_per_minute: int = 800000
+    db_pool_size: int = 5  # SQLite connections kept open by the API
     AWS_ACCESS_KEY_ID: str | None = None
     AWS_SECRET_ACCESS_KEY: str | None = None
 
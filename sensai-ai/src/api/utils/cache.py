@@ -0,0 +1,46 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
+
+class TTLCache:
+    """
+    In-process LRU cache with a per-entry TTL.
+
+    The methods are async so a shared backend (e.g. Redis) can be swapped in
+    without touching the callers.
+    """
+
+    def __init__(self, ttl: int, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
@@ -1,6 +1,8 @@
+import asyncio
 import sqlite3
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from api.config import sqlite_db_path
+from api.settings import settings
 from api.utils.logging import logger
 import aiosqlite
 from contextlib import asynccontextmanager
@@ -11,13 +13,114 @@ def trace_callback(sql):
     logger.info(f"Executing operation: {sql}")
 
 
+# WAL lets readers run alongside the writer, and with it synchronous=NORMAL
+# only fsyncs at checkpoints instead of on every commit
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-64000;",  # 64 MB page cache
+    "PRAGMA mmap_size=268435456;",  # 256 MB
+]
+
+
+async def configure_connection(conn: aiosqlite.Connection):
+    for pragma in CONNECTION_PRAGMAS:
+        await conn.execute(pragma)
+
+    await conn.set_trace_callback(trace_callback)
+
+
+class AioSqlitePool:
+    """
+    Fixed-size pool of open aiosqlite connections.
+
+    Keeping connections open preserves SQLite's per-connection page cache and
+    skips the connect/PRAGMA setup on every request. Each connection is handed
+    to one caller at a time.
+    """
+
+    def __init__(self, db_path: str, size: int):
+        self.db_path = db_path
+        self.size = size
+        self.connections: List[aiosqlite.Connection] = []
+        self.queue: Optional[asyncio.Queue] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.queue is not None
+
+    @property
+    def has_idle_connection(self) -> bool:
+        return self.is_open and not self.queue.empty()
+
+    async def open(self):
+        if self.is_open:
+            return
+
+        queue = asyncio.Queue()
+        for _ in range(self.size):
+            conn = await aiosqlite.connect(self.db_path)
+            await configure_connection(conn)
+            self.connections.append(conn)
+            queue.put_nowait(conn)
+
+        self.queue = queue
+
+    async def close(self):
+        if not self.is_open:
+            return
+
+        # New callers fall back to dedicated connections from here on, while
+        # requests still running return theirs to this queue
+        queue, self.queue = self.queue, None
+
+        # Wait for every checked-out connection to come back before closing
+        for _ in range(len(self.connections)):
+            conn = await queue.get()
+            await conn.close()
+
+        self.connections = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        # Keep a reference to this queue so the connection still goes back
+        # to it if the pool is closed while it is checked out
+        queue = self.queue
+        conn = await queue.get()
+        try:
+            yield conn
+        finally:
+            # A fresh connection would drop uncommitted work on close; do the
+            # same here so it does not leak into the next caller's transaction.
+            # The connection goes back even if the rollback fails, so close()
+            # never waits on one that was lost
+            try:
+                if conn.in_transaction:
+                    await conn.rollback()
+            finally:
+                queue.put_nowait(conn)
+
+
+db_pool = AioSqlitePool(sqlite_db_path, settings.db_pool_size)
+
+
 @asynccontextmanager
 async def get_new_db_connection():
+    # The pool is opened by the app's lifespan; scripts like startup.py that
+    # run without it get a dedicated connection. So does a request that finds
+    # every pooled connection in use, rather than waiting: some helpers open
+    # a connection while their caller still holds one, and waiting there
+    # could leave every request blocked on the others
+    if db_pool.has_idle_connection:
+        async with db_pool.acquire() as conn:
+            yield conn
+        return
+
     conn = None
     try:
         conn = await aiosqlite.connect(sqlite_db_path)
-        await conn.execute("PRAGMA synchronous=NORMAL;")
-        await conn.set_trace_callback(trace_callback)
+        await configure_connection(conn)
         yield conn
     except Exception as e:
         if conn:
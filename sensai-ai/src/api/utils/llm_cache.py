@@ -0,0 +1,21 @@
+import hashlib
+
+import orjson
+
+from api.utils.cache import TTLCache
+
+# How long a cached LLM response stays valid, in seconds
+LLM_CACHE_TTL = 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 1024
+
+
+def make_llm_cache_key(**request) -> str:
+    """
+    Build a cache key from everything that determines an LLM response
+    (model, messages, sampling parameters, response schema)
+    """
+    payload = orjson.dumps(request, option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.sha256(payload).hexdigest()
+
+
+llm_cache = TTLCache(ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES)
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from typing import List
+
+import orjson
+
+from api.settings import settings
+
+# Rough average for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket that refills continuously up to `capacity` tokens per `period`
+    seconds. `acquire` waits until enough tokens are available instead of
+    letting the request go out and get rate limited.
+    """
+
+    def __init__(self, capacity: int, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: int = 1):
+        # A single request larger than the whole bucket can never fit, so let
+        # it through once the bucket is full rather than waiting forever
+        amount = min(amount, self.capacity)
+
+        while True:
+            self.refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+def estimate_prompt_tokens(messages: List) -> int:
+    return len(orjson.dumps(messages, default=str)) // CHARS_PER_TOKEN
+
+
+openai_requests_limiter = AsyncTokenBucket(settings.openai_requests_per_minute)
+openai_tokens_limiter = AsyncTokenBucket(settings.openai_tokens_per_minute)
+
+
+async def throttle_openai_request(messages: List, max_completion_tokens: int):
+    """
+    Wait until an OpenAI request fits within the account's requests-per-minute
+    and tokens-per-minute limits
+    """
+    await openai_requests_limiter.acquire(1)
+    await openai_tokens_limiter.acquire(
+        estimate_prompt_tokens(messages) + max_completion_tokens
+    )
@@ -3,7 +3,8 @@ from fastapi import WebSocket, WebSocketDisconnect, HTTPException, Depends, Quer
 from fastapi.routing import APIRouter
 from fastapi.websockets import WebSocketState
 import json
-import base64
+import orjson
+import pybase64
 import os
 import uuid
 import asyncio
@@ -16,6 +17,7 @@ from api.models import (
 )
 from api.config import data_root_dir
 from api.utils.db import get_new_db_connection
+from api.db.exam import invalidate_exam_cache
 from api.utils.event_scoring import EventScorer
 from api.llm import generate_surprise_viva_questions
 from api.settings import settings
@@ -226,7 +228,7 @@ async def trigger_surprise_viva(session_id: str, exam_id: str, suspicious_events
                 
             exam_title = exam_data[0]
             exam_description = exam_data[1] 
-            exam_questions = json.loads(exam_data[2]) if exam_data[2] else []
+            exam_questions = orjson.loads(exam_data[2]) if exam_data[2] else []
         
         # Prepare context for viva generation
         exam_context = {
@@ -376,6 +378,8 @@ async def save_video_chunk(exam_id: str, session_id: str, video_data: bytes, vid
             )
             
             await conn.commit()
+
+        await invalidate_exam_cache(exam_id)
         
         return master_video_path  # Return master path instead of chunk path
             
@@ -436,6 +440,8 @@ async def finalize_video_recording(exam_id: str, video_dir: str):
                 )
                 
                 await conn.commit()
+
+            await invalidate_exam_cache(exam_id)
                 
             return {
                 'master_video': master_video_path,
@@ -552,7 +558,9 @@ async def websocket_exam_session(websocket: WebSocket, exam_id: str, token: str
             while True:
                 try:
                     data = await websocket.receive_text()
-                    message = json.loads(data)
+                    # Frames carry base64 video chunks, so parse them with orjson;
+                    # its JSONDecodeError subclasses json's, caught below
+                    message = orjson.loads(data)
                     
                     # Log message type but avoid printing large video data
                     message_type = message.get("type", "unknown")
@@ -765,8 +773,9 @@ async def handle_exam_message(websocket: WebSocket, session_id: str, user_id: st
         
         if data:
             try:
-                # Decode base64 video data
-                video_data = base64.b64decode(data)
+                # Decode base64 video data; pybase64 uses SIMD and is a drop-in
+                # for base64.b64decode on these multi-megabyte chunks
+                video_data = pybase64.b64decode(data)
                 
                 # Save chunk and append to master WebM file
                 chunk_path = await save_video_chunk(exam_id, session_id, video_data, video_dir, chunk_counter)
@@ -0,0 +1,121 @@
+import pytest
+import orjson
+from unittest.mock import patch
+from src.api.db.exam import (
+    exam_cache,
+    get_exam_from_db,
+    build_answer_key,
+    get_exam_answer_key,
+    invalidate_exam_cache,
+)
+
+
+EXAM_ROW = (
+    "exam-1",
+    "Algebra",
+    "Linear equations",
+    30,
+    orjson.dumps([{"id": "q1", "type": "text", "question": "Solve x + 1 = 2"}]).decode(),
+    None,
+    orjson.dumps({"camera": True}).decode(),
+    "2024-01-01 12:00:00",
+    "2024-01-01 12:00:00",
+    1,
+    2,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_exam_cache():
+    exam_cache.clear()
+    yield
+    exam_cache.clear()
+
+
+@pytest.mark.asyncio
+class TestGetExamFromDb:
+    @patch("src.api.db.exam.execute_db_operation")
+    async def test_get_exam_parses_row(self, mock_execute):
+        """Test that the exam row is returned with its JSON columns parsed."""
+        mock_execute.return_value = EXAM_ROW
+
+        exam = await get_exam_from_db("exam-1")
+
+        assert exam["title"] == "Algebra"
+        assert exam["questions"][0]["id"] == "q1"
+        assert exam["settings"] == {}
+        assert exam["monitoring"] == {"camera": True}
+        assert exam["created_by"] == 2
+
+    @patch("src.api.db.exam.execute_db_operation")
+    async def test_get_exam_not_found(self, mock_execute):
+        """Test that a missing exam returns None and is not cached."""
+        mock_execute.return_value = None
+
+        assert await get_exam_from_db("missing") is None
+        assert await get_exam_from_db("missing") is None
+        assert mock_execute.call_count == 2
+
+    @patch("src.api.db.exam.execute_db_operation")
+    async def test_get_exam_is_cached(self, mock_execute):
+        """Test that repeat reads skip the database and return independent copies."""
+        mock_execute.return_value = EXAM_ROW
+
+        first = await get_exam_from_db("exam-1")
+        first["questions"].clear()
+        second = await get_exam_from_db("exam-1")
+
+        mock_execute.assert_called_once()
+        assert second["questions"][0]["id"] == "q1"
+
+    @patch("src.api.db.exam.execute_db_operation")
+    async def test_invalidate_exam_cache(self, mock_execute):
+        """Test that invalidating an exam makes the next read hit the database."""
+        mock_execute.return_value = EXAM_ROW
+
+        await get_exam_from_db("exam-1")
+        await invalidate_exam_cache("exam-1")
+        await get_exam_from_db("exam-1")
+
+        assert mock_execute.call_count == 2
+
+
+class TestBuildAnswerKey:
+    def test_build_answer_key(self):
+        """Test that the answer key indexes questions by ID and totals the points."""
+        questions = [
+            {"id": "q1", "type": "multiple_choice", "correct_answer": "b", "points": 2},
+            {"id": "q2", "type": "text"},
+        ]
+
+        answer_key = build_answer_key(questions)
+
+        assert answer_key == {
+            "questions": {
+                "q1": ("multiple_choice", "b", 2),
+                "q2": ("text", None, 1),
+            },
+            "total_points": 3,
+        }
+
+
+@pytest.mark.asyncio
+class TestGetExamAnswerKey:
+    @patch("src.api.db.exam.execute_db_operation")
+    async def test_get_exam_answer_key_is_cached(self, mock_execute):
+        """Test that the answer key is built once per exam."""
+        mock_execute.return_value = EXAM_ROW
+
+        first = await get_exam_answer_key("exam-1")
+        second = await get_exam_answer_key("exam-1")
+
+        mock_execute.assert_called_once()
+        assert first is second
+        assert first["questions"]["q1"] == ("text", None, 1)
+
+    @patch("src.api.db.exam.execute_db_operation")
+    async def test_get_exam_answer_key_not_found(self, mock_execute):
+        """Test that a missing exam has no answer key."""
+        mock_execute.return_value = None
+
+        assert await get_exam_answer_key("missing") is None
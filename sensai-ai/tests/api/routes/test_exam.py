@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+import orjson
+from unittest.mock import patch, AsyncMock, MagicMock
+from api.db import create_exams_table, create_exam_sessions_table, create_exam_events_table
+from api.db.exam import exam_cache
+from api.models import ExamSubmissionRequest
+from api.routes.exam import submit_exam, build_exam_analytics
+from api.utils.db import AioSqlitePool
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submissions_with_a_small_pool(tmp_path):
+    """
+    Test that more simultaneous submissions than pooled connections all
+    complete, including the first read of an exam that is not cached yet
+    """
+    db_path = str(tmp_path / "exam.sqlite")
+    pool = AioSqlitePool(db_path, 1)
+    await pool.open()
+    exam_cache.clear()
+
+    questions = [
+        {"id": "q1", "type": "multiple_choice", "correct_answer": "b", "points": 1},
+        {"id": "q2", "type": "text", "points": 1},
+    ]
+
+    try:
+        async with pool.acquire() as conn:
+            cursor = await conn.cursor()
+            await create_exams_table(cursor)
+            await create_exam_sessions_table(cursor)
+            await create_exam_events_table(cursor)
+            await cursor.execute(
+                "INSERT INTO exams (id, title, duration, questions) VALUES (?, ?, ?, ?)",
+                ("exam-1", "Algebra", 30, orjson.dumps(questions).decode()),
+            )
+            await cursor.executemany(
+                "INSERT INTO exam_sessions (id, exam_id, user_id, status) VALUES (?, ?, ?, 'active')",
+                [(f"session-{user_id}", "exam-1", user_id) for user_id in range(3)],
+            )
+            await conn.commit()
+
+        style_analysis = MagicMock(
+            has_style_change=False,
+            confidence_score=0.0,
+            style_inconsistencies=[],
+            analysis_summary="",
+        )
+
+        with patch("api.utils.db.db_pool", pool), patch(
+            "api.utils.db.sqlite_db_path", db_path
+        ), patch(
+            "api.routes.exam.analyze_exam_writing_style",
+            AsyncMock(return_value=style_analysis),
+        ):
+            responses = await asyncio.wait_for(
+                asyncio.gather(
+                    *(
+                        submit_exam(
+                            "exam-1",
+                            ExamSubmissionRequest(answers={"q1": "b", "q2": "x = 1"}, time_taken=60),
+                            user_id=str(user_id),
+                            session_id=f"session-{user_id}",
+                        )
+                        for user_id in range(3)
+                    )
+                ),
+                timeout=10,
+            )
+
+        assert [response["score"] for response in responses] == [75.0, 75.0, 75.0]
+
+        async with pool.acquire() as conn:
+            cursor = await conn.execute(
+                "SELECT COUNT(*) FROM exam_sessions WHERE status = 'completed'"
+            )
+            assert await cursor.fetchone() == (3,)
+    finally:
+        exam_cache.clear()
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_build_exam_analytics(tmp_path):
+    """Test that a session's events are aggregated into its analytics"""
+    db_path = str(tmp_path / "exam.sqlite")
+    pool = AioSqlitePool(db_path, 1)
+    await pool.open()
+
+    try:
+        async with pool.acquire() as conn:
+            cursor = await conn.cursor()
+            await create_exam_events_table(cursor)
+            await cursor.executemany(
+                "INSERT INTO exam_events (session_id, event_type, event_data, timestamp) VALUES (?, ?, ?, ?)",
+                [
+                    ("session-1", "exam_started", "{}", 1),
+                    ("session-1", "question_viewed", orjson.dumps({"question_id": "q1"}).decode(), 2),
+                    ("session-1", "exam_submitted", "{}", 3),
+                    ("session-2", "exam_started", "{}", 1),
+                ],
+            )
+            await conn.commit()
+
+        with patch("api.utils.db.db_pool", pool):
+            analytics = await build_exam_analytics("session-1")
+
+        assert analytics.session_id == "session-1"
+        assert analytics.total_events == 3
+        assert [event.event_type for event in analytics.timeline_events] == [
+            "exam_started",
+            "question_viewed",
+            "exam_submitted",
+        ]
+        assert [step["step"] for step in analytics.step_timeline] == [
+            "exam_started",
+            "question_viewed_q1",
+            "exam_submitted",
+        ]
+    finally:
+        await pool.close()
@@ -1,15 +1,72 @@
+import asyncio
+import json
+import httpx
+import openai
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from pydantic import BaseModel
+# llm.py imports these through api.*, so use the same module objects
+from api.utils.llm_cache import llm_cache
+from api.models import (
+    ExamContext,
+    ExamEvaluationReport,
+    ExamSummaryEvaluation,
+    ExamQuestionsEvaluation,
+    ExamRecommendationsEvaluation,
+    ExamTeacherEvaluation,
+)
 from src.api.llm import (
     is_reasoning_model,
+    fit_completion_tokens,
+    should_retry,
     validate_openai_api_key,
     run_llm_with_instructor,
     stream_llm_with_instructor,
     stream_llm_with_openai,
+    streamed_llm_with_instructor,
+    streamed_llm_with_openai,
+    evaluate_exam_with_openai,
+    evaluate_exams_batch,
+    create_simple_openai_evaluation,
+    generate_exam_descriptions_bulk,
+    generate_exam_description_with_openai,
+    get_course_context_for_ai,
+    format_course_details_for_ai,
+    invalidate_course_context,
+    clear_course_context_cache,
+    course_context_cache,
+    generate_surprise_viva_questions,
+    generate_surprise_viva_questions_bulk,
+    generate_surprise_viva_questions_concurrently,
+    stream_exam_evaluation_with_openai,
+    stream_surprise_viva_questions,
+    get_openai_client,
+    get_async_openai_client,
+    get_instructor_client,
+    close_async_openai_clients,
+    OPENAI_HTTP_LIMITS,
+    async_openai_clients,
+    api_key_validation_cache,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_client_caches():
+    """Clear the cached OpenAI clients and responses so each test sees its own mocks."""
+    get_openai_client.cache_clear()
+    get_async_openai_client.cache_clear()
+    get_instructor_client.cache_clear()
+    async_openai_clients.clear()
+    llm_cache.clear()
+    course_context_cache.clear()
+    api_key_validation_cache.clear()
+    yield
+    get_openai_client.cache_clear()
+    get_async_openai_client.cache_clear()
+    get_instructor_client.cache_clear()
+    llm_cache.clear()
+
+
 class TestIsReasoningModel:
     """Test the is_reasoning_model function."""
 
@@ -44,6 +101,136 @@ class TestIsReasoningModel:
         assert is_reasoning_model(None) is False
 
 
+class TestFitCompletionTokens:
+    """Test the fit_completion_tokens function."""
+
+    def test_small_request_is_unchanged(self):
+        """Test that a budget that fits is passed through."""
+        messages = [{"role": "user", "content": "hello"}]
+        assert fit_completion_tokens("gpt-4o", messages, 300) == 300
+
+    def test_request_is_capped_at_model_output_limit(self):
+        """Test that the budget never exceeds the model's maximum output."""
+        messages = [{"role": "user", "content": "hello"}]
+        assert fit_completion_tokens("gpt-4o", messages, 50000) == 16384
+
+    def test_request_is_capped_by_remaining_context(self):
+        """Test that a long prompt leaves less room for the completion."""
+        messages = [{"role": "user", "content": "x" * 4 * 125000}]
+        assert 0 < fit_completion_tokens("gpt-4o", messages, 8192) < 3000
+
+
+class TestShouldRetry:
+    """Test the should_retry function."""
+
+    def test_should_retry_authentication_error(self):
+        """Test that authentication errors are not retried."""
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        response = httpx.Response(401, request=request)
+        error = openai.AuthenticationError("Bad key", response=response, body=None)
+        assert should_retry(error) is False
+
+    def test_should_retry_non_retryable_message(self):
+        """Test that quota and billing errors are not retried."""
+        assert should_retry(Exception("You exceeded your current QUOTA")) is False
+        assert should_retry(Exception("Billing hard limit reached")) is False
+
+    def test_should_retry_transient_error(self):
+        """Test that other errors are retried."""
+        assert should_retry(Exception("Connection reset by peer")) is True
+
+
+class TestClientCache:
+    """Test the cached OpenAI client factories."""
+
+    @patch("src.api.llm.OpenAI")
+    def test_get_openai_client_reused_per_key(self, mock_openai):
+        """Test that the sync client is constructed once per API key."""
+        mock_openai.side_effect = lambda api_key: MagicMock(api_key=api_key)
+
+        first = get_openai_client("key_a")
+        second = get_openai_client("key_a")
+        other = get_openai_client("key_b")
+
+        assert first is second
+        assert other is not first
+        assert mock_openai.call_count == 2
+
+    @patch("src.api.llm.instructor.from_openai")
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    def test_get_instructor_client_wraps_cached_async_client(
+        self, mock_async_openai, mock_instructor
+    ):
+        """Test that the instructor wrapper is built once around the shared async client."""
+        first = get_instructor_client("key_a")
+        second = get_instructor_client("key_a")
+
+        assert first is second
+        mock_async_openai.assert_called_once()
+        assert mock_async_openai.call_args[1]["api_key"] == "key_a"
+        mock_instructor.assert_called_once_with(mock_async_openai.return_value)
+
+
+    @patch("src.api.llm.DefaultAioHttpClient", None)
+    @patch("src.api.llm.openai.DefaultAsyncHttpxClient")
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    def test_get_async_openai_client_pool_limits(
+        self, mock_async_openai, mock_http_client
+    ):
+        """Test that the async client is built with the widened connection pool."""
+        get_async_openai_client("key_a")
+
+        assert mock_http_client.call_args[1]["limits"] is OPENAI_HTTP_LIMITS
+        assert (
+            mock_async_openai.call_args[1]["http_client"]
+            is mock_http_client.return_value
+        )
+
+    @patch("src.api.llm.DefaultAioHttpClient")
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    def test_get_async_openai_client_prefers_aiohttp(
+        self, mock_async_openai, mock_aiohttp_client
+    ):
+        """Test that the aiohttp transport is used when the SDK provides it."""
+        get_async_openai_client("key_a")
+
+        assert (
+            mock_async_openai.call_args[1]["http_client"]
+            is mock_aiohttp_client.return_value
+        )
+
+    @patch("src.api.llm.openai.DefaultAsyncHttpxClient")
+    @patch("src.api.llm.DefaultAioHttpClient")
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    def test_get_async_openai_client_aiohttp_extra_missing(
+        self, mock_async_openai, mock_aiohttp_client, mock_httpx_client
+    ):
+        """Test the httpx fallback when the aiohttp extra is not installed."""
+        mock_aiohttp_client.side_effect = RuntimeError("aiohttp extra missing")
+
+        get_async_openai_client("key_a")
+
+        assert (
+            mock_async_openai.call_args[1]["http_client"]
+            is mock_httpx_client.return_value
+        )
+
+    @pytest.mark.asyncio
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_close_async_openai_clients(self, mock_async_openai):
+        """Test that shutdown closes the shared async clients and resets the cache."""
+        client = AsyncMock()
+        mock_async_openai.return_value = client
+
+        assert get_async_openai_client("key_a") is client
+
+        await close_async_openai_clients()
+
+        client.close.assert_awaited_once()
+        get_async_openai_client("key_a")
+        assert mock_async_openai.call_count == 2
+
+
 class TestValidateOpenaiApiKey:
     """Test the validate_openai_api_key function."""
 
@@ -54,14 +241,12 @@ class TestValidateOpenaiApiKey:
         mock_client = MagicMock()
         mock_openai.return_value = mock_client
 
-        # Mock models list without the premium model
-        mock_models = MagicMock()
-        mock_models.data = [
-            MagicMock(id="gpt-3.5-turbo"),
-            MagicMock(id="gpt-4"),
-            MagicMock(id="text-davinci-003"),
-        ]
-        mock_client.models.list.return_value = mock_models
+        # The premium model is not visible to free trial keys
+        request = httpx.Request("GET", "https://api.openai.com/v1/models/gpt-4o-audio-preview-2024-12-17")
+        response = httpx.Response(404, request=request)
+        mock_client.models.retrieve.side_effect = openai.NotFoundError(
+            "Model not found", response=response, body=None
+        )
 
         # Call the function
         result = validate_openai_api_key("test_api_key")
@@ -69,7 +254,8 @@ class TestValidateOpenaiApiKey:
         # Assertions
         assert result is True  # Free trial account
         mock_openai.assert_called_once_with(api_key="test_api_key")
-        mock_client.models.list.assert_called_once()
+        mock_client.models.retrieve.assert_called_once_with("gpt-4o-audio-preview-2024-12-17")
+        mock_client.models.list.assert_not_called()
 
     @patch("src.api.llm.OpenAI")
     def test_validate_openai_api_key_paid_account(self, mock_openai):
@@ -78,14 +264,8 @@ class TestValidateOpenaiApiKey:
         mock_client = MagicMock()
         mock_openai.return_value = mock_client
 
-        # Mock models list with the premium model
-        mock_models = MagicMock()
-        mock_models.data = [
-            MagicMock(id="gpt-3.5-turbo"),
-            MagicMock(id="gpt-4"),
-            MagicMock(id="gpt-4o-audio-preview-2024-12-17"),  # Premium model
-        ]
-        mock_client.models.list.return_value = mock_models
+        # The premium model is retrievable
+        mock_client.models.retrieve.return_value = MagicMock(id="gpt-4o-audio-preview-2024-12-17")
 
         # Call the function
         result = validate_openai_api_key("test_api_key")
@@ -93,7 +273,7 @@ class TestValidateOpenaiApiKey:
         # Assertions
         assert result is False  # Paid account
         mock_openai.assert_called_once_with(api_key="test_api_key")
-        mock_client.models.list.assert_called_once()
+        mock_client.models.retrieve.assert_called_once_with("gpt-4o-audio-preview-2024-12-17")
 
     @patch("src.api.llm.OpenAI")
     def test_validate_openai_api_key_exception(self, mock_openai):
@@ -101,7 +281,7 @@ class TestValidateOpenaiApiKey:
         # Setup mocks
         mock_client = MagicMock()
         mock_openai.return_value = mock_client
-        mock_client.models.list.side_effect = Exception("API Error")
+        mock_client.models.retrieve.side_effect = Exception("API Error")
 
         # Call the function
         result = validate_openai_api_key("invalid_api_key")
@@ -109,7 +289,42 @@ class TestValidateOpenaiApiKey:
         # Assertions
         assert result is None  # Exception case
         mock_openai.assert_called_once_with(api_key="invalid_api_key")
-        mock_client.models.list.assert_called_once()
+        mock_client.models.retrieve.assert_called_once()
+
+    @patch("src.api.llm.OpenAI")
+    def test_validate_openai_api_key_is_cached(self, mock_openai):
+        """Test that a validated key is not checked against the API again."""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_client.models.retrieve.return_value = MagicMock(id="gpt-4o-audio-preview-2024-12-17")
+
+        assert validate_openai_api_key("test_api_key") is False
+        assert validate_openai_api_key("test_api_key") is False
+
+        mock_client.models.retrieve.assert_called_once()
+        assert "test_api_key" not in api_key_validation_cache
+
+    @patch("src.api.llm.OpenAI")
+    def test_validate_openai_api_key_errors_are_not_cached(self, mock_openai):
+        """Test that a failed check is retried on the next call."""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_client.models.retrieve.side_effect = [Exception("API Error"), MagicMock()]
+
+        assert validate_openai_api_key("test_api_key") is None
+        assert validate_openai_api_key("test_api_key") is False
+        assert mock_client.models.retrieve.call_count == 2
+
+    @patch("src.api.llm.OpenAI")
+    def test_validate_openai_api_key_does_not_keep_client(self, mock_openai):
+        """Test that the probe client is closed and not shared through get_openai_client."""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+
+        validate_openai_api_key("test_api_key")
+
+        mock_client.close.assert_called_once()
+        assert get_openai_client.cache_info().currsize == 0
 
 
 @pytest.mark.asyncio
@@ -130,7 +345,7 @@ class TestRunLlmWithInstructor:
         mock_is_reasoning.return_value = False
         mock_client = AsyncMock()
         mock_instructor.return_value = mock_client
-        mock_response = {"response": "test response"}
+        mock_response = self.MockResponseModel(response="test response")
         mock_client.chat.completions.create.return_value = mock_response
 
         # Call the function
@@ -144,13 +359,16 @@ class TestRunLlmWithInstructor:
 
         # Assertions
         assert result == mock_response
-        mock_async_openai.assert_called_once_with(api_key="test_key")
+        mock_async_openai.assert_called_once()
+        assert mock_async_openai.call_args[1]["api_key"] == "test_key"
         mock_instructor.assert_called_once()
         mock_client.chat.completions.create.assert_called_once()
 
         # Check that temperature was set for non-reasoning model
         call_kwargs = mock_client.chat.completions.create.call_args[1]
         assert call_kwargs["temperature"] == 0
+        # Conversations are not stored server-side unless asked for
+        assert call_kwargs["store"] is False
 
     @patch("src.api.llm.instructor.from_openai")
     @patch("src.api.llm.openai.AsyncOpenAI")
@@ -177,7 +395,8 @@ class TestRunLlmWithInstructor:
 
         # Assertions
         assert result == mock_response
-        mock_async_openai.assert_called_once_with(api_key="test_key")
+        mock_async_openai.assert_called_once()
+        assert mock_async_openai.call_args[1]["api_key"] == "test_key"
         mock_instructor.assert_called_once()
         mock_client.chat.completions.create.assert_called_once()
 
@@ -186,6 +405,38 @@ class TestRunLlmWithInstructor:
         assert "temperature" not in call_kwargs
 
 
+    @patch("src.api.llm.instructor.from_openai")
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_run_llm_with_instructor_uses_cache(
+        self, mock_async_openai, mock_instructor
+    ):
+        """Test that identical deterministic requests are served from the cache."""
+        mock_client = AsyncMock()
+        mock_instructor.return_value = mock_client
+        mock_response = self.MockResponseModel(response="cached")
+        mock_client.chat.completions.create.return_value = mock_response
+
+        kwargs = dict(
+            api_key="test_key",
+            model="gpt-4o",
+            messages=[{"role": "user", "content": "hello"}],
+            response_model=self.MockResponseModel,
+            max_completion_tokens=100,
+        )
+        first = await run_llm_with_instructor(**kwargs)
+        second = await run_llm_with_instructor(**kwargs)
+
+        assert first is mock_response
+        # Hits are rebuilt from JSON so callers never share an instance
+        assert second == mock_response
+        assert second is not mock_response
+        mock_client.chat.completions.create.assert_called_once()
+
+        # A different API key does not share the cached response
+        await run_llm_with_instructor(**{**kwargs, "api_key": "other_key"})
+        assert mock_client.chat.completions.create.call_count == 2
+
+
 @pytest.mark.asyncio
 class TestStreamLlmWithInstructor:
     """Test the stream_llm_with_instructor function."""
@@ -219,7 +470,8 @@ class TestStreamLlmWithInstructor:
 
         # Assertions
         assert result == mock_stream
-        mock_async_openai.assert_called_once_with(api_key="test_key")
+        mock_async_openai.assert_called_once()
+        assert mock_async_openai.call_args[1]["api_key"] == "test_key"
         mock_instructor.assert_called_once()
         mock_client.chat.completions.create_partial.assert_called_once()
 
@@ -232,7 +484,7 @@ class TestStreamLlmWithInstructor:
 class TestStreamLlmWithOpenai:
     """Test the stream_llm_with_openai function."""
 
-    @patch("src.api.llm.openai.OpenAI")
+    @patch("src.api.llm.OpenAI")
     @patch("src.api.llm.is_reasoning_model")
     def test_stream_llm_with_openai_non_reasoning(self, mock_is_reasoning, mock_openai):
         """Test stream_llm_with_openai with non-reasoning model."""
@@ -261,7 +513,7 @@ class TestStreamLlmWithOpenai:
         assert call_kwargs["temperature"] == 0
         assert call_kwargs["stream"] is True
 
-    @patch("src.api.llm.openai.OpenAI")
+    @patch("src.api.llm.OpenAI")
     @patch("src.api.llm.is_reasoning_model")
     def test_stream_llm_with_openai_reasoning(self, mock_is_reasoning, mock_openai):
         """Test stream_llm_with_openai with reasoning model."""
@@ -289,3 +541,552 @@ class TestStreamLlmWithOpenai:
         call_kwargs = mock_client.chat.completions.create.call_args[1]
         assert "temperature" not in call_kwargs
         assert call_kwargs["stream"] is True
+
+
+class TestStreamedLlm:
+    """Test the stream context managers that close their streams on exit."""
+
+    @patch("src.api.llm.stream_llm_with_instructor")
+    async def test_streamed_llm_with_instructor_closes_on_error(self, mock_stream_llm):
+        """Test that the instructor stream is closed when the caller raises."""
+        mock_stream = MagicMock()
+        mock_stream.aclose = AsyncMock()
+        mock_stream_llm.return_value = mock_stream
+
+        with pytest.raises(ValueError):
+            async with streamed_llm_with_instructor(api_key="test_key") as stream:
+                assert stream is mock_stream
+                raise ValueError("consumer failed")
+
+        mock_stream_llm.assert_called_once_with(api_key="test_key")
+        mock_stream.aclose.assert_awaited_once()
+
+    @patch("src.api.llm.stream_llm_with_openai")
+    def test_streamed_llm_with_openai_closes_on_exit(self, mock_stream_llm):
+        """Test that the OpenAI stream is closed after use."""
+        mock_stream = MagicMock()
+        mock_stream_llm.return_value = mock_stream
+
+        with streamed_llm_with_openai(api_key="test_key") as stream:
+            assert stream is mock_stream
+
+        mock_stream.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+class TestEvaluateExamWithOpenai:
+    """Test the evaluate_exam_with_openai function."""
+
+    @patch("src.api.llm.get_instructor_client")
+    async def test_evaluate_exam_with_openai_success(self, mock_get_client):
+        """Test that each report section is requested separately and merged."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        sections = {
+            ExamSummaryEvaluation: {"overall_summary": {"performance_level": "Good"}},
+            ExamQuestionsEvaluation: {"question_by_question_analysis": [], "knowledge_gaps": []},
+            ExamRecommendationsEvaluation: {"learning_recommendations": {"immediate_actions": []}},
+            ExamTeacherEvaluation: {"teacher_insights": {"peer_collaboration": "Pairs"}},
+        }
+
+        async def fake_create_with_completion(**kwargs):
+            mock_report = MagicMock()
+            mock_report.model_dump.return_value = sections[kwargs["response_model"]]
+            mock_completion = MagicMock()
+            mock_completion.usage.total_tokens = 10
+            return mock_report, mock_completion
+
+        mock_client.chat.completions.create_with_completion = AsyncMock(
+            side_effect=fake_create_with_completion
+        )
+
+        result = await evaluate_exam_with_openai(
+            api_key="test_key",
+            exam_context=ExamContext(
+                exam_title="Algebra",
+                duration=30,
+                time_taken=900,
+                score=80,
+                questions=[{"id": "q1"}],
+                questions_and_answers=[{"question_text": "1+1", "is_correct": True}],
+            ),
+        )
+
+        mock_get_client.assert_called_once_with("test_key")
+        calls = mock_client.chat.completions.create_with_completion.call_args_list
+        assert {call[1]["response_model"] for call in calls} == set(sections)
+        assert result["overall_summary"]["performance_level"] == "Good"
+        assert result["knowledge_gaps"] == []
+        assert result["teacher_insights"]["peer_collaboration"] == "Pairs"
+        assert result["evaluation_metadata"]["total_tokens"] == 40
+        assert result["evaluation_metadata"]["exam_context_summary"] == {
+            "exam_title": "Algebra",
+            "score": 80,
+            "time_efficiency": 50.0,
+            "questions_count": 1,
+        }
+
+    @patch("src.api.llm.get_instructor_client")
+    async def test_evaluate_exam_with_openai_failure(self, mock_get_client):
+        """Test that client errors are reported as an evaluation failure."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.chat.completions.create_with_completion = AsyncMock(
+            side_effect=Exception("validation failed")
+        )
+
+        with pytest.raises(Exception, match="Failed to generate exam evaluation"):
+            await evaluate_exam_with_openai(api_key="test_key", exam_context=ExamContext())
+
+
+@pytest.mark.asyncio
+class TestEvaluateExamsBatch:
+    """Test the evaluate_exams_batch function."""
+
+    @patch("src.api.llm.evaluate_exam_with_openai")
+    async def test_evaluate_exams_batch_preserves_order_and_errors(self, mock_evaluate):
+        """Test that results come back in input order with failures in place."""
+        async def fake_evaluate(api_key, exam_context, model):
+            if exam_context.session_id == "bad":
+                raise Exception("evaluation failed")
+            return {"session_id": exam_context.session_id}
+
+        mock_evaluate.side_effect = fake_evaluate
+
+        results = await evaluate_exams_batch(
+            "test_key",
+            [ExamContext(session_id=session_id) for session_id in ("a", "bad", "b")],
+        )
+
+        assert results[0] == {"session_id": "a"}
+        assert isinstance(results[1], Exception)
+        assert results[2] == {"session_id": "b"}
+        assert mock_evaluate.call_count == 3
+
+    @patch("src.api.llm.evaluate_exam_with_openai")
+    async def test_evaluate_exams_batch_limits_concurrency(self, mock_evaluate):
+        """Test that no more than max_concurrency evaluations run at once."""
+        in_flight = 0
+        peak = 0
+
+        async def fake_evaluate(api_key, exam_context, model):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {}
+
+        mock_evaluate.side_effect = fake_evaluate
+
+        await evaluate_exams_batch("test_key", [ExamContext()] * 6, max_concurrency=2)
+
+        assert peak == 2
+
+
+    @patch("src.api.llm.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_evaluate_exams_batch_with_batch_api(self, mock_async_openai, mock_sleep):
+        """Test that batch=True submits a Batch API job and maps results back in order."""
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        mock_client.files.create = AsyncMock(return_value=MagicMock(id="file-in"))
+        mock_client.batches.create = AsyncMock(return_value=MagicMock(id="batch-1"))
+        mock_client.batches.retrieve = AsyncMock(side_effect=[
+            MagicMock(status="in_progress"),
+            MagicMock(status="completed", output_file_id="file-out"),
+        ])
+
+        report = {
+            "overall_summary": {
+                "performance_level": "Good",
+                "key_strengths": [],
+                "key_weaknesses": [],
+                "time_management": "Fine",
+                "overall_feedback": "Well done",
+            },
+            "question_by_question_analysis": [],
+            "knowledge_gaps": [],
+            "learning_recommendations": {
+                "immediate_actions": [],
+                "study_plan": {"week_1": [], "week_2": [], "week_3": [], "week_4": []},
+                "external_resources": [],
+                "practice_suggestions": [],
+            },
+            "comparative_analysis": {
+                "grade_interpretation": "B",
+                "improvement_potential": "High",
+                "benchmark_comparison": "Above average",
+                "next_level_requirements": "Practice",
+            },
+            "visual_insights": {
+                "strength_areas": [],
+                "improvement_areas": [],
+                "time_distribution": {"estimated_per_question": {}, "efficiency_rating": "Good"},
+            },
+            "teacher_insights": {
+                "teaching_recommendations": [],
+                "classroom_interventions": [],
+                "peer_collaboration": "Pairs",
+                "assessment_modifications": "None",
+            },
+        }
+        output_lines = [
+            {
+                "custom_id": "1",
+                "response": {"status_code": 500, "body": {}},
+                "error": {"message": "server error"},
+            },
+            {
+                "custom_id": "0",
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "choices": [{"message": {"tool_calls": [
+                            {"function": {"arguments": json.dumps(report)}}
+                        ]}}],
+                        "usage": {"total_tokens": 1234},
+                    },
+                },
+            },
+        ]
+        mock_client.files.content = AsyncMock(return_value=MagicMock(
+            content="\n".join(json.dumps(line) for line in output_lines).encode()
+        ))
+
+        results = await evaluate_exams_batch(
+            "test_key",
+            [ExamContext(exam_title="Algebra"), ExamContext(exam_title="Geometry")],
+            batch=True,
+        )
+
+        batch_input = mock_client.files.create.call_args[1]["file"][1]
+        assert len(batch_input.splitlines()) == 2
+        assert mock_client.files.create.call_args[1]["purpose"] == "batch"
+        assert mock_client.batches.create.call_args[1]["input_file_id"] == "file-in"
+        mock_sleep.assert_awaited_once()
+
+        assert results[0]["overall_summary"]["performance_level"] == "Good"
+        assert results[0]["evaluation_metadata"]["total_tokens"] == 1234
+        assert results[0]["evaluation_metadata"]["exam_context_summary"]["exam_title"] == "Algebra"
+        assert isinstance(results[1], Exception)
+
+
+@pytest.mark.asyncio
+class TestCreateSimpleOpenaiEvaluation:
+    """Test the create_simple_openai_evaluation function."""
+
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_create_simple_openai_evaluation(self, mock_async_openai):
+        """Test that the evaluation awaits the async client."""
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = "Solid work"
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        result = await create_simple_openai_evaluation(
+            api_key="test_key",
+            exam_data={"title": "Algebra", "score": 80},
+        )
+
+        assert result == {"analysis": "Solid work", "model_used": "gpt-4o"}
+        mock_client.chat.completions.create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+class TestCourseContext:
+    """Test sharing course details between exam generators."""
+
+    @patch("src.api.llm.format_course_details_for_ai")
+    async def test_get_course_context_for_ai(self, mock_format):
+        """Test that a missing or failing course falls back to an empty context."""
+        mock_format.side_effect = Exception("Course not found")
+
+        assert await get_course_context_for_ai(None) == ""
+        assert await get_course_context_for_ai(7) == ""
+        mock_format.assert_awaited_once_with(7)
+
+    @patch("src.api.llm.get_course_from_db")
+    async def test_format_course_details_is_cached(self, mock_get_course):
+        """Test that course details are fetched once until the course is invalidated."""
+        mock_get_course.return_value = {"name": "Algebra 101", "milestones": []}
+
+        first = await format_course_details_for_ai(7)
+        second = await format_course_details_for_ai(7)
+
+        assert first == second
+        assert "Algebra 101" in first
+        mock_get_course.assert_awaited_once_with(7, only_published=True)
+
+        await invalidate_course_context(7)
+        await format_course_details_for_ai(7)
+        assert mock_get_course.await_count == 2
+
+    @patch("src.api.llm.get_course_from_db")
+    async def test_clear_course_context_cache(self, mock_get_course):
+        """Test that clearing the cache refetches every course."""
+        mock_get_course.return_value = {"name": "Algebra 101", "milestones": []}
+
+        await format_course_details_for_ai(7)
+        await format_course_details_for_ai(8)
+        clear_course_context_cache()
+        await format_course_details_for_ai(7)
+        await format_course_details_for_ai(8)
+
+        assert mock_get_course.await_count == 4
+
+    @patch("src.api.llm.format_course_details_for_ai")
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_description_uses_prefetched_course_context(self, mock_async_openai, mock_format):
+        """Test that a pre-fetched course context skips the course lookup."""
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = "Covers equations."
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        result = await generate_exam_description_with_openai(
+            api_key="test_key",
+            title="Algebra",
+            course_id=7,
+            course_context="**COURSE NAME**: Algebra 101",
+        )
+
+        assert result == "Covers equations."
+        mock_format.assert_not_called()
+        prompt = mock_client.chat.completions.create.call_args[1]["messages"][-1]["content"]
+        assert "Algebra 101" in prompt
+
+
+@pytest.mark.asyncio
+class TestBulkGeneration:
+    """Test generating content for several exams in one request."""
+
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_generate_exam_descriptions_bulk(self, mock_async_openai):
+        """Test that all titles go out in one request and map back in order."""
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = json.dumps({
+            "descriptions": [
+                {"title": "Geometry", "description": "Covers shapes."},
+                {"title": "Algebra", "description": "Covers equations."},
+            ]
+        })
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        result = await generate_exam_descriptions_bulk(
+            api_key="test_key", titles=["Algebra", "Geometry"]
+        )
+
+        assert list(result.items()) == [
+            ("Algebra", "Covers equations."),
+            ("Geometry", "Covers shapes."),
+        ]
+        mock_client.chat.completions.create.assert_awaited_once()
+        call_kwargs = mock_client.chat.completions.create.call_args[1]
+        assert call_kwargs["response_format"] == {"type": "json_object"}
+
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_generate_exam_descriptions_bulk_missing_title(self, mock_async_openai):
+        """Test that a title left out of the response is reported as a failure."""
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = json.dumps({
+            "descriptions": [{"title": "Algebra", "description": "Covers equations."}]
+        })
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        with pytest.raises(Exception, match="Geometry"):
+            await generate_exam_descriptions_bulk(
+                api_key="test_key", titles=["Algebra", "Geometry"]
+            )
+
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_generate_surprise_viva_questions_bulk(self, mock_async_openai):
+        """Test that viva questions come back keyed by session."""
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        viva_question = {"id": "viva_1", "question": "Why?", "expected_answer": "Because"}
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = json.dumps({
+            "sessions": [
+                {"session_id": "s1", "viva_questions": [viva_question], "instructions": "Answer"},
+                {"session_id": "s2", "viva_questions": [viva_question]},
+            ]
+        })
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        result = await generate_surprise_viva_questions_bulk(
+            api_key="test_key",
+            exam_contexts=[
+                {"session_id": "s1", "title": "Algebra", "questions": [{"question": "2+2?"}]},
+                {"session_id": "s2", "title": "Geometry", "questions": []},
+            ],
+        )
+
+        assert set(result) == {"s1", "s2"}
+        assert result["s1"]["viva_questions"] == [viva_question]
+        assert result["s1"]["instructions"] == "Answer"
+        assert result["s2"]["generation_metadata"]["questions_generated"] == 1
+        mock_client.chat.completions.create.assert_awaited_once()
+
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_generate_surprise_viva_questions_not_cached(self, mock_async_openai):
+        """Test that every trigger gets newly generated viva questions."""
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = json.dumps({
+            "viva_questions": [{"id": "viva_1", "question": "Why?", "expected_answer": "Because"}]
+        })
+        mock_completion.usage = None
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        questions = [{"question": "2+2?"}]
+        exam_context = {"title": "Algebra"}
+        first = await generate_surprise_viva_questions("test_key", questions, exam_context)
+        second = await generate_surprise_viva_questions("test_key", questions, exam_context)
+
+        assert first["viva_questions"][0]["question"] == "Why?"
+        assert second["viva_questions"] == first["viva_questions"]
+        # A surprise viva has to be new, so identical prompts are not reused
+        assert mock_client.chat.completions.create.await_count == 2
+
+    @patch("src.api.llm.stream_llm_with_instructor")
+    async def test_stream_surprise_viva_questions(self, mock_stream_llm):
+        """Test that each viva question is yielded once the next one has started."""
+        first = MagicMock()
+        first.model_dump.return_value = {"id": "viva_1"}
+        second = MagicMock()
+        second.model_dump.return_value = {"id": "viva_2"}
+        partials = [
+            MagicMock(viva_questions=None),
+            MagicMock(viva_questions=[first]),
+            MagicMock(viva_questions=[first, second]),
+            MagicMock(viva_questions=[first, second]),
+        ]
+        received = []
+
+        async def partial_stream():
+            for index, partial in enumerate(partials):
+                # The first question is only complete once the second one appears
+                assert received == ([] if index < 3 else [{"id": "viva_1"}])
+                yield partial
+
+        mock_stream_llm.return_value = partial_stream()
+
+        async for question in stream_surprise_viva_questions(
+            "test_key", [{"question": "2+2?"}], {"title": "Algebra"}
+        ):
+            received.append(question)
+
+        assert received == [{"id": "viva_1"}, {"id": "viva_2"}]
+        assert "Algebra" in mock_stream_llm.call_args[1]["messages"][-1]["content"]
+
+    @patch("src.api.llm.asyncio.sleep", new_callable=AsyncMock)
+    @patch("src.api.llm.openai.AsyncOpenAI")
+    async def test_generate_surprise_viva_questions_with_batch_api(self, mock_async_openai, mock_sleep):
+        """Test that batch=True submits a Batch API job and maps vivas back in order."""
+        mock_client = MagicMock()
+        mock_async_openai.return_value = mock_client
+        mock_client.files.create = AsyncMock(return_value=MagicMock(id="file-in"))
+        mock_client.batches.create = AsyncMock(return_value=MagicMock(id="batch-1"))
+        mock_client.batches.retrieve = AsyncMock(
+            return_value=MagicMock(status="completed", output_file_id="file-out")
+        )
+        viva = {"viva_questions": [{"id": "viva_1", "question": "Why?", "expected_answer": "Because"}]}
+        output_lines = [
+            {"custom_id": "1", "response": {"status_code": 500, "body": {}}},
+            {
+                "custom_id": "0",
+                "response": {
+                    "status_code": 200,
+                    "body": {
+                        "choices": [{"message": {"content": json.dumps(viva)}}],
+                        "usage": {"total_tokens": 321},
+                    },
+                },
+            },
+        ]
+        mock_client.files.content = AsyncMock(return_value=MagicMock(
+            content="\n".join(json.dumps(line) for line in output_lines).encode()
+        ))
+
+        results = await generate_surprise_viva_questions_concurrently(
+            "test_key",
+            [{"exam_context": {"title": "Algebra"}}, {"exam_context": {"title": "Geometry"}}],
+            batch=True,
+        )
+
+        assert results[0]["viva_questions"] == viva["viva_questions"]
+        assert results[0]["generation_metadata"]["total_tokens"] == 321
+        assert isinstance(results[1], Exception)
+
+        batch_input = mock_client.files.create.call_args[1]["file"][1]
+        requests = [json.loads(line) for line in batch_input.splitlines()]
+        assert [request["custom_id"] for request in requests] == ["0", "1"]
+        assert "Geometry" in requests[1]["body"]["messages"][-1]["content"]
+
+    @patch("src.api.llm.generate_surprise_viva_questions")
+    async def test_generate_surprise_viva_questions_concurrently(self, mock_generate):
+        """Test that sessions run concurrently up to the limit, with failures in place."""
+        in_flight = 0
+        peak = 0
+
+        async def fake_generate(api_key, original_questions, exam_context, model):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if exam_context["title"] == "bad":
+                raise Exception("generation failed")
+            return {"title": exam_context["title"]}
+
+        mock_generate.side_effect = fake_generate
+
+        results = await generate_surprise_viva_questions_concurrently(
+            "test_key",
+            [{"exam_context": {"title": title}} for title in ("a", "bad", "b", "c")],
+            max_concurrency=2,
+        )
+
+        assert results[0] == {"title": "a"}
+        assert isinstance(results[1], Exception)
+        assert results[3] == {"title": "c"}
+        assert peak == 2
+
+
+@pytest.mark.asyncio
+class TestStreamExamEvaluationWithOpenai:
+    """Test the stream_exam_evaluation_with_openai function."""
+
+    @patch("src.api.llm.stream_llm_with_instructor")
+    async def test_stream_exam_evaluation_yields_partials(self, mock_stream_llm):
+        """Test that partial reports from instructor are yielded as they arrive."""
+        partials = [MagicMock(name="partial_1"), MagicMock(name="partial_2")]
+
+        async def partial_stream():
+            for partial in partials:
+                yield partial
+
+        mock_stream_llm.return_value = partial_stream()
+
+        received = [
+            partial
+            async for partial in stream_exam_evaluation_with_openai(
+                api_key="test_key",
+                exam_context=ExamContext(exam_title="Algebra"),
+            )
+        ]
+
+        assert received == partials
+        call_kwargs = mock_stream_llm.call_args[1]
+        assert call_kwargs["response_model"] is ExamEvaluationReport
+        assert call_kwargs["messages"][-1]["role"] == "user"
+        assert "Algebra" in call_kwargs["messages"][-1]["content"]
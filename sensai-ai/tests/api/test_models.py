@@ -1,4 +1,5 @@
 import pytest
+from pydantic import ValidationError
 from datetime import datetime
 from src.api.models import (
     UserCourseRole,
@@ -31,6 +32,10 @@ from src.api.models import (
     UserStreak,
     ChatMessage,
     Tag,
+    ExamContext,
+    CreateExamRequest,
+    MultipleChoiceQuestion,
+    TextQuestion,
 )
 
 
@@ -208,12 +213,10 @@ class TestEnumEquality:
             status1 == status3
         )  # This should also trigger line 344 but return False
 
-    def test_generate_course_job_status_recursion_bug(self):
-        """Test GenerateCourseJobStatus recursion bug when comparing with non-string/enum types."""
-        # This enum has a bug where it uses "return self == other" instead of "return False"
-        # This causes infinite recursion when compared with non-string/enum types
-        with pytest.raises(RecursionError):
-            GenerateCourseJobStatus.STARTED == 123
+    def test_generate_course_job_status_inequality_return_false(self):
+        """Test GenerateCourseJobStatus equality returns False for non-matching types."""
+        assert (GenerateCourseJobStatus.STARTED == 123) is False
+        assert (GenerateCourseJobStatus.STARTED == None) is False
 
     def test_generate_task_job_status_equality_with_string(self):
         """Test GenerateTaskJobStatus equality with string values."""
@@ -251,14 +254,18 @@ class TestEnumEquality:
         assert (GenerateTaskJobStatus.STARTED == []) is False
         assert (GenerateTaskJobStatus.STARTED == {}) is False
 
-    def test_leaderboard_view_type_equality_raises_not_implemented(self):
-        """Test LeaderboardViewType equality raises NotImplementedError for non-string/enum types."""
-        with pytest.raises(NotImplementedError):
-            LeaderboardViewType.ALL_TIME == 123
-        with pytest.raises(NotImplementedError):
-            LeaderboardViewType.ALL_TIME == None
-        with pytest.raises(NotImplementedError):
-            LeaderboardViewType.ALL_TIME == []
+    def test_leaderboard_view_type_inequality_return_false(self):
+        """Test LeaderboardViewType equality returns False for non-matching types."""
+        assert (LeaderboardViewType.ALL_TIME == "All time") is True
+        assert (LeaderboardViewType.ALL_TIME == 123) is False
+        assert (LeaderboardViewType.ALL_TIME == None) is False
+        assert (LeaderboardViewType.ALL_TIME == []) is False
+
+    def test_enums_are_hashable(self):
+        """Test that enums can be used as dict keys and looked up by value."""
+        task_counts = {TaskType.QUIZ: 2, TaskType.LEARNING_MATERIAL: 1}
+        assert task_counts["quiz"] == 2
+        assert UserCourseRole.ADMIN in {"admin", "mentor"}
 
 
 class TestEnumStringMethods:
@@ -287,6 +294,44 @@ class TestEnumStringMethods:
 class TestModelDefaults:
     """Test model default values and optional fields."""
 
+    def test_exam_settings_defaults_and_extra_keys(self):
+        """Test that exam settings fill in defaults and keep unknown keys."""
+        request = CreateExamRequest(
+            title="Algebra",
+            description="Basics",
+            duration=30,
+            questions=[],
+            settings={"max_tab_switches": 5, "custom_flag": True},
+        )
+        settings = request.settings.model_dump()
+        assert settings["max_tab_switches"] == 5
+        assert settings["require_camera"] is True
+        assert settings["custom_flag"] is True
+        assert request.monitoring.face_detection is True
+
+    def test_exam_questions_dispatch_on_type(self):
+        """Test that exam questions validate as the class matching their type."""
+        request = CreateExamRequest(
+            title="Algebra",
+            description="Basics",
+            duration=30,
+            questions=[
+                {"id": "q1", "type": "multiple_choice", "question": "2+2?",
+                 "options": [{"id": "a", "text": "4", "is_correct": True}]},
+                {"id": "q2", "type": "text", "question": "Define a group."},
+            ],
+        )
+        assert isinstance(request.questions[0], MultipleChoiceQuestion)
+        assert isinstance(request.questions[1], TextQuestion)
+
+        with pytest.raises(ValidationError):
+            CreateExamRequest(
+                title="Algebra",
+                description="Basics",
+                duration=30,
+                questions=[{"id": "q1", "type": "multiple_choice", "question": "2+2?"}],
+            )
+
     def test_user_login_data_with_optional_family_name(self):
         """Test UserLoginData with None family_name."""
         data = UserLoginData(
@@ -426,6 +471,18 @@ class TestModelInstantiation:
         assert data.family_name == "Doe"
         assert data.id_token == "token123"
 
+    def test_exam_context_defaults(self):
+        """Test ExamContext fills in defaults and ignores unknown keys."""
+        context = ExamContext.model_validate(
+            {"exam_title": "Algebra", "score": 80, "exam_id": "exam-1"}
+        )
+        assert context.exam_title == "Algebra"
+        assert context.score == 80
+        assert context.user_name == "Student"
+        assert context.questions_and_answers == []
+        assert context.session_id is None
+        assert not hasattr(context, "exam_id")
+
     def test_create_organization_request(self):
         """Test CreateOrganizationRequest instantiation."""
         request = CreateOrganizationRequest(
@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import patch
+from src.api.utils.cache import TTLCache
+
+
+@pytest.mark.asyncio
+class TestTTLCache:
+    async def test_get_returns_stored_value(self):
+        """Test that a stored value is returned until it is cleared."""
+        cache = TTLCache(ttl=60)
+        await cache.set("key", {"answer": 42})
+
+        assert await cache.get("key") == {"answer": 42}
+        assert await cache.get("missing") is None
+
+        cache.clear()
+        assert await cache.get("key") is None
+
+    async def test_delete_removes_single_entry(self):
+        """Test that delete drops only the given key."""
+        cache = TTLCache(ttl=60)
+        await cache.set("key", "value")
+        await cache.set("other", "value")
+
+        await cache.delete("key")
+        await cache.delete("missing")
+
+        assert await cache.get("key") is None
+        assert await cache.get("other") == "value"
+
+    async def test_expired_entries_are_dropped(self):
+        """Test that entries past their TTL are not returned."""
+        cache = TTLCache(ttl=10)
+
+        with patch("src.api.utils.cache.time.monotonic", return_value=100):
+            await cache.set("key", "value")
+
+        with patch("src.api.utils.cache.time.monotonic", return_value=105):
+            assert await cache.get("key") == "value"
+
+        with patch("src.api.utils.cache.time.monotonic", return_value=111):
+            assert await cache.get("key") is None
+
+    async def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache stays within max_entries."""
+        cache = TTLCache(ttl=60, max_entries=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        # Touch "a" so "b" becomes the least recently used entry
+        await cache.get("a")
+        await cache.set("c", 3)
+
+        assert await cache.get("a") == 1
+        assert await cache.get("b") is None
+        assert await cache.get("c") == 3
@@ -1,8 +1,10 @@
+import asyncio
 import pytest
 import sqlite3
 import aiosqlite
 from unittest.mock import patch, AsyncMock, MagicMock, call
 from src.api.utils.db import (
+    AioSqlitePool,
     get_new_db_connection,
     set_db_defaults,
     execute_db_operation,
@@ -134,6 +136,132 @@ class TestDbConnections:
         mock_conn.close.assert_called_once()
 
 
+@pytest.mark.asyncio
+class TestAioSqlitePool:
+    async def test_pool_reuses_connections(self, tmp_path):
+        """Test that the pool hands out the same open connections."""
+        pool = AioSqlitePool(str(tmp_path / "test.sqlite"), 2)
+        await pool.open()
+
+        try:
+            seen = set()
+            for _ in range(4):
+                async with pool.acquire() as conn:
+                    seen.add(id(conn))
+
+            assert seen == {id(conn) for conn in pool.connections}
+            assert pool.queue.qsize() == 2
+
+            async with pool.acquire() as conn:
+                cursor = await conn.execute("PRAGMA journal_mode")
+                assert await cursor.fetchone() == ("wal",)
+                cursor = await conn.execute("PRAGMA synchronous")
+                assert await cursor.fetchone() == (1,)  # NORMAL
+        finally:
+            await pool.close()
+
+        assert not pool.is_open
+
+    async def test_pool_close_waits_for_checked_out_connections(self, tmp_path):
+        """Test that closing the pool waits for connections still in use."""
+        pool = AioSqlitePool(str(tmp_path / "test.sqlite"), 2)
+        await pool.open()
+
+        acquired = asyncio.Event()
+        release = asyncio.Event()
+
+        async def request():
+            async with pool.acquire() as conn:
+                acquired.set()
+                await release.wait()
+                cursor = await conn.execute("SELECT 1")
+                return await cursor.fetchone()
+
+        task = asyncio.create_task(request())
+        await acquired.wait()
+
+        close_task = asyncio.create_task(pool.close())
+        await asyncio.sleep(0.01)
+        assert not pool.is_open
+        assert not close_task.done()
+
+        release.set()
+        assert await task == (1,)
+        await close_task
+        assert pool.connections == []
+
+    async def test_nested_connections_do_not_wait_on_the_pool(self, tmp_path):
+        """Test that a connection opened while the pool is exhausted is not blocked."""
+        db_path = str(tmp_path / "test.sqlite")
+        pool = AioSqlitePool(db_path, 1)
+        await pool.open()
+
+        try:
+            with patch("src.api.utils.db.db_pool", pool), patch(
+                "src.api.utils.db.sqlite_db_path", db_path
+            ):
+                async with get_new_db_connection() as outer:
+                    assert outer is pool.connections[0]
+
+                    async with get_new_db_connection() as inner:
+                        assert inner is not outer
+                        cursor = await inner.execute("SELECT 1")
+                        assert await cursor.fetchone() == (1,)
+
+                async with get_new_db_connection() as conn:
+                    assert conn is pool.connections[0]
+        finally:
+            await pool.close()
+
+    async def test_pool_rolls_back_uncommitted_work(self, tmp_path):
+        """Test that a released connection does not carry an open transaction."""
+        pool = AioSqlitePool(str(tmp_path / "test.sqlite"), 1)
+        await pool.open()
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute("CREATE TABLE items (id INTEGER)")
+                await conn.commit()
+
+            with pytest.raises(ValueError):
+                async with pool.acquire() as conn:
+                    await conn.execute("INSERT INTO items VALUES (1)")
+                    raise ValueError("handler failed")
+
+            async with pool.acquire() as conn:
+                await conn.execute("INSERT INTO items VALUES (2)")
+
+            async with pool.acquire() as conn:
+                assert not conn.in_transaction
+                cursor = await conn.execute("SELECT COUNT(*) FROM items")
+                assert await cursor.fetchone() == (0,)
+        finally:
+            await pool.close()
+
+    async def test_pool_keeps_connection_when_rollback_fails(self, tmp_path):
+        """Test that a failed rollback still returns the connection to the pool."""
+        pool = AioSqlitePool(str(tmp_path / "test.sqlite"), 1)
+        await pool.open()
+
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute("CREATE TABLE items (id INTEGER)")
+                await conn.commit()
+
+            with patch.object(
+                pool.connections[0],
+                "rollback",
+                AsyncMock(side_effect=sqlite3.OperationalError("database is locked")),
+            ):
+                with pytest.raises(sqlite3.OperationalError):
+                    async with pool.acquire() as conn:
+                        await conn.execute("INSERT INTO items VALUES (1)")
+
+            assert pool.queue.qsize() == 1
+        finally:
+            await asyncio.wait_for(pool.close(), timeout=5)
+
+
 @pytest.mark.asyncio
 class TestDbOperations:
     @patch("src.api.utils.db.get_new_db_connection")
@@ -0,0 +1,17 @@
+from src.api.utils.llm_cache import make_llm_cache_key
+
+
+class TestMakeLlmCacheKey:
+    def test_key_ignores_argument_order(self):
+        """Test that the key depends on the request contents, not their order."""
+        messages = [{"role": "user", "content": "hello"}]
+        assert make_llm_cache_key(model="gpt-4o", messages=messages) == make_llm_cache_key(
+            messages=messages, model="gpt-4o"
+        )
+
+    def test_key_changes_with_request(self):
+        """Test that different requests get different keys."""
+        messages = [{"role": "user", "content": "hello"}]
+        assert make_llm_cache_key(model="gpt-4o", messages=messages) != make_llm_cache_key(
+            model="gpt-4o-mini", messages=messages
+        )
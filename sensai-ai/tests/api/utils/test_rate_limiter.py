@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.api.utils.rate_limiter import AsyncTokenBucket, estimate_prompt_tokens
+
+
+@pytest.mark.asyncio
+class TestAsyncTokenBucket:
+    async def test_acquire_within_capacity_does_not_wait(self):
+        """Test that requests within the bucket's capacity go straight through."""
+        bucket = AsyncTokenBucket(capacity=10, period=60)
+
+        with patch("src.api.utils.rate_limiter.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await bucket.acquire(4)
+            await bucket.acquire(6)
+
+        mock_sleep.assert_not_called()
+
+    async def test_acquire_waits_for_refill(self):
+        """Test that an exhausted bucket waits for enough tokens to refill."""
+        bucket = AsyncTokenBucket(capacity=60, period=60)
+        now = [100.0]
+
+        async def advance(seconds):
+            now[0] += seconds
+
+        with patch("src.api.utils.rate_limiter.time.monotonic", side_effect=lambda: now[0]), patch(
+            "src.api.utils.rate_limiter.asyncio.sleep", side_effect=advance
+        ) as mock_sleep:
+            bucket.updated_at = now[0]
+            await bucket.acquire(60)
+            await bucket.acquire(5)
+
+        # One token per second refill rate, so 5 tokens take 5 seconds
+        mock_sleep.assert_called_once_with(5.0)
+
+
+class TestEstimatePromptTokens:
+    def test_estimate_prompt_tokens(self):
+        """Test that the estimate scales with the serialized message size."""
+        short = [{"role": "user", "content": "hi"}]
+        long = [{"role": "user", "content": "hi " * 400}]
+
+        assert 0 < estimate_prompt_tokens(short) < estimate_prompt_tokens(long)
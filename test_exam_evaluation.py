@@ -6,7 +6,8 @@ Test script for the comprehensive exam evaluation system
 import asyncio
 import json
 from datetime import datetime
-from api.llm import evaluate_exam_with_openai, create_simple_openai_evaluation
+from api.llm import evaluate_exam_with_openai, create_simple_openai_evaluation_sync
+from api.models import ExamContext
 
 # Test data - sample exam session
 sample_exam_context = {
@@ -88,7 +89,7 @@ async def test_comprehensive_evaluation():
         print("📊 Generating comprehensive evaluation...")
         evaluation_result = await evaluate_exam_with_openai(
             api_key=api_key,
-            exam_context=sample_exam_context,
+            exam_context=ExamContext.model_validate(sample_exam_context),
             model="gpt-4o"
         )
         
@@ -166,7 +167,7 @@ def test_simple_evaluation():
         api_key = "sk-test-key"  # Replace with actual key
         
         print("📊 Generating simple evaluation...")
-        evaluation_result = create_simple_openai_evaluation(
+        evaluation_result = create_simple_openai_evaluation_sync(
             api_key=api_key,
             exam_data=simple_exam_data,
             model="gpt-4o"